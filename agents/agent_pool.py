@@ -0,0 +1,95 @@
+"""
+agent_pool.py
+-------------
+Process-wide registry of long-lived agents.
+
+Constructing an agent is not free: it configures the Gemini client,
+builds a GenerativeModel and (for ResumeGeneratorAgent) loads the LaTeX
+template. The server creates one pool at startup and every request
+handler borrows the same instances from it.
+
+Agents hold no per-request state, so one instance per class can be
+shared safely across Flask worker threads.
+"""
+
+import threading
+import time
+from typing import Any, Dict, Iterable, Optional, Type
+
+
+class AgentPool:
+    """
+    Thread-safe, lazily populated agent registry
+
+    Usage:
+        pool = get_agent_pool()
+        agent = pool.get(JobAnalyzerAgent)
+    """
+
+    def __init__(self):
+        """Create an empty pool"""
+        self._agents: Dict[type, Any] = {}
+        self._setup_seconds: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def get(self, agent_cls: Type) -> Any:
+        """
+        Get the shared instance of an agent class, creating it on first use
+
+        Args:
+            agent_cls: Agent class (e.g. JobAnalyzerAgent)
+
+        Returns:
+            The shared agent instance
+        """
+        agent = self._agents.get(agent_cls)
+        if agent is not None:
+            return agent
+
+        with self._lock:
+            # Another thread may have built it while we waited for the lock
+            agent = self._agents.get(agent_cls)
+            if agent is None:
+                start = time.perf_counter()
+                agent = agent_cls()
+                self._setup_seconds[agent_cls.__name__] = time.perf_counter() - start
+                self._agents[agent_cls] = agent
+        return agent
+
+    def warm_up(self, agent_classes: Iterable[Type]) -> None:
+        """
+        Eagerly construct agents so the first request doesn't pay for setup
+
+        Args:
+            agent_classes: Agent classes to build now
+        """
+        for agent_cls in agent_classes:
+            self.get(agent_cls)
+        print(f"✅ Agent pool ready: {', '.join(self._setup_seconds)}")
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Pool contents and one-time setup cost per agent
+
+        Returns:
+            dict: Agent names mapped to construction time in ms
+        """
+        with self._lock:
+            return {
+                "agents": len(self._agents),
+                "setup_ms": {name: round(seconds * 1000, 2)
+                             for name, seconds in self._setup_seconds.items()}
+            }
+
+
+# Singleton instance
+_agent_pool: Optional[AgentPool] = None
+_agent_pool_lock = threading.Lock()
+
+def get_agent_pool() -> AgentPool:
+    """Get or create the process-wide agent pool"""
+    global _agent_pool
+    with _agent_pool_lock:
+        if _agent_pool is None:
+            _agent_pool = AgentPool()
+    return _agent_pool
@@ -2,12 +2,22 @@
 base_agent.py
 -------------
 Foundation class for all agents.
-Contains ONLY the basic setup - nothing else!
+Contains ONLY the basic setup and the shared LLM call - nothing else!
 """
 
-import google.generativeai as genai
 import os
+import time
 from dotenv import load_dotenv
+from circuit_breaker import CircuitOpenError, get_circuit_breaker
+from deadline import current_deadline
+from hedging import get_hedging_policy
+from llm_backend import get_llm_backend, llm_backend_mode
+from llm_cache import LLMCache, get_llm_cache
+from model_router import get_model_router
+from rate_limiter import get_llm_scheduler
+from singleflight import get_singleflight
+from structured_output import (StructuredOutputError, conform, json_generation_config,
+                               missing_fields, missing_fields_prompt, parse_json)
 
 load_dotenv()
 
@@ -15,26 +25,232 @@ load_dotenv()
 class BaseAgent:
     """
     Base Agent - Handles API setup
-    
+
     This is the foundation. All other agents inherit from this.
     """
-    
+
     def __init__(self):
-        """Initialize Gemini API connection"""
-        
+        """Initialize Gemini API connection (or the offline backend, see llm_backend.py)"""
+
         api_key = os.getenv('GEMINI_API_KEY')
-        
-        if not api_key or api_key == 'your-gemini-api-key-here':
+
+        # LLM_BACKEND=replay answers from recordings and needs no key
+        if llm_backend_mode() != 'replay' and (not api_key or api_key == 'your-gemini-api-key-here'):
             print("\n❌ ERROR: No valid API key found!")
             print("Please add your Gemini API key to the .env file")
             print("Get free key from: https://makersuite.google.com/app/apikey")
             raise ValueError("Missing API key")
-        
-        # Configure Gemini
-        genai.configure(api_key=api_key)
-        
-        # Select model
-        self.model = genai.GenerativeModel('gemini-2.5-flash')
-        
-        print("✅ Agent initialized with Gemini\n")
 
+        # Select model (the backend configures Gemini once per process)
+        self.model_name = 'gemini-2.5-flash'
+        self.generation_config = {}
+        self.backend = get_llm_backend(self.model_name)
+
+        # Shared response cache (None when LLM_CACHE_ENABLED=false)
+        self.cache = get_llm_cache()
+
+        # Process-wide rate limiter / retry scheduler shared by every agent
+        self.scheduler = get_llm_scheduler()
+
+        # Concurrent identical prompts share one upstream request
+        self.flight = get_singleflight()
+
+        # Per-tool model tier / max tokens / temperature (model_router.py)
+        self.router = get_model_router()
+
+        # Fails fast while Gemini is down or slow (circuit_breaker.py)
+        self.breaker = get_circuit_breaker()
+
+        # Optional hedged requests + per-tool latency histograms (hedging.py)
+        self.hedger = get_hedging_policy()
+
+        print(f"✅ Agent initialized with {'Gemini' if self.backend.name == 'gemini' else self.backend.name + ' backend'}\n")
+
+
+    def _resolve(self, tool: str = None, tier: str = None, generation_config: dict = None):
+        """
+        Backend and generation config for a call, per the routing table
+
+        Returns:
+            tuple: (backend, config)
+        """
+        route = self.router.route(tool)
+        model = self.router.model_for(tier or route.tier)
+        backend = self.backend if model == self.model_name else get_llm_backend(model)
+        config = {**self.generation_config, **route.generation_config(), **(generation_config or {})}
+        return backend, config
+
+
+    def _generate(self, prompt: str, tool: str = None,
+                  generation_config: dict = None, tier: str = None) -> str:
+        """
+        Send a prompt to Gemini and return the response text
+
+        All agents call this instead of calling the backend directly so
+        each tool is routed to its model tier, identical requests are
+        served from the response cache, identical requests already in
+        flight share one upstream call, and misses go through the shared
+        rate limiter (with retries on 429s), each attempt recorded by the
+        circuit breaker. Slow calls may be hedged with a duplicate request
+        (hedging.py).
+
+        Raises:
+            CircuitOpenError: The breaker is open (no upstream call was made)
+            DeadlineExceeded: The request's deadline passed before a cache miss
+
+        Args:
+            prompt: Full prompt text
+            tool: Name of the calling tool (selects the route, used in logs)
+            generation_config: Per-call additions to the route's config
+            tier: Override the route's model tier
+
+        Returns:
+            str: Raw response text
+        """
+        backend, config = self._resolve(tool, tier, generation_config)
+        key = LLMCache.make_key(backend.model_id, config, prompt)
+        if self.cache:
+            cached = self.cache.get(key)
+            if cached is not None:
+                print(f"⚡ Cache hit{f' for {tool}' if tool else ''}")
+                return cached
+
+        deadline = current_deadline()
+        if deadline is not None:
+            deadline.check(tool or 'LLM call')
+
+        def fetch():
+            self.breaker.check()  # don't queue behind the rate limiter while open
+            start = time.perf_counter()
+            try:
+                text = self.hedger.call(tool, self.scheduler.call, self.breaker.call,
+                                        self._call_model, prompt, config=config, backend=backend)
+            except CircuitOpenError:
+                raise
+            except Exception:
+                self.router.record(tool, backend.model_name, (time.perf_counter() - start) * 1000, ok=False)
+                raise
+            self.router.record(tool, backend.model_name, (time.perf_counter() - start) * 1000, ok=True)
+            if self.cache:
+                self.cache.put(key, backend.model_id, text)
+            return text
+
+        return self.flight.do(key, fetch)
+
+
+    def _generate_json(self, prompt: str, tool: str, fields: list = None) -> dict:
+        """
+        Generate a JSON object for a tool with a schema in structured_output
+
+        The model is asked for JSON output and the response goes through
+        the tolerant parser. If nothing can be recovered, the call is
+        retried one model tier up. If some schema fields are missing (e.g.
+        the response was cut off) only those fields are requested again.
+
+        Args:
+            prompt: Full prompt text
+            tool: Tool name (selects the schema and the route)
+            fields: Schema fields the prompt actually asks for (default: all);
+                    only these are re-asked for when missing
+
+        Returns:
+            dict: Parsed object with every schema field present
+
+        Raises:
+            StructuredOutputError: No JSON could be recovered, even from the top tier
+        """
+        config = json_generation_config()
+        tier = self.router.route(tool).tier
+        while True:
+            text = self._generate(prompt, tool=tool, generation_config=config, tier=tier)
+            try:
+                data, repaired = parse_json(text)
+                break
+            except StructuredOutputError:
+                # Don't let a retry be served the same unusable response
+                backend, full_config = self._resolve(tool, tier, config)
+                if self.cache:
+                    self.cache.delete(LLMCache.make_key(backend.model_id, full_config, prompt))
+                bigger = self.router.next_tier(tier)
+                if not self.router.enabled or bigger is None:
+                    raise
+                self.router.record_fallback(tool, backend.model_name)
+                print(f"⤴️  {tool}: unusable JSON from {backend.model_name} - retrying on the {bigger} tier")
+                tier = bigger
+        if repaired:
+            print(f"🩹 Repaired malformed JSON from {tool}")
+
+        missing = missing_fields(tool, data, fields)
+        if missing:
+            print(f"🔁 {tool}: re-asking for {len(missing)} missing field(s): {', '.join(missing)}")
+            try:
+                followup = self._generate(missing_fields_prompt(prompt, tool, missing),
+                                          tool=f'{tool}:missing', generation_config=config, tier=tier)
+                extra, _ = parse_json(followup)
+                data.update({field: extra[field] for field in missing if field in extra})
+            except StructuredOutputError as e:
+                print(f"⚠️  {tool}: follow-up failed ({e}) - using empty values")
+
+        return conform(tool, data)
+
+
+    def _call_model(self, prompt: str, stream: bool = False, config: dict = None, backend=None):
+        """Single raw backend request (text, or an iterator of fragments when streaming)"""
+        config = self.generation_config if config is None else config
+        backend = backend or self.backend
+        if stream:
+            return backend.stream(prompt, config)
+        return backend.generate(prompt, config)
+
+
+    def _generate_stream(self, prompt: str, tool: str = None):
+        """
+        Stream response text from Gemini as it is produced
+
+        A cache hit yields the whole cached response at once. On a miss the
+        full text is cached only after the stream completes successfully.
+
+        Args:
+            prompt: Full prompt text
+            tool: Name of the calling tool (selects the route, used in logs)
+
+        Yields:
+            str: Response text fragments, in order
+        """
+        backend, config = self._resolve(tool)
+        key = LLMCache.make_key(backend.model_id, config, prompt)
+        if self.cache:
+            cached = self.cache.get(key)
+            if cached is not None:
+                print(f"⚡ Cache hit{f' for {tool}' if tool else ''}")
+                yield cached
+                return
+
+        # Only opening the stream is scheduled/retried; a failure mid-stream
+        # propagates since fragments have already been handed to the caller.
+        # The breaker sees the whole stream as one call, so a stream that
+        # fails or stalls after opening counts against it.
+        self.breaker.enter()
+        start = time.perf_counter()
+        parts = []
+        ok = False
+        try:
+            response = self.scheduler.call(self._call_model, prompt, stream=True,
+                                           config=config, backend=backend)
+            for text in response:
+                if text:
+                    parts.append(text)
+                    yield text
+            ok = True
+        except GeneratorExit:
+            ok = True  # the caller stopped reading - not an upstream failure
+            raise
+        except Exception:
+            self.router.record(tool, backend.model_name, (time.perf_counter() - start) * 1000, ok=False)
+            raise
+        finally:
+            self.breaker.record(ok, time.perf_counter() - start)
+        self.router.record(tool, backend.model_name, (time.perf_counter() - start) * 1000, ok=True)
+
+        if self.cache:
+            self.cache.put(key, backend.model_id, ''.join(parts))
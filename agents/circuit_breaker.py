@@ -0,0 +1,236 @@
+"""
+circuit_breaker.py
+------------------
+Circuit breaker for upstream LLM calls.
+
+When Gemini is slow or down, every request thread would otherwise sit in
+generate_content (or in the scheduler queue) until it times out, and the
+whole backend stalls. The breaker watches a sliding window of recent
+calls and trips when too many of them fail or are slow:
+
+    closed ──(error or slow-call rate over threshold)──> open
+    open ──(cool-down elapsed)──> half-open (one probe call at a time)
+    half-open ──(probe succeeds)──> closed / ──(probe fails)──> open
+
+Every upstream attempt is recorded on its own (BaseAgent runs each
+scheduler attempt through the breaker), so a timed-out attempt counts
+as a failure as soon as it happens, not after the scheduler's retries
+and backoff. Queue time in the scheduler isn't part of an attempt.
+
+While open, calls fail immediately with CircuitOpenError and the Flask
+handlers answer with cached or locally computed results (degraded.py).
+"""
+
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, Optional
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling the LLM while the breaker is open"""
+
+    def __init__(self, retry_after: float):
+        super().__init__(f"LLM circuit breaker is open (retry in {retry_after:.0f}s)")
+        self.retry_after = retry_after
+
+
+def is_circuit_open_error(error: Exception) -> bool:
+    """True for CircuitOpenError, also when wrapped (PipelineNodeError.error)"""
+    return isinstance(getattr(error, 'error', error), CircuitOpenError)
+
+
+class CircuitBreaker:
+    """
+    Error-rate / latency circuit breaker
+
+    Args:
+        window: Recent calls considered
+        min_calls: Calls needed in the window before it can trip
+        failure_threshold: Failure share that trips it
+        slow_call_seconds: A call slower than this counts as slow (failed or not)
+        slow_threshold: Slow-call share that trips it
+        open_seconds: Cool-down before a probe call is let through
+    """
+
+    def __init__(self, window: int = 20, min_calls: int = 5,
+                 failure_threshold: float = 0.5, slow_call_seconds: float = 30.0,
+                 slow_threshold: float = 0.8, open_seconds: float = 30.0):
+        self.window = window
+        self.min_calls = min_calls
+        self.failure_threshold = failure_threshold
+        self.slow_call_seconds = slow_call_seconds
+        self.slow_threshold = slow_threshold
+        self.open_seconds = open_seconds
+
+        self._lock = threading.Lock()
+        self._calls = deque(maxlen=window)  # (failed, slow)
+        self._state = 'closed'
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+
+        self._times_opened = 0
+        self._rejected = 0
+        self._last_trip_reason = None
+
+    # ------------------------------------------------------------------
+    # State
+    # ------------------------------------------------------------------
+
+    def _retry_after(self) -> float:
+        return max(0.0, self._opened_at + self.open_seconds - time.monotonic())
+
+    def allow(self) -> bool:
+        """
+        Reserve a call slot
+
+        Returns:
+            bool: False while open (or while a half-open probe is running)
+        """
+        with self._lock:
+            if self._state == 'open' and self._retry_after() <= 0:
+                self._state = 'half_open'
+            if self._state == 'closed':
+                return True
+            if self._state == 'half_open' and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            self._rejected += 1
+            return False
+
+    def is_open(self) -> bool:
+        """True while calls are being rejected (a half-open probe may be running)"""
+        with self._lock:
+            return self._state == 'open' and self._retry_after() > 0
+
+    def _trip(self, reason: str) -> None:
+        self._state = 'open'
+        self._opened_at = time.monotonic()
+        self._times_opened += 1
+        self._last_trip_reason = reason
+        self._calls.clear()
+        print(f"🔌 LLM circuit breaker OPEN ({reason}) - serving degraded responses "
+              f"for {self.open_seconds:.0f}s")
+
+    def enter(self) -> None:
+        """
+        Reserve a call slot (allow()) or fail fast
+
+        Raises:
+            CircuitOpenError: The breaker is open
+        """
+        if not self.allow():
+            with self._lock:
+                retry_after = self._retry_after() or self.open_seconds
+            raise CircuitOpenError(retry_after)
+
+    def check(self) -> None:
+        """
+        Fail fast while open, without reserving a slot (e.g. before queueing)
+
+        Raises:
+            CircuitOpenError: The breaker is open
+        """
+        if self.is_open():
+            with self._lock:
+                retry_after = self._retry_after() or self.open_seconds
+            raise CircuitOpenError(retry_after)
+
+    def record(self, ok: bool, elapsed_seconds: float) -> None:
+        """Record the outcome of a call that allow() let through"""
+        slow = elapsed_seconds > self.slow_call_seconds
+        with self._lock:
+            if self._state == 'half_open':
+                self._probe_in_flight = False
+                if ok and not slow:
+                    self._state = 'closed'
+                    self._calls.clear()
+                    print("🔌 LLM circuit breaker closed - upstream recovered")
+                else:
+                    self._trip('probe call failed' if not ok else 'probe call slow')
+                return
+
+            self._calls.append((not ok, slow))
+            if len(self._calls) < self.min_calls:
+                return
+            failures = sum(1 for failed, _ in self._calls if failed) / len(self._calls)
+            slow_calls = sum(1 for _, was_slow in self._calls if was_slow) / len(self._calls)
+            if failures >= self.failure_threshold:
+                self._trip(f"{failures:.0%} of the last {len(self._calls)} calls failed")
+            elif slow_calls >= self.slow_threshold:
+                self._trip(f"{slow_calls:.0%} of the last {len(self._calls)} calls "
+                           f"took over {self.slow_call_seconds:.0f}s")
+
+    # ------------------------------------------------------------------
+    # Calls
+    # ------------------------------------------------------------------
+
+    def call(self, func: Callable, *args, **kwargs) -> Any:
+        """
+        Run func through the breaker
+
+        Raises:
+            CircuitOpenError: The breaker is open; func was not called
+        """
+        self.enter()
+
+        start = time.perf_counter()
+        try:
+            result = func(*args, **kwargs)
+        except Exception:
+            self.record(False, time.perf_counter() - start)
+            raise
+        self.record(True, time.perf_counter() - start)
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Breaker state and counters
+
+        Returns:
+            dict: state, calls in window, failure / slow rate, times opened,
+                  rejected calls, last trip reason and seconds until a probe
+        """
+        with self._lock:
+            calls = len(self._calls)
+            return {
+                "state": self._state,
+                "window_calls": calls,
+                "failure_rate": round(sum(f for f, _ in self._calls) / calls, 3) if calls else 0.0,
+                "slow_rate": round(sum(s for _, s in self._calls) / calls, 3) if calls else 0.0,
+                "times_opened": self._times_opened,
+                "rejected_calls": self._rejected,
+                "last_trip_reason": self._last_trip_reason,
+                "retry_after_seconds": round(self._retry_after(), 1) if self._state == 'open' else 0.0,
+            }
+
+
+# Singleton instance
+_breaker: Optional[CircuitBreaker] = None
+_breaker_lock = threading.Lock()
+
+def get_circuit_breaker() -> CircuitBreaker:
+    """
+    Get or create the process-wide LLM circuit breaker
+
+    Configured from the environment:
+        LLM_BREAKER_WINDOW             calls in the sliding window (default: 20)
+        LLM_BREAKER_MIN_CALLS          calls before it can trip (default: 5)
+        LLM_BREAKER_FAILURE_RATE       failure share that trips it (default: 0.5)
+        LLM_BREAKER_SLOW_CALL_SECONDS  an attempt slower than this is slow (default: 30)
+        LLM_BREAKER_SLOW_RATE          slow-call share that trips it (default: 0.8)
+        LLM_BREAKER_OPEN_SECONDS       cool-down before a probe call (default: 30)
+    """
+    global _breaker
+    with _breaker_lock:
+        if _breaker is None:
+            _breaker = CircuitBreaker(
+                window=int(os.getenv('LLM_BREAKER_WINDOW', '20')),
+                min_calls=int(os.getenv('LLM_BREAKER_MIN_CALLS', '5')),
+                failure_threshold=float(os.getenv('LLM_BREAKER_FAILURE_RATE', '0.5')),
+                slow_call_seconds=float(os.getenv('LLM_BREAKER_SLOW_CALL_SECONDS', '30')),
+                slow_threshold=float(os.getenv('LLM_BREAKER_SLOW_RATE', '0.8')),
+                open_seconds=float(os.getenv('LLM_BREAKER_OPEN_SECONDS', '30'))
+            )
+    return _breaker
@@ -0,0 +1,210 @@
+"""
+deadline.py
+-----------
+End-to-end request deadlines.
+
+A Flask handler opens a deadline_scope(); the Deadline travels with the
+request in a context variable, so it reaches every pipeline stage, agent
+and RAG call without being threaded through each signature (asyncio
+tasks and asyncio.to_thread copy the context).
+
+Pipeline stages ask how much of the remaining budget they may use
+(stage_budget: whatever is left after reserving time for the cheapest
+path of every stage still to come, measured paths preferred), compare it to their expected cost
+(the p50 of the tool's recent latency from hedging.py, or a default),
+and fall back to a cheaper path or skip themselves when it won't fit.
+So a tight budget degrades the pipeline from the tail: early stages run
+in full as long as the later ones can still finish somehow. Each decision is recorded so
+the response can say what was degraded or skipped (Deadline.report()).
+
+Environment:
+    REQUEST_DEADLINE_SECONDS   default budget for deadline-aware endpoints (default: 90)
+"""
+
+import contextlib
+import contextvars
+import math
+import os
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Union
+
+from hedging import get_hedging_policy
+
+
+# Expected ms per tool until there are latency samples to go on
+DEFAULT_EXPECTED_MS = {
+    'analyze_job_description': 8000,
+    'analyze_resume': 10000,
+    'create_matching_strategy': 15000,
+    'generate_tailored_resume': 30000,
+    'generate_section': 12000,
+    'get_suggestions': 5000,
+    'rag_tailor': 8000,
+}
+FALLBACK_EXPECTED_MS = 10000
+
+# With the local fast paths on, a stage's only LLM call is a smaller
+# enrichment call; its latency counts for the stage too
+FAST_PATH_TOOLS = {
+    'analyze_job_description': 'enrich_job_description',
+    'analyze_resume': 'enrich_resume',
+}
+
+
+class DeadlineExceeded(TimeoutError):
+    """Raised when a call is attempted after its request's deadline"""
+
+
+class Deadline:
+    """
+    A request's time budget and a log of the stages it cut short
+
+    Args:
+        seconds: Total budget from now
+    """
+
+    def __init__(self, seconds: float):
+        self.budget = seconds
+        self.started = time.monotonic()
+        self.expires_at = self.started + seconds
+        self._lock = threading.Lock()
+        self._skipped: List[Dict[str, str]] = []
+        self._degraded: List[Dict[str, str]] = []
+
+    def remaining(self) -> float:
+        """Seconds left (0 once expired)"""
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+    def check(self, what: str = 'call') -> None:
+        """Raise DeadlineExceeded if the budget is spent"""
+        if self.expired():
+            raise DeadlineExceeded(f"Request deadline passed before {what}")
+
+    def skip(self, stage: str, reason: str) -> None:
+        """Record that a stage was skipped entirely"""
+        print(f"⏭️  Deadline: skipped {stage} ({reason})")
+        with self._lock:
+            self._skipped.append({'stage': stage, 'reason': reason})
+
+    def degrade(self, stage: str, reason: str) -> None:
+        """Record that a stage used a cheaper path"""
+        print(f"⏳ Deadline: {stage} degraded ({reason})")
+        with self._lock:
+            self._degraded.append({'stage': stage, 'reason': reason})
+
+    def report(self) -> Dict[str, Any]:
+        """
+        What the deadline did to this request
+
+        Returns:
+            dict: budget_ms, elapsed_ms, remaining_ms, skipped and degraded stages
+        """
+        with self._lock:
+            return {
+                'budget_ms': round(self.budget * 1000),
+                'elapsed_ms': round((time.monotonic() - self.started) * 1000),
+                'remaining_ms': round(self.remaining() * 1000),
+                'skipped': list(self._skipped),
+                'degraded': list(self._degraded),
+            }
+
+
+_current: contextvars.ContextVar[Optional[Deadline]] = contextvars.ContextVar('deadline', default=None)
+
+
+def current_deadline() -> Optional[Deadline]:
+    """The active request's Deadline, or None when there is no budget"""
+    return _current.get()
+
+
+@contextlib.contextmanager
+def deadline_scope(seconds: Optional[float]):
+    """
+    Run a block under a deadline (None or <= 0 = no deadline)
+
+    Yields:
+        Deadline or None
+    """
+    deadline = Deadline(seconds) if seconds and seconds > 0 else None
+    token = _current.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current.reset(token)
+
+
+def _measured_seconds(tool: str) -> Optional[float]:
+    """Recent p50 of the tool or of its fast-path call, whichever is lower"""
+    hedger = get_hedging_policy()
+    samples = [hedger.latency_percentile(t, 50) for t in (tool, FAST_PATH_TOOLS.get(tool)) if t]
+    samples = [ms for ms in samples if ms is not None]
+    return min(samples) / 1000 if samples else None
+
+
+def request_deadline_seconds(data: Optional[dict]) -> Optional[float]:
+    """
+    Time budget for a request: 'deadline_seconds' in the body, else
+    REQUEST_DEADLINE_SECONDS (0 turns deadlines off)
+
+    Returns:
+        float, or None if the value isn't a non-negative number (answer 400)
+    """
+    seconds = (data or {}).get('deadline_seconds')
+    if seconds is None:
+        seconds = os.getenv('REQUEST_DEADLINE_SECONDS', '90')
+    if isinstance(seconds, bool):
+        return None
+    try:
+        seconds = float(seconds)
+    except (TypeError, ValueError):
+        return None
+    return seconds if math.isfinite(seconds) and seconds >= 0 else None
+
+
+def expected_seconds(tool: str) -> float:
+    """Typical duration of a tool's call: recent p50, or a default"""
+    measured = _measured_seconds(tool)
+    if measured is None:
+        return DEFAULT_EXPECTED_MS.get(tool.split(':', 1)[0], FALLBACK_EXPECTED_MS) / 1000
+    return measured
+
+
+def reserve_seconds(tools: Union[str, Sequence[str]]) -> float:
+    """
+    Time to keep for a later stage
+
+    Args:
+        tools: The stage's tool, or its alternative paths' tools
+
+    Returns:
+        float: Expected seconds of its cheapest path. Measured paths are
+        preferred: an unmeasured default (e.g. 12s for sectioned LaTeX)
+        would otherwise outweigh a path that is known to take 1s.
+    """
+    tools = [tools] if isinstance(tools, str) else list(tools)
+    measured = [s for s in map(_measured_seconds, tools) if s is not None]
+    return min(measured) if measured else min(map(expected_seconds, tools))
+
+
+def stage_budget(downstream: Iterable[Union[str, Sequence[str]]] = ()) -> Optional[float]:
+    """
+    Seconds a stage may use: the remaining budget minus a reserve for
+    the stages still to come
+
+    Args:
+        downstream: One entry per later stage with an LLM path: its tool,
+                    or a tuple of its alternative tools (see reserve_seconds).
+                    Stages with a local fallback cost nothing and aren't listed
+
+    Returns:
+        float (0 when the reserve alone doesn't fit) or None when there
+        is no deadline
+    """
+    deadline = current_deadline()
+    if deadline is None:
+        return None
+    return max(0.0, deadline.remaining() - sum(reserve_seconds(t) for t in downstream))
@@ -0,0 +1,99 @@
+"""
+degraded.py
+-----------
+Locally computed stand-ins for Tools 1-3, served while the LLM circuit
+breaker is open (circuit_breaker.py) or when a stage won't fit in its
+request's deadline (deadline.py).
+
+Responses already in the LLM cache are still served normally (the cache
+is checked before the breaker); these cover everything else:
+- job analysis: the rule-based extractor (jd_extractor.py)
+- resume analysis: the regex pre-parser (resume_preparser.py)
+- strategy: the quick-match score (quick_match.py)
+- LaTeX: none - full-pipeline / generate-tailored return the three
+  analyses with "latex": null
+
+Every result has the normal schema shape plus "degraded": true, so the
+frontend can label it.
+"""
+
+from typing import Any, Dict, List
+
+from jd_extractor import extract_job_requirements
+from quick_match import quick_match
+from resume_preparser import preparse_resume
+from skill_normalizer import canonical_key
+from structured_output import conform
+
+
+def degraded_job_analysis(job_description: str) -> Dict[str, Any]:
+    """Tool 1 fallback: skills, keywords, experience and education only"""
+    analysis = conform('analyze_job_description', extract_job_requirements(job_description))
+    analysis['degraded'] = True
+    return analysis
+
+
+def degraded_resume_analysis(resume_text: str) -> Dict[str, Any]:
+    """Tool 2 fallback: name, contact info and skills only"""
+    resume_data = conform('analyze_resume', dict(preparse_resume(resume_text)['resume_data']))
+    resume_data['degraded'] = True
+    return resume_data
+
+
+def _strategy(score: int, matched: List[str], missing: List[str],
+              note: str = "The full strategy will be available once the AI service recovers."
+              ) -> Dict[str, Any]:
+    """Strategy-shaped result (same item fields as Tool 3) from matched / missing skills"""
+    return conform('create_matching_strategy', {
+        'overall_match_score': score,
+        'match_summary': (f"Quick local estimate: the resume mentions {len(matched)} of the "
+                          f"{len(matched) + len(missing)} required skills. {note}"),
+        'strong_matches': [{'skill_or_experience': skill,
+                            'evidence': 'Mentioned in the resume',
+                            'strategy': 'Keep it prominent in the skills section and experience bullets'}
+                           for skill in matched],
+        'gaps': [{'missing': skill,
+                  'severity': 'critical',
+                  'mitigation': 'Add it if you have the experience, or highlight related skills'}
+                 for skill in missing],
+        'skills_to_emphasize': [{'skill': skill,
+                                 'reason': 'Required by the job description',
+                                 'how': 'Name it explicitly where you used it'}
+                                for skill in matched],
+        'keywords_to_add': missing,
+    })
+
+
+def degraded_strategy(job_description: str, resume_text: str) -> Dict[str, Any]:
+    """Tool 3 fallback: quick-match score, matched skills and gaps"""
+    match = quick_match(resume_text, job_description)
+    strategy = _strategy(match['score'], match['matched_skills'], match['missing_skills'])
+    strategy['quick_match'] = match
+    strategy['degraded'] = True
+    return strategy
+
+
+def degraded_pipeline(job_description: str, resume_text: str) -> Dict[str, Any]:
+    """Tools 1-3 fallback for the pipeline endpoints (no LaTeX)"""
+    return {
+        'job_analysis': degraded_job_analysis(job_description),
+        'resume_data': degraded_resume_analysis(resume_text),
+        'strategy': degraded_strategy(job_description, resume_text),
+        'latex': None,
+    }
+
+
+def degraded_strategy_from_analysis(job_analysis: Dict[str, Any],
+                                    resume_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Tool 3 fallback when only the analyses are at hand (pipeline deadline)"""
+    have = {canonical_key(s) for s in
+            (resume_data.get('skills') or []) + (resume_data.get('technical_skills') or [])
+            if isinstance(s, str)}
+    required = [s for s in job_analysis.get('required_skills') or [] if isinstance(s, str)]
+    matched = [s for s in required if canonical_key(s) in have]
+    missing = [s for s in required if canonical_key(s) not in have]
+    score = round(100 * len(matched) / len(required)) if required else 0
+    strategy = _strategy(score, matched, missing,
+                         note="There wasn't time for the full strategy within the request deadline.")
+    strategy['degraded'] = True
+    return strategy
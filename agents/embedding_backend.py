@@ -0,0 +1,187 @@
+"""
+embedding_backend.py
+--------------------
+Pluggable embedding backends for RAGEngine.
+
+    EMBEDDING_BACKEND=gemini   Google embedding API (one round trip per query, default)
+    EMBEDDING_BACKEND=local    sentence-transformers on CPU, batched
+    EMBEDDING_BACKEND=hashing  deterministic token hashing: no model, no network
+
+The local backend removes the network round trip from every query and
+takes ingestion off the API quota. If it is selected and the model can't
+be loaded, make_embeddings() raises rather than quietly switching to
+hashing (a much weaker vector space). Replay mode always uses hashing.
+
+Vectors from different backends aren't comparable, so each backend has
+its own embedding_id and RAGEngine keeps a separate index per backend.
+
+Environment:
+    EMBEDDING_BACKEND          gemini | local | hashing (default: gemini)
+    EMBEDDING_MODEL            sentence-transformers model (default: all-MiniLM-L6-v2)
+    EMBEDDING_BATCH_SIZE       texts per encode batch (default: 64)
+    EMBEDDING_HASH_DIMENSIONS  hashing vector size (default: 256)
+"""
+
+import hashlib
+import os
+import re
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+try:
+    from langchain.embeddings.base import Embeddings
+except ImportError:  # only needed to hand these to LangChain; benchmarks run without it
+    Embeddings = object
+
+
+DEFAULT_LOCAL_MODEL = 'sentence-transformers/all-MiniLM-L6-v2'
+GEMINI_EMBEDDING_MODEL = 'models/embedding-001'
+
+TOKEN_RE = re.compile(r'\w+')
+
+
+class HashingEmbeddings(Embeddings):
+    """
+    Hash-based embeddings (no network, same text -> same vector)
+
+    Each token adds +-1 to one of `dimensions` slots picked by its MD5;
+    vectors are L2-normalized. Token hashes are memoized and a batch is
+    built as one matrix, so this costs microseconds per chunk. Good
+    enough for similarity search over a handful of resume chunks; not a
+    substitute for a real embedding model.
+    """
+
+    def __init__(self, dimensions: int = 256, memo_size: int = 100000):
+        self.dimensions = dimensions
+        self.memo_size = memo_size
+        self._slots: Dict[str, Tuple[int, float]] = {}
+
+    @property
+    def embedding_id(self) -> str:
+        return f"hashing-{self.dimensions}"
+
+    def _slot(self, token: str) -> Tuple[int, float]:
+        slot = self._slots.get(token)
+        if slot is None:
+            digest = int(hashlib.md5(token.encode('utf-8')).hexdigest(), 16)
+            slot = (digest % self.dimensions, 1.0 if (digest >> 8) & 1 else -1.0)
+            if len(self._slots) >= self.memo_size:
+                self._slots.clear()
+            self._slots[token] = slot
+        return slot
+
+    def _matrix(self, texts: List[str]) -> np.ndarray:
+        matrix = np.zeros((len(texts), self.dimensions), dtype=np.float64)
+        rows, cols, signs = [], [], []
+        for row, text in enumerate(texts):
+            for token in TOKEN_RE.findall(text.lower()):
+                col, sign = self._slot(token)
+                rows.append(row)
+                cols.append(col)
+                signs.append(sign)
+        if rows:
+            np.add.at(matrix, (np.array(rows), np.array(cols)), np.array(signs))
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return matrix / norms
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self._matrix(texts).tolist()
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._matrix([text])[0].tolist()
+
+
+class LocalEmbeddings(Embeddings):
+    """
+    sentence-transformers model on CPU, encoding in batches
+
+    The model is loaded on first use (a few seconds, once per process).
+
+    Args:
+        model_name: Hugging Face model id
+        batch_size: Texts per forward pass
+        device: Torch device (default: cpu)
+    """
+
+    def __init__(self, model_name: str = DEFAULT_LOCAL_MODEL, batch_size: int = 64,
+                 device: str = 'cpu'):
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self.device = device
+        self._model = None
+        self._lock = threading.Lock()
+
+    @property
+    def embedding_id(self) -> str:
+        # The whole model name: org/model-a and other-org/model-a are different models
+        return f"local-{re.sub(r'[^A-Za-z0-9._-]+', '_', self.model_name).strip('_.')}"
+
+    @property
+    def model(self):
+        with self._lock:
+            if self._model is None:
+                from sentence_transformers import SentenceTransformer
+                print(f"🧮 Loading embedding model {self.model_name} ({self.device})")
+                self._model = SentenceTransformer(self.model_name, device=self.device)
+        return self._model
+
+    def _encode(self, texts: List[str]) -> np.ndarray:
+        return self.model.encode(texts, batch_size=self.batch_size, convert_to_numpy=True,
+                                 normalize_embeddings=True, show_progress_bar=False)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        if not texts:
+            return []
+        return self._encode(texts).tolist()
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._encode([text])[0].tolist()
+
+
+def make_embeddings(backend: Optional[str] = None, api_key: Optional[str] = None) -> Any:
+    """
+    Create the embedding backend selected by EMBEDDING_BACKEND
+
+    Args:
+        backend: gemini | local | hashing (overrides the environment)
+        api_key: Gemini API key (gemini backend only)
+
+    Returns:
+        LangChain Embeddings (see embedding_id())
+
+    Raises:
+        RuntimeError: The local model can't be loaded
+        ValueError: Unknown backend name
+    """
+    backend = (backend or os.getenv('EMBEDDING_BACKEND', 'gemini')).strip().lower()
+
+    if backend == 'gemini':
+        from langchain_google_genai import GoogleGenerativeAIEmbeddings
+        return GoogleGenerativeAIEmbeddings(model=GEMINI_EMBEDDING_MODEL, google_api_key=api_key)
+
+    if backend == 'local':
+        embeddings = LocalEmbeddings(
+            model_name=os.getenv('EMBEDDING_MODEL', DEFAULT_LOCAL_MODEL),
+            batch_size=int(os.getenv('EMBEDDING_BATCH_SIZE', '64'))
+        )
+        try:
+            embeddings.model  # load now, not on the first request
+        except Exception as e:  # ImportError, or no network to download the model
+            raise RuntimeError(
+                f"EMBEDDING_BACKEND=local but {embeddings.model_name} can't be loaded ({e}). "
+                f"Install sentence-transformers, or set EMBEDDING_BACKEND=hashing or gemini"
+            ) from e
+        return embeddings
+
+    if backend == 'hashing':
+        return HashingEmbeddings(int(os.getenv('EMBEDDING_HASH_DIMENSIONS', '256')))
+
+    raise ValueError(f"Unknown EMBEDDING_BACKEND '{backend}' (use gemini, local or hashing)")
+
+
+def embedding_id(embeddings: Any) -> str:
+    """Name of the vector space an embeddings object produces (used in index paths)"""
+    return getattr(embeddings, 'embedding_id', 'gemini')
@@ -0,0 +1,213 @@
+"""
+embedding_cache.py
+------------------
+Persistent chunk-embedding cache for RAG ingestion.
+
+Re-uploading a resume after a one-line edit used to re-embed every chunk.
+Vectors are now stored in SQLite keyed on the embedding backend plus a
+SHA-256 of the chunk text, so only new or changed chunks are embedded;
+the rest are read back (float32, the precision FAISS keeps anyway).
+
+CachedEmbeddings wraps any LangChain embeddings object and is a drop-in
+replacement for it. Queries are passed straight through - they are
+rarely repeated and the vector store is what needs to be fast to build.
+
+Eviction: least recently used entries beyond `max_entries`.
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from embedding_backend import Embeddings, embedding_id
+
+
+class EmbeddingCache:
+    """
+    SQLite-backed LRU cache of chunk vectors
+
+    Thread-safe: one shared connection guarded by a lock.
+
+    Args:
+        path: SQLite file location
+        max_entries: Maximum number of cached vectors
+    """
+
+    def __init__(self, path: str = "./llm_cache/embeddings.db", max_entries: int = 100000):
+        self.path = path
+        self.max_entries = max_entries
+
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS embeddings (
+                key TEXT PRIMARY KEY,
+                model TEXT NOT NULL,
+                dims INTEGER NOT NULL,
+                vector BLOB NOT NULL,
+                last_access REAL NOT NULL
+            )
+        """)
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_embeddings_last_access ON embeddings(last_access)"
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(model: str, text: str) -> str:
+        """Key for one chunk: embedding backend + text hash"""
+        text_hash = hashlib.sha256(text.encode('utf-8')).hexdigest()
+        return hashlib.sha256(f"{model}\n{text_hash}".encode('utf-8')).hexdigest()
+
+    def get_many(self, model: str, texts: Sequence[str]) -> Dict[int, List[float]]:
+        """
+        Look up vectors for a batch of chunks
+
+        Returns:
+            dict: index in `texts` -> vector, for the chunks that were cached
+        """
+        keys = [self.make_key(model, text) for text in texts]
+        found: Dict[str, List[float]] = {}
+        now = time.time()
+        with self._lock:
+            unique = list(set(keys))
+            for start in range(0, len(unique), 500):  # stay under SQLite's variable limit
+                batch = unique[start:start + 500]
+                marks = ','.join('?' * len(batch))
+                for key, vector in self._conn.execute(
+                        f"SELECT key, vector FROM embeddings WHERE key IN ({marks})", batch):
+                    found[key] = np.frombuffer(vector, dtype=np.float32).tolist()
+                self._conn.execute(
+                    f"UPDATE embeddings SET last_access = ? WHERE key IN ({marks})", [now, *batch])
+            self._conn.commit()
+            result = {i: found[key] for i, key in enumerate(keys) if key in found}
+            self.hits += len(result)
+            self.misses += len(keys) - len(result)
+        return result
+
+    def put_many(self, model: str, texts: Sequence[str], vectors: Sequence[Sequence[float]]) -> None:
+        """Store vectors for a batch of chunks and enforce max_entries"""
+        now = time.time()
+        rows = [(self.make_key(model, text), model, len(vector),
+                 np.asarray(vector, dtype=np.float32).tobytes(), now)
+                for text, vector in zip(texts, vectors)]
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, model, dims, vector, last_access) "
+                "VALUES (?, ?, ?, ?, ?)", rows)
+            (count,) = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()
+            if count > self.max_entries:
+                self._conn.execute(
+                    "DELETE FROM embeddings WHERE key IN "
+                    "(SELECT key FROM embeddings ORDER BY last_access ASC LIMIT ?)",
+                    (count - self.max_entries,))
+                self.evictions += count - self.max_entries
+            self._conn.commit()
+
+    def clear(self) -> None:
+        """Remove every cached vector"""
+        with self._lock:
+            self._conn.execute("DELETE FROM embeddings")
+            self._conn.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Cache counters for monitoring
+
+        Returns:
+            dict: chunk hits, misses, hit rate, evictions and entries stored
+        """
+        with self._lock:
+            (count,) = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "evictions": self.evictions,
+                "entries": count,
+                "max_entries": self.max_entries,
+            }
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    Embeddings that only embed chunks the cache hasn't seen
+
+    Args:
+        embeddings: The real backend (embedding_backend.make_embeddings())
+        cache: Where vectors are kept
+    """
+
+    def __init__(self, embeddings: Any, cache: EmbeddingCache):
+        self.embeddings = embeddings
+        self.cache = cache
+        self.embedding_id = embedding_id(embeddings)
+
+    def embed_with_stats(self, texts: List[str]) -> Tuple[List[List[float]], int]:
+        """
+        Embed a batch of chunks
+
+        Returns:
+            tuple: (vectors in input order, number of chunks served from the cache)
+        """
+        cached = self.cache.get_many(self.embedding_id, texts)
+        missing = [i for i in range(len(texts)) if i not in cached]
+        if missing:
+            fresh = self.embeddings.embed_documents([texts[i] for i in missing])
+            self.cache.put_many(self.embedding_id, [texts[i] for i in missing], fresh)
+            cached.update(zip(missing, fresh))
+        return [cached[i] for i in range(len(texts))], len(texts) - len(missing)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.embed_with_stats(texts)[0]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embeddings.embed_query(text)
+
+
+def embed_with_stats(embeddings: Any, texts: List[str]) -> Tuple[List[List[float]], int]:
+    """(vectors, chunks reused from the cache) for cached or plain embeddings"""
+    if isinstance(embeddings, CachedEmbeddings):
+        return embeddings.embed_with_stats(texts)
+    return embeddings.embed_documents(texts), 0
+
+
+# Singleton instance
+_embedding_cache: Optional[EmbeddingCache] = None
+_embedding_cache_lock = threading.Lock()
+
+def get_embedding_cache() -> Optional[EmbeddingCache]:
+    """
+    Get or create the process-wide embedding cache
+
+    Configured from the environment:
+        EMBEDDING_CACHE_ENABLED      (default: true)
+        EMBEDDING_CACHE_PATH         (default: ./llm_cache/embeddings.db)
+        EMBEDDING_CACHE_MAX_ENTRIES  (default: 100000)
+
+    Returns:
+        EmbeddingCache or None if caching is disabled
+    """
+    global _embedding_cache
+    if os.getenv('EMBEDDING_CACHE_ENABLED', 'true').lower() in ('0', 'false', 'no'):
+        return None
+
+    with _embedding_cache_lock:
+        if _embedding_cache is None:
+            _embedding_cache = EmbeddingCache(
+                path=os.getenv('EMBEDDING_CACHE_PATH', './llm_cache/embeddings.db'),
+                max_entries=int(os.getenv('EMBEDDING_CACHE_MAX_ENTRIES', '100000'))
+            )
+    return _embedding_cache
@@ -0,0 +1,241 @@
+"""
+hedging.py
+----------
+Hedged LLM requests and per-tool latency histograms.
+
+A few slow upstream responses make p99 several times the median. With
+hedging on, a call that hasn't finished by the tool's recent latency
+percentile (p95 by default) gets a duplicate request, and whichever
+finishes first wins. A global budget caps the extra calls at a small
+fraction of all calls, so a uniformly slow upstream can't double our
+traffic. The losing request can't be cancelled mid-flight; its result
+is simply dropped.
+
+Latency is recorded per tool whether hedging is on or not, so the
+histograms at GET /api/agent/metrics can be used to tune the trigger.
+Failed calls get their own histograms: a fast 429 or a slow timeout
+says nothing about how long a good answer takes, so they don't move the
+trigger (or the deadline estimates built on it).
+
+Environment:
+    LLM_HEDGING                true | false (default: false)
+    LLM_HEDGE_PERCENTILE       trigger percentile of recent latency (default: 95)
+    LLM_HEDGE_MIN_SAMPLES      samples needed before a tool is hedged (default: 20)
+    LLM_HEDGE_BUDGET           max extra calls as a fraction of all calls (default: 0.05)
+    LLM_HEDGE_MIN_DELAY_MS     never hedge sooner than this (default: 500)
+"""
+
+import bisect
+import contextvars
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, TimeoutError as FutureTimeout, wait
+from typing import Any, Callable, Dict, Optional
+
+
+# Histogram bucket upper bounds in ms (the last bucket is open-ended)
+LATENCY_BUCKETS_MS = (100, 250, 500, 1000, 2500, 5000, 10000, 20000, 40000, 80000)
+
+
+class LatencyHistogram:
+    """Bucketed latency counts plus a window of recent samples for percentiles"""
+
+    def __init__(self, window: int = 500):
+        self.counts = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.recent = deque(maxlen=window)
+        self.total = 0
+
+    def add(self, ms: float) -> None:
+        self.counts[bisect.bisect_left(LATENCY_BUCKETS_MS, ms)] += 1
+        self.recent.append(ms)
+        self.total += 1
+
+    def percentile(self, p: float) -> Optional[float]:
+        """p-th percentile (0-100) of the recent window, None if empty"""
+        if not self.recent:
+            return None
+        ordered = sorted(self.recent)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))]
+
+    def to_dict(self) -> Dict[str, Any]:
+        labels = [f"<={bound}ms" for bound in LATENCY_BUCKETS_MS] + [f">{LATENCY_BUCKETS_MS[-1]}ms"]
+        return {
+            "count": self.total,
+            "p50_ms": _round(self.percentile(50)),
+            "p90_ms": _round(self.percentile(90)),
+            "p99_ms": _round(self.percentile(99)),
+            "buckets": {label: count for label, count in zip(labels, self.counts) if count},
+        }
+
+
+def _round(value: Optional[float]) -> Optional[float]:
+    return round(value, 1) if value is not None else None
+
+
+class HedgingPolicy:
+    """
+    Runs LLM calls with an optional hedge and records their latency
+
+    Args:
+        enabled: Send hedged requests (latency is recorded either way)
+        percentile: Trigger at this percentile of the tool's recent latency
+        min_samples: Don't hedge a tool until it has this many samples
+        budget: Hedged calls allowed, as a fraction of all calls
+        min_delay_ms: Lower bound for the trigger delay
+        max_workers: Threads running primary and hedged attempts
+    """
+
+    def __init__(self, enabled: bool = False, percentile: float = 95.0,
+                 min_samples: int = 20, budget: float = 0.05,
+                 min_delay_ms: float = 500.0, max_workers: int = 32):
+        self.enabled = enabled
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self.budget = budget
+        self.min_delay_ms = min_delay_ms
+
+        self._lock = threading.Lock()
+        self._histograms: Dict[str, LatencyHistogram] = {}
+        self._failures: Dict[str, LatencyHistogram] = {}
+        self._executor = ThreadPoolExecutor(max_workers=max_workers,
+                                            thread_name_prefix='llm-hedge') if enabled else None
+
+        self._calls = 0
+        self._hedges = 0
+        self._hedges_won = 0
+        self._over_budget = 0
+
+    @staticmethod
+    def _tool_key(tool: Optional[str]) -> str:
+        return (tool or 'default').split(':', 1)[0]
+
+    def record(self, tool: Optional[str], ms: float, ok: bool = True) -> None:
+        """Add one call's latency to the tool's histogram (failures are kept apart)"""
+        key = self._tool_key(tool)
+        histograms = self._histograms if ok else self._failures
+        with self._lock:
+            if key not in histograms:
+                histograms[key] = LatencyHistogram()
+            histograms[key].add(ms)
+
+    def latency_percentile(self, tool: Optional[str], p: float) -> Optional[float]:
+        """p-th percentile of the tool's recent latency in ms (None without samples)"""
+        with self._lock:
+            histogram = self._histograms.get(self._tool_key(tool))
+            return histogram.percentile(p) if histogram else None
+
+    def delay_for(self, tool: Optional[str]) -> Optional[float]:
+        """Seconds to wait before hedging this tool, or None to not hedge"""
+        if not self.enabled:
+            return None
+        with self._lock:
+            histogram = self._histograms.get(self._tool_key(tool))
+            if histogram is None or len(histogram.recent) < self.min_samples:
+                return None
+            return max(histogram.percentile(self.percentile), self.min_delay_ms) / 1000
+
+    def _take_budget(self) -> bool:
+        with self._lock:
+            if self._hedges + 1 <= self.budget * self._calls:
+                self._hedges += 1
+                return True
+            self._over_budget += 1
+            return False
+
+    def _timed(self, tool: Optional[str], func: Callable, *args, **kwargs) -> Any:
+        start = time.perf_counter()
+        try:
+            result = func(*args, **kwargs)
+        except BaseException:
+            self.record(tool, (time.perf_counter() - start) * 1000, ok=False)
+            raise
+        self.record(tool, (time.perf_counter() - start) * 1000)
+        return result
+
+    def _submit(self, tool: Optional[str], func: Callable, *args, **kwargs):
+        """Run _timed on the pool in a copy of the caller's context (deadline included)"""
+        context = contextvars.copy_context()
+        return self._executor.submit(context.run, self._timed, tool, func, *args, **kwargs)
+
+    def call(self, tool: Optional[str], func: Callable, *args, **kwargs) -> Any:
+        """
+        Run func, hedging it if it runs past the tool's trigger delay
+
+        Returns:
+            The first successful result (primary or hedge)
+
+        Raises:
+            The primary's exception if it fails before the trigger, otherwise
+            the last exception when both attempts fail
+        """
+        delay = self.delay_for(tool)
+        if delay is None:
+            return self._timed(tool, func, *args, **kwargs)
+
+        with self._lock:
+            self._calls += 1
+        primary = self._submit(tool, func, *args, **kwargs)
+        try:
+            return primary.result(timeout=delay)
+        except FutureTimeout:
+            pass
+
+        if not self._take_budget():
+            return primary.result()
+
+        print(f"🪃 {tool}: no response after {delay * 1000:.0f} ms - sending a hedged request")
+        hedge = self._submit(tool, func, *args, **kwargs)
+        pending, error = {primary, hedge}, None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    if future is hedge:
+                        with self._lock:
+                            self._hedges_won += 1
+                    return future.result()
+                error = future.exception()
+        raise error
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Hedging counters and per-tool latency histograms
+
+        Returns:
+            dict: enabled flag, trigger settings, calls, hedges sent / won,
+                  hedges skipped for budget, one histogram per tool and
+                  one per tool for failed calls
+        """
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "percentile": self.percentile,
+                "budget": self.budget,
+                "calls": self._calls,
+                "hedges_sent": self._hedges,
+                "hedges_won": self._hedges_won,
+                "skipped_over_budget": self._over_budget,
+                "tools": {tool: h.to_dict() for tool, h in sorted(self._histograms.items())},
+                "failures": {tool: h.to_dict() for tool, h in sorted(self._failures.items())},
+            }
+
+
+# Singleton instance
+_policy: Optional[HedgingPolicy] = None
+_policy_lock = threading.Lock()
+
+def get_hedging_policy() -> HedgingPolicy:
+    """Get or create the process-wide hedging policy"""
+    global _policy
+    with _policy_lock:
+        if _policy is None:
+            _policy = HedgingPolicy(
+                enabled=os.getenv('LLM_HEDGING', 'false').lower() in ('1', 'true', 'yes'),
+                percentile=float(os.getenv('LLM_HEDGE_PERCENTILE', '95')),
+                min_samples=int(os.getenv('LLM_HEDGE_MIN_SAMPLES', '20')),
+                budget=float(os.getenv('LLM_HEDGE_BUDGET', '0.05')),
+                min_delay_ms=float(os.getenv('LLM_HEDGE_MIN_DELAY_MS', '500'))
+            )
+    return _policy
@@ -0,0 +1,400 @@
+"""
+jd_extractor.py
+---------------
+Rule-based fast path for job description analysis.
+
+Skills, keywords, experience level and education are mostly lexical, so
+they don't need an LLM round trip. This module finds them in a few
+milliseconds:
+- one Aho-Corasick automaton over every alias in skill_taxonomy.py
+  (a single pass over the text, however many skills the taxonomy holds)
+- section / line cues to split required from nice-to-have skills
+- regexes for years of experience and degrees
+- bullets under a "Responsibilities" heading
+
+JobAnalyzerAgent only asks the LLM for the fields left empty here
+(usually company_culture).
+"""
+
+import re
+from collections import deque
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from skill_taxonomy import AMBIGUOUS_NAMES, SKILL_TAXONOMY, SOFT_CATEGORIES, iter_aliases
+
+
+class AhoCorasick:
+    """
+    Multi-pattern string matcher (Aho-Corasick automaton)
+
+    Args:
+        patterns: (pattern, value) pairs; patterns are matched as given,
+                  so lowercase them (and the text) for case-insensitive search
+    """
+
+    def __init__(self, patterns: Iterable[Tuple[str, Any]]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[Tuple[int, Any]]] = [[]]
+
+        for pattern, value in patterns:
+            if pattern:
+                self._add(pattern, value)
+        self._build()
+
+    def _add(self, pattern: str, value: Any) -> None:
+        state = 0
+        for ch in pattern:
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            state = nxt
+        self._out[state].append((len(pattern), value))
+
+    def _build(self) -> None:
+        """Breadth-first pass computing failure links"""
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                if state:  # depth-1 states fail to the root
+                    fail = self._fail[state]
+                    while fail and ch not in self._goto[fail]:
+                        fail = self._fail[fail]
+                    self._fail[nxt] = self._goto[fail].get(ch, 0)
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def find_all(self, text: str) -> List[Tuple[int, int, Any]]:
+        """
+        Every occurrence of every pattern (overlaps included)
+
+        Returns:
+            list: (start, end, value) tuples, end exclusive
+        """
+        matches = []
+        state = 0
+        for i, ch in enumerate(text):
+            while state and ch not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(ch, 0)
+            for length, value in self._out[state]:
+                matches.append((i - length + 1, i + 1, value))
+        return matches
+
+
+def _is_word_char(ch: str) -> bool:
+    return ch.isalnum() or ch == '_'
+
+
+def longest_word_matches(automaton: AhoCorasick, text: str) -> List[Tuple[int, int, Any]]:
+    """
+    Non-overlapping, whole-word matches, preferring the longest at each position
+
+    Args:
+        automaton: Built over lowercase patterns
+        text: Lowercased text
+
+    Returns:
+        list: (start, end, value) in text order
+    """
+    candidates = [
+        (start, end, value) for start, end, value in automaton.find_all(text)
+        if (start == 0 or not _is_word_char(text[start - 1]))
+        and (end == len(text) or not _is_word_char(text[end]))
+    ]
+    candidates.sort(key=lambda m: (m[0], -(m[1] - m[0])))
+
+    chosen, last_end = [], -1
+    for start, end, value in candidates:
+        if start >= last_end:
+            chosen.append((start, end, value))
+            last_end = end
+    return chosen
+
+
+# "Go", "C" and "R" are only skills when written as names in a list of
+# things ("Go, C and R", "C/C++", "(R)"); "go" or "Plan C" on its own is not
+AMBIGUOUS_SKILLS = {
+    canonical: category
+    for category, skills in SKILL_TAXONOMY.items()
+    for canonical in skills if canonical.lower() in AMBIGUOUS_NAMES
+}
+AMBIGUOUS_RE = re.compile(
+    r'(?<![\w.+#&-])(' + '|'.join(map(re.escape, AMBIGUOUS_SKILLS)) + r')(?![\w+#&\'-])'
+)
+LIST_BEFORE = re.compile(r'(?:[,/(]|\band|\bor)\s*$', re.IGNORECASE)
+LIST_AFTER = re.compile(r'^\s*(?:[,/)]|and\b|or\b)', re.IGNORECASE)
+
+
+def list_name_matches(line: str) -> List[Tuple[int, int, Any]]:
+    """
+    Ambiguous skill names (AMBIGUOUS_SKILLS) used as list items
+
+    Args:
+        line: Original-case text (the names are matched case-sensitively)
+
+    Returns:
+        list: (start, end, (canonical, category)) like longest_word_matches
+    """
+    matches = []
+    for match in AMBIGUOUS_RE.finditer(line):
+        start, end = match.span()
+        if LIST_BEFORE.search(line[:start]) or LIST_AFTER.match(line[end:]):
+            canonical = match.group(1)
+            matches.append((start, end, (canonical, AMBIGUOUS_SKILLS[canonical])))
+    return matches
+
+
+# ========================================================================
+# SECTION / LINE CUES
+# ========================================================================
+
+NICE_MARKERS = ('nice to have', 'nice-to-have', 'preferred', 'an advantage', 'a plus',
+                'bonus', 'desirable', 'optional', 'not required', 'good to have')
+REQUIRED_HEADINGS = ('requirement', 'qualification', 'we ask for', 'must have', 'must-have',
+                     'you have', 'you bring', 'skills', 'what we look for', "what we're looking for",
+                     'who you are', 'about you')
+RESPONSIBILITY_HEADINGS = ('responsibilit', 'what you will do', "what you'll do", 'the role',
+                           'your mission', 'duties', 'day to day', 'day-to-day')
+OTHER_HEADINGS = ('we offer', 'benefits', 'perks', 'about us', 'about the company',
+                  'who we are', 'why join')
+
+# Where a line-level cue ("... is a plus") stops applying
+CLAUSE_BREAK = re.compile(r'[;!?]|\.(?=\s|$)|\b(?:but|while|whereas|and ideally)\b')
+
+BULLET = re.compile(r'^\s*(?:[-*•·▪◦]|\d+[.)])\s*')
+
+EXPERIENCE_RE = re.compile(
+    r'(?P<prefix>at least|minimum(?: of)?|min\.?|over|more than)?\s*'
+    r'(?P<low>\d{1,2})\s*(?P<plus>\+|plus)?\s*'
+    r'(?:(?:-|–|to)\s*(?P<high>\d{1,2})\s*\+?\s*)?'
+    r'(?:years?|yrs?)\b',
+    re.IGNORECASE
+)
+SENIORITY_RE = re.compile(r'\b(intern|junior|entry[- ]level|mid[- ]level|senior|sr\.?|lead|'
+                          r'staff|principal|head of|director)\b', re.IGNORECASE)
+# (?!\w) rather than \b: abbreviations like "B.S." end in '.', where \b can't match
+DEGREE_RE = re.compile(
+    r"\b(bachelor'?s?|master'?s?|ph\.?\s?d\.?|doctorate|b\.?\s?sc?\.?|"
+    r"m\.?\s?sc?\.?(?!\s*(?:office|excel|word|teams|sql|azure|dynamics))|"
+    r"b\.?tech|m\.?tech|mba|associate'?s? degree|degree)(?!\w)",
+    re.IGNORECASE
+)
+
+
+def _split_heading(line: str) -> Tuple[Optional[str], str]:
+    """
+    Classify a line that may be a heading with content after it
+
+    "Nice to have: Kubernetes, Docker" is a 'nice' heading followed by
+    skills on the same line; those must still be matched.
+
+    Returns:
+        tuple: (heading kind or None, the text after "Heading:" or '')
+    """
+    head, colon, rest = line.partition(':')
+    if colon and rest.strip():
+        kind = _heading_kind(head + ':')
+        if kind:
+            return kind, rest.strip()
+    return _heading_kind(line), ''
+
+
+def _heading_kind(line: str) -> Optional[str]:
+    """Classify a heading line ('nice' | 'required' | 'responsibilities' | 'other'), else None"""
+    text = BULLET.sub('', line).strip().rstrip(':').lower()
+    if not text or len(text) > 60 or (BULLET.match(line) and not line.rstrip().endswith(':')):
+        return None
+    # Headings either end with ':' or are a short phrase without sentence punctuation
+    if not line.rstrip().endswith(':') and (len(text.split()) > 5 or text[-1] in '.,;!'):
+        return None
+    if any(marker in text for marker in NICE_MARKERS):
+        return 'nice'
+    if any(h in text for h in RESPONSIBILITY_HEADINGS):
+        return 'responsibilities'
+    if any(h in text for h in OTHER_HEADINGS):
+        return 'other'
+    if any(h in text for h in REQUIRED_HEADINGS):
+        return 'required'
+    return None
+
+
+def _nice_spans(lowered: str) -> List[Tuple[int, int]]:
+    """
+    Character spans of the clauses in a line that carry a nice-to-have cue
+
+    "Python and SQL required; Airflow is a plus" only makes Airflow
+    nice-to-have, not every skill on the line.
+    """
+    spans, start = [], 0
+    for cut in [m.start() for m in CLAUSE_BREAK.finditer(lowered)] + [len(lowered)]:
+        if any(marker in lowered[start:cut] for marker in NICE_MARKERS):
+            spans.append((start, cut))
+        start = cut
+    return spans
+
+
+def _experience_level(lines: List[str]) -> Optional[str]:
+    """e.g. 'Senior (3+ years)', '2-4 years' or None"""
+    years = None
+    for line in lines:
+        match = EXPERIENCE_RE.search(line)
+        if match and ('experience' in line.lower() or 'year' in line.lower()):
+            low, high = match.group('low'), match.group('high')
+            if high:
+                years = f"{low}-{high} years"
+            elif match.group('plus') or match.group('prefix'):
+                years = f"{low}+ years"
+            else:
+                years = f"{low} years"
+            break
+
+    # Seniority from the title (first non-empty line)
+    title = next((line for line in lines if line.strip()), '')
+    seniority = SENIORITY_RE.search(title)
+    level = None
+    if seniority:
+        level = seniority.group(1).title()
+        level = 'Senior' if level.startswith('Sr') else level
+
+    if level and years:
+        return f"{level} ({years})"
+    return level or years
+
+
+def _education(lines: List[str]) -> str:
+    """The clause stating the degree requirement, or 'Not specified'"""
+    for line in lines:
+        line = BULLET.sub('', line)
+        degrees = [m.span() for m in DEGREE_RE.finditer(line)]
+        if not degrees:
+            continue
+        # Dots inside "B.S." or "Ph.D." aren't clause breaks
+        breaks = [m.span() for m in CLAUSE_BREAK.finditer(line)
+                  if not any(low <= m.start() < high for low, high in degrees)]
+        first, last = degrees[0]
+        start = max((cut_end for cut, cut_end in breaks if cut < first), default=0)
+        end = min((cut for cut, _ in breaks if cut >= last), default=len(line))
+        return line[start:end].strip(' ,:')[:200]
+    return 'Not specified'
+
+
+# ========================================================================
+# EXTRACTOR
+# ========================================================================
+
+class JobDescriptionExtractor:
+    """Builds the taxonomy automaton once; extract() is then a single pass per line"""
+
+    def __init__(self):
+        self.automaton = AhoCorasick(
+            (alias, (canonical, category)) for alias, canonical, category in iter_aliases()
+        )
+
+    def extract(self, job_description: str) -> Dict[str, Any]:
+        """
+        Fill the lexical job analysis fields
+
+        Args:
+            job_description: Raw job posting
+
+        Returns:
+            dict: required_skills, nice_to_have_skills, important_keywords,
+                  experience_level, education_required and (when the
+                  posting has a responsibilities section) key_responsibilities.
+                  Fields it can't fill are left out.
+        """
+        lines = [line for line in job_description.splitlines() if line.strip()]
+
+        required: Dict[str, str] = {}   # canonical -> category
+        nice: Dict[str, str] = {}
+        mentions: Dict[str, int] = {}
+        first_seen: Dict[str, int] = {}
+        responsibilities: List[str] = []
+        section = None
+
+        for position, line in enumerate(lines):
+            kind, rest = _split_heading(line)
+            line_section = section
+            if kind:
+                # A bare heading opens a section; "Nice to have: Docker" labels only its own line
+                if not rest:
+                    section = kind
+                    continue
+                line, line_section = rest, kind
+
+            lowered = line.lower()
+            nice_spans = [(0, len(lowered))] if line_section == 'nice' else _nice_spans(lowered)
+
+            if line_section == 'responsibilities' and len(responsibilities) < 8:
+                cleaned = BULLET.sub('', line).strip().rstrip('.')
+                if len(cleaned) > 15:
+                    responsibilities.append(cleaned)
+
+            for start, _, (canonical, category) in self._matches(line):
+                mentions[canonical] = mentions.get(canonical, 0) + 1
+                first_seen.setdefault(canonical, position)
+                if line_section == 'other':
+                    continue  # e.g. "We offer: expertise in machine learning" - not a requirement
+                is_nice = any(low <= start < high for low, high in nice_spans)
+                (nice if is_nice else required)[canonical] = category
+
+        # A skill that is required anywhere is required
+        nice = {skill: category for skill, category in nice.items() if skill not in required}
+
+        def ordered(skills):
+            return sorted(skills, key=lambda s: first_seen[s])
+
+        result: Dict[str, Any] = {
+            'required_skills': ordered(required),
+            'nice_to_have_skills': ordered(nice),
+            'important_keywords': sorted(
+                (s for s in mentions if SOFT_CATEGORIES.isdisjoint({required.get(s), nice.get(s)})),
+                key=lambda s: (-mentions[s], first_seen[s])
+            )[:20],
+            'education_required': _education(lines),
+        }
+
+        experience = _experience_level(lines)
+        if experience:
+            result['experience_level'] = experience
+        if responsibilities:
+            result['key_responsibilities'] = responsibilities
+
+        return result
+
+    def _matches(self, text: str) -> List[Tuple[int, int, Any]]:
+        """Taxonomy matches in text, ambiguous list names included, in text order"""
+        matches = longest_word_matches(self.automaton, text.lower())
+        taken = [(start, end) for start, end, _ in matches]
+        extra = [m for m in list_name_matches(text)
+                 if not any(low < m[1] and m[0] < high for low, high in taken)]
+        return sorted(matches + extra) if extra else matches
+
+    def count_skills(self, text: str) -> Dict[str, int]:
+        """Canonical skill -> number of mentions in text"""
+        counts: Dict[str, int] = {}
+        for _, _, (canonical, _) in self._matches(text):
+            counts[canonical] = counts.get(canonical, 0) + 1
+        return counts
+
+
+# Singleton instance (the automaton is built once)
+_extractor = None
+
+def get_extractor() -> JobDescriptionExtractor:
+    """Get or create the shared JobDescriptionExtractor"""
+    global _extractor
+    if _extractor is None:
+        _extractor = JobDescriptionExtractor()
+    return _extractor
+
+
+def extract_job_requirements(job_description: str) -> Dict[str, Any]:
+    """Run the shared JobDescriptionExtractor (see JobDescriptionExtractor.extract)"""
+    return get_extractor().extract(job_description)
@@ -3,10 +3,22 @@ job_analyzer.py
 ---------------
 ONLY job analysis functionality.
 Imports BaseAgent - doesn't duplicate it!
+
+Environment:
+    JD_FAST_PATH               true | false (default: true) - extract skills,
+                               experience and education locally (jd_extractor.py)
+                               and ask the LLM only for the rest
+    JD_FAST_PATH_MIN_SKILLS    skills the extractor must find to trust it (default: 3)
 """
 
 from base_agent import BaseAgent  # Import the base!
+from jd_extractor import extract_job_requirements
+from skill_normalizer import normalize_output
+from structured_output import conform
+import asyncio
 import json
+import os
+import time
 
 
 class JobAnalyzerAgent(BaseAgent):
@@ -27,8 +39,11 @@ class JobAnalyzerAgent(BaseAgent):
         
         print("🔍 Analyzing Job Description...")
         print("-" * 60)
-        
-        prompt = f"""You are a job requirement analyzer. Analyze this job description.
+
+        try:
+            job_analysis = self._fast_path_analysis(job_description)
+            if job_analysis is None:
+                prompt = f"""You are a job requirement analyzer. Analyze this job description.
 
 Job Description:
 {job_description}
@@ -46,10 +61,9 @@ Extract and return the following in JSON format:
 
 Be thorough. Return ONLY the JSON, no other text."""
 
-        try:
-            response = self.model.generate_content(prompt)
-            response_text = response.text.replace('```json', '').replace('```', '').strip()
-            job_analysis = json.loads(response_text)
+                job_analysis = self._generate_json(prompt, tool='analyze_job_description')
+
+            normalize_output('analyze_job_description', job_analysis)
             
             print("✅ Analysis complete!")
             print(f"   Found {len(job_analysis.get('required_skills', []))} required skills")
@@ -62,6 +76,86 @@ Be thorough. Return ONLY the JSON, no other text."""
         except Exception as e:
             print(f"❌ Error: {e}")
             raise
+    
+    
+    def _fast_path_analysis(self, job_description: str):
+        """
+        Local extraction, with the LLM filling only what it can't
+
+        Skills, keywords, experience and education come from jd_extractor;
+        one short LLM call adds company_culture and key_responsibilities
+        (bullets under a "Responsibilities" heading take precedence), any
+        skills the taxonomy doesn't know (e.g. dbt, Looker) and the
+        experience level / education when the posting words them in a way
+        the regexes miss.
+
+        Returns:
+            dict: Job requirements, or None to fall back to the full LLM analysis
+        """
+        if os.getenv('JD_FAST_PATH', 'true').lower() in ('0', 'false', 'no'):
+            return None
+
+        start = time.perf_counter()
+        extracted = extract_job_requirements(job_description)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        found = len(extracted['required_skills']) + len(extracted['nice_to_have_skills'])
+
+        if found < int(os.getenv('JD_FAST_PATH_MIN_SKILLS', '3')):
+            print(f"↪️  Only {found} skill(s) found locally - using the full LLM analysis")
+            return None
+        print(f"⚡ Extracted {found} skills locally in {elapsed_ms:.1f} ms")
+
+        # Lexical gaps the LLM is asked to fill as well
+        gaps = {}
+        if not extracted.get('experience_level'):
+            gaps['experience_level'] = '"experience_level": "e.g., 2-3 years",'
+        if extracted.get('education_required', 'Not specified') == 'Not specified':
+            gaps['education_required'] = '"education_required": "degrees or certifications, or Not specified",'
+        gap_lines = ''.join(f"\n    {line}" for line in gaps.values())
+
+        prompt = f"""You are a job requirement analyzer. Analyze this job description.
+
+Job Description:
+{job_description}
+
+Skills have already been extracted.
+Required skills found: {json.dumps(extracted['required_skills'])}
+Nice-to-have skills found: {json.dumps(extracted['nice_to_have_skills'])}
+
+Return ONLY these fields in JSON format:
+{{{gap_lines}
+    "key_responsibilities": ["main", "duties"],
+    "company_culture": "brief description of culture if mentioned",
+    "other_required_skills": ["required skills NOT in the lists above"],
+    "other_nice_to_have_skills": ["nice-to-have skills NOT in the lists above"]
+}}
+
+Return ONLY the JSON, no other text."""
+
+        asked = list(gaps) + ['key_responsibilities', 'company_culture',
+                              'other_required_skills', 'other_nice_to_have_skills']
+        enrichment = self._generate_json(prompt, tool='enrich_job_description', fields=asked)
+
+        # Extracted fields win; the LLM only fills the gaps and adds skills
+        # outside the taxonomy
+        for field in gaps:
+            value = enrichment.get(field)
+            if isinstance(value, str) and value.strip():
+                extracted[field] = value.strip()
+        known = {s.lower() for s in extracted['required_skills'] + extracted['nice_to_have_skills']}
+        for field, extra in (('required_skills', enrichment.pop('other_required_skills', [])),
+                             ('nice_to_have_skills', enrichment.pop('other_nice_to_have_skills', []))):
+            for skill in extra:
+                if isinstance(skill, str) and skill.strip() and skill.strip().lower() not in known:
+                    extracted[field].append(skill.strip())
+                    known.add(skill.strip().lower())
+
+        return conform('analyze_job_description', {**enrichment, **extracted})
+    
+    
+    async def analyze_job_description_async(self, job_description: str) -> dict:
+        """Async version of analyze_job_description (runs in a worker thread)"""
+        return await asyncio.to_thread(self.analyze_job_description, job_description)
 
 
 # Test if this file runs standalone
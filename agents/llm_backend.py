@@ -0,0 +1,432 @@
+"""
+llm_backend.py
+--------------
+Pluggable LLM backends for BaseAgent and RAGEngine.
+
+    LLM_BACKEND=gemini   real Gemini calls (default)
+    LLM_BACKEND=replay   no network, no API key: deterministic responses
+                         from recorded cassettes, falling back to the
+                         fixtures in tests/sample_outputs and tests/templates
+    LLM_BACKEND=record   real Gemini calls, every response also saved to a
+                         cassette so it can be replayed later
+
+Replay mode lets us load-test and profile the whole server (Flask + agents
++ RAG) without burning quota, and run it in CI without network.
+
+Environment:
+    LLM_CASSETTE_DIR         where cassettes are read/written (default: ./llm_cassettes)
+    LLM_REPLAY_FIXTURES      fixture folder (default: tests/sample_outputs)
+    LLM_REPLAY_LATENCY_MS    simulated time per response (default: 0)
+    LLM_REPLAY_JITTER        +/- fraction of the latency (default: 0.2)
+    LLM_TIMEOUT_SECONDS      per-request Gemini timeout, if the SDK supports it (default: 60)
+"""
+
+import glob
+import hashlib
+import inspect
+import json
+import os
+import random
+import re
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Optional
+
+
+TESTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'tests')
+
+# genai.configure() is process-global; only redo it when the key changes
+_configured_api_key = None
+
+
+def llm_backend_mode() -> str:
+    """Backend selected by LLM_BACKEND (gemini | replay | record)"""
+    return os.getenv('LLM_BACKEND', 'gemini').strip().lower()
+
+
+def prompt_key(prompt: str) -> str:
+    """Cassette key for a prompt"""
+    return hashlib.sha256(prompt.encode('utf-8')).hexdigest()
+
+
+class LLMBackend:
+    """
+    Interface every backend implements
+
+    generate() returns the full response text; stream() returns an
+    iterator of text fragments. stream() must start the request before
+    returning (not lazily), so the scheduler's retries cover it.
+    """
+
+    name = 'base'
+    requires_api_key = False
+
+    def __init__(self, model_name: str):
+        self.model_name = model_name
+
+    @property
+    def model_id(self) -> str:
+        """Identifier used in cache keys (keeps replayed and real responses apart)"""
+        return self.model_name
+
+    def generate(self, prompt: str, config: Optional[Dict[str, Any]] = None) -> str:
+        raise NotImplementedError
+
+    def stream(self, prompt: str, config: Optional[Dict[str, Any]] = None) -> Iterator[str]:
+        return iter([self.generate(prompt, config)])
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": self.name, "model": self.model_name}
+
+
+# ========================================================================
+# GEMINI
+# ========================================================================
+
+class GeminiBackend(LLMBackend):
+    """Google Gemini via google-generativeai"""
+
+    name = 'gemini'
+    requires_api_key = True
+
+    def __init__(self, model_name: str, api_key: Optional[str] = None):
+        super().__init__(model_name)
+        import google.generativeai as genai
+
+        global _configured_api_key
+        api_key = api_key or os.getenv('GEMINI_API_KEY')
+        if _configured_api_key != api_key:
+            genai.configure(api_key=api_key)
+            _configured_api_key = api_key
+
+        self.model = genai.GenerativeModel(model_name)
+
+        # A hung request should fail (and count against the circuit breaker)
+        # rather than hold a worker thread; older SDKs have no request_options
+        self.request_options = None
+        if 'request_options' in inspect.signature(self.model.generate_content).parameters:
+            self.request_options = {'timeout': float(os.getenv('LLM_TIMEOUT_SECONDS', '60'))}
+
+    def _kwargs(self, config: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        kwargs = {'generation_config': config} if config else {}
+        if self.request_options:
+            kwargs['request_options'] = self.request_options
+        return kwargs
+
+    def generate(self, prompt: str, config: Optional[Dict[str, Any]] = None) -> str:
+        return self.model.generate_content(prompt, **self._kwargs(config)).text
+
+    def stream(self, prompt: str, config: Optional[Dict[str, Any]] = None) -> Iterator[str]:
+        response = self.model.generate_content(prompt, stream=True, **self._kwargs(config))
+        return (chunk.text for chunk in response)
+
+
+# ========================================================================
+# CASSETTES
+# ========================================================================
+
+class CassetteStore:
+    """
+    Recorded prompt -> response pairs, one JSON object per line
+
+    Every *.jsonl file in the folder is loaded; new recordings are appended
+    to cassettes.jsonl.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.path = os.path.join(directory, 'cassettes.jsonl')
+        self._responses: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+        for path in sorted(glob.glob(os.path.join(directory, '*.jsonl'))):
+            with open(path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        self._responses[entry['key']] = entry['response']
+
+    def __len__(self) -> int:
+        return len(self._responses)
+
+    def get(self, prompt: str) -> Optional[str]:
+        return self._responses.get(prompt_key(prompt))
+
+    def put(self, prompt: str, response: str, model_name: str) -> None:
+        entry = {'key': prompt_key(prompt), 'model': model_name,
+                 'prompt_preview': prompt[:200], 'response': response,
+                 'recorded_at': time.time()}
+        with self._lock:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(entry) + '\n')
+            self._responses[entry['key']] = response
+
+
+class RecordingBackend(LLMBackend):
+    """Wraps a live backend and saves every response to a cassette"""
+
+    name = 'record'
+    requires_api_key = True
+
+    def __init__(self, inner: LLMBackend, store: CassetteStore):
+        super().__init__(inner.model_name)
+        self.inner = inner
+        self.store = store
+        self.recorded = 0
+
+    @property
+    def model_id(self) -> str:
+        return self.inner.model_id
+
+    def generate(self, prompt: str, config: Optional[Dict[str, Any]] = None) -> str:
+        text = self.inner.generate(prompt, config)
+        self.store.put(prompt, text, self.model_name)
+        self.recorded += 1
+        return text
+
+    def stream(self, prompt: str, config: Optional[Dict[str, Any]] = None) -> Iterator[str]:
+        fragments = self.inner.stream(prompt, config)
+
+        def record():
+            parts = []
+            for fragment in fragments:
+                parts.append(fragment)
+                yield fragment
+            self.store.put(prompt, ''.join(parts), self.model_name)
+            self.recorded += 1
+
+        return record()
+
+    def stats(self) -> Dict[str, Any]:
+        return {**super().stats(), "recorded": self.recorded, "cassette": self.store.path}
+
+
+# ========================================================================
+# REPLAY
+# ========================================================================
+
+_SUGGESTIONS = """1. Quantify - Add numbers to your top achievements (users, latency, revenue, accuracy)
+2. Highlight - Move the skills the job lists first to the top of your skills section
+3. Reframe - Open each bullet with a strong action verb instead of "Responsible for"
+4. Include - Add links to your GitHub and portfolio in the header
+5. Add - Write a two-line summary targeted at the role's key responsibilities"""
+
+
+class ReplayBackend(LLMBackend):
+    """
+    Deterministic offline backend
+
+    A prompt recorded in a cassette gets its recorded response. Anything
+    else is answered from the fixtures, picked by what the prompt asks for
+    (job analysis, resume data, strategy, LaTeX, suggestions). The same
+    prompt always gets the same response.
+
+    Args:
+        model_name: Model being impersonated
+        store: Recorded cassettes
+        fixtures_dir: Folder of recorded analysis JSON files
+        latency_ms: Simulated time per response
+        jitter: +/- fraction of latency_ms, seeded by the prompt
+    """
+
+    name = 'replay'
+
+    def __init__(self, model_name: str, store: CassetteStore, fixtures_dir: str,
+                 latency_ms: float = 0.0, jitter: float = 0.2):
+        super().__init__(model_name)
+        self.store = store
+        self.latency_ms = latency_ms
+        self.jitter = jitter
+        self.fixtures = self._load_fixtures(fixtures_dir)
+        self.latex_bodies = self._load_latex(os.path.join(os.path.dirname(fixtures_dir), 'templates'))
+        self.cassette_hits = 0
+        self.fixture_hits = 0
+        self._lock = threading.Lock()
+
+    @property
+    def model_id(self) -> str:
+        return f"replay/{self.model_name}"
+
+    @staticmethod
+    def _load_fixtures(directory: str) -> Dict[str, List[dict]]:
+        """Collect job_analysis / resume_data / strategy examples"""
+        fixtures = {'job_analysis': [], 'resume_data': [], 'strategy': []}
+        for path in sorted(glob.glob(os.path.join(directory, '*.json'))):
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if not isinstance(data, dict):
+                continue
+            for kind in fixtures:
+                if isinstance(data.get(kind), dict):
+                    fixtures[kind].append(data[kind])
+            if 'required_skills' in data:
+                fixtures['job_analysis'].append(data)
+            elif 'contact_info' in data:
+                fixtures['resume_data'].append(data)
+        return fixtures
+
+    @staticmethod
+    def _load_latex(directory: str) -> List[str]:
+        """Document bodies of the generated resumes in tests/templates"""
+        bodies = []
+        for path in sorted(glob.glob(os.path.join(directory, '*.tex'))):
+            with open(path, 'r', encoding='utf-8', errors='replace') as f:
+                match = re.search(r'\\begin\{document\}(.*)\\end\{document\}', f.read(), re.DOTALL)
+            if match and '{{CONTENT}}' not in match.group(1):
+                bodies.append(match.group(1).strip())
+        return bodies or ["\\section{Summary}\n\\small{Replay backend - no LaTeX fixtures found.}"]
+
+    def _pick(self, items: list, prompt: str):
+        return items[int(prompt_key(prompt), 16) % len(items)] if items else {}
+
+    def _section(self, body: str, name: str) -> str:
+        """One \\section{...} of a LaTeX body ('header' = everything before the first)"""
+        parts = re.split(r'(?=\\section\{)', body)
+        if name == 'header':
+            return parts[0].strip()
+        for part in parts[1:]:
+            heading = re.match(r'\\section\{([^}]*)\}', part).group(1).lower()
+            if name in heading or heading in name:
+                return part.strip()
+        return f"\\section{{{name.title()}}}\n"
+
+    def _fixture_response(self, prompt: str) -> str:
+        """Answer a prompt we have no recording for"""
+        head = prompt[:200]  # the role line; later text may quote anything
+        if 'job requirement analyzer' in head:
+            return json.dumps(self._pick(self.fixtures['job_analysis'], prompt), indent=2)
+        if 'resume analyzer' in head:
+            return json.dumps(self._pick(self.fixtures['resume_data'], prompt), indent=2)
+        if 'resume strategist' in head:
+            return json.dumps(self._pick(self.fixtures['strategy'], prompt), indent=2)
+
+        section = re.search(r'Generate ONLY the (\w+) section', prompt)
+        if section:
+            return self._section(self._pick(self.latex_bodies, prompt), section.group(1).lower())
+        if 'LaTeX' in prompt:
+            return self._pick(self.latex_bodies, prompt)
+        if 'resume coach' in head:
+            return _SUGGESTIONS
+        return ("Tailored content (replay backend): emphasize measurable impact, "
+                "mirror the job description's keywords and keep each bullet to one line.")
+
+    def _delay(self, prompt: str) -> float:
+        """Simulated latency in seconds (deterministic per prompt)"""
+        if not self.latency_ms:
+            return 0.0
+        spread = random.Random(prompt_key(prompt)).uniform(-self.jitter, self.jitter)
+        return max(0.0, self.latency_ms * (1 + spread)) / 1000
+
+    def _respond(self, prompt: str) -> str:
+        recorded = self.store.get(prompt)
+        with self._lock:
+            if recorded is not None:
+                self.cassette_hits += 1
+            else:
+                self.fixture_hits += 1
+        return recorded if recorded is not None else self._fixture_response(prompt)
+
+    def generate(self, prompt: str, config: Optional[Dict[str, Any]] = None) -> str:
+        text = self._respond(prompt)
+        time.sleep(self._delay(prompt))
+        return text
+
+    def stream(self, prompt: str, config: Optional[Dict[str, Any]] = None) -> Iterator[str]:
+        text = self._respond(prompt)
+        size = 120
+        chunks = [text[i:i + size] for i in range(0, len(text), size)] or ['']
+        pause = self._delay(prompt) / len(chunks)
+
+        def emit():
+            for chunk in chunks:
+                time.sleep(pause)
+                yield chunk
+
+        return emit()
+
+    def stats(self) -> Dict[str, Any]:
+        return {**super().stats(), "cassettes": len(self.store),
+                "cassette_hits": self.cassette_hits, "fixture_hits": self.fixture_hits,
+                "latency_ms": self.latency_ms}
+
+
+# ========================================================================
+# LANGCHAIN ADAPTERS (RAGEngine)
+# ========================================================================
+
+def make_langchain_llm(backend: LLMBackend):
+    """LangChain LLM that answers through a backend (used when not on Gemini)"""
+    from langchain.llms.base import LLM
+
+    class BackendLLM(LLM):
+        backend: Any = None
+
+        @property
+        def _llm_type(self) -> str:
+            return f"alignai-{self.backend.name}"
+
+        def _call(self, prompt: str, stop: Optional[List[str]] = None,
+                  run_manager: Any = None, **kwargs: Any) -> str:
+            return self.backend.generate(prompt)
+
+    return BackendLLM(backend=backend)
+
+
+def make_deterministic_embeddings(dimensions: int = 256):
+    """
+    Hash-based LangChain embeddings (no network, same text -> same vector)
+
+    See embedding_backend.HashingEmbeddings.
+    """
+    from embedding_backend import HashingEmbeddings
+    return HashingEmbeddings(dimensions)
+
+
+# ========================================================================
+# FACTORY
+# ========================================================================
+
+_backends: Dict[tuple, LLMBackend] = {}
+_cassettes: Optional[CassetteStore] = None
+_backends_lock = threading.Lock()
+
+def get_llm_backend(model_name: str, api_key: Optional[str] = None) -> LLMBackend:
+    """
+    Get or create the backend for a model (one per model, shared by all agents)
+
+    Args:
+        model_name: Gemini model name
+        api_key: Overrides GEMINI_API_KEY (Gemini / record modes)
+
+    Returns:
+        LLMBackend for the mode in LLM_BACKEND
+    """
+    global _cassettes
+    mode = llm_backend_mode()
+    with _backends_lock:
+        backend = _backends.get((mode, model_name))
+        if backend is not None:
+            return backend
+
+        if mode in ('replay', 'record') and _cassettes is None:
+            _cassettes = CassetteStore(os.getenv('LLM_CASSETTE_DIR', './llm_cassettes'))
+
+        if mode == 'replay':
+            backend = ReplayBackend(
+                model_name, _cassettes,
+                fixtures_dir=os.getenv('LLM_REPLAY_FIXTURES', os.path.join(TESTS_DIR, 'sample_outputs')),
+                latency_ms=float(os.getenv('LLM_REPLAY_LATENCY_MS', '0')),
+                jitter=float(os.getenv('LLM_REPLAY_JITTER', '0.2'))
+            )
+            print(f"📼 Replay LLM backend ({len(_cassettes)} recorded responses)")
+        elif mode == 'record':
+            backend = RecordingBackend(GeminiBackend(model_name, api_key), _cassettes)
+            print(f"🔴 Recording LLM responses to {_cassettes.path}")
+        elif mode == 'gemini':
+            backend = GeminiBackend(model_name, api_key)
+        else:
+            raise ValueError(f"Unknown LLM_BACKEND '{mode}' (use gemini, replay or record)")
+
+        _backends[(mode, model_name)] = backend
+    return backend
@@ -0,0 +1,242 @@
+"""
+llm_cache.py
+------------
+Persistent, content-addressed cache for LLM responses.
+
+Every Gemini call made through BaseAgent is keyed on:
+- model name
+- generation config
+- SHA-256 of the prompt
+
+Responses are stored in a local SQLite file so repeated analyses of the
+same resume / job description come back in milliseconds instead of
+paying for another LLM round trip.
+
+Eviction:
+- TTL: entries older than `ttl_seconds` are treated as misses and removed
+- LRU: when the cache exceeds `max_entries` or `max_bytes`, the least
+  recently used entries are dropped first
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+
+
+class LLMCache:
+    """
+    SQLite-backed LRU + TTL cache for LLM responses
+
+    Thread-safe: one shared connection guarded by a lock, so it can be used
+    from every Flask worker thread.
+    """
+
+    def __init__(self, path: str = "./llm_cache/responses.db",
+                 ttl_seconds: int = 7 * 24 * 3600,
+                 max_entries: int = 5000,
+                 max_bytes: int = 200 * 1024 * 1024):
+        """
+        Open (or create) the cache database
+
+        Args:
+            path: SQLite file location
+            ttl_seconds: Maximum age of an entry before it expires
+            max_entries: Maximum number of cached responses
+            max_bytes: Maximum total size of cached responses
+        """
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                model TEXT NOT NULL,
+                response TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+        """)
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_responses_last_access ON responses(last_access)"
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(model_name: str, generation_config: Optional[Dict[str, Any]],
+                 prompt: str) -> str:
+        """
+        Build a content-addressed cache key
+
+        Args:
+            model_name: Gemini model name
+            generation_config: Generation parameters (temperature, etc.)
+            prompt: Full prompt text
+
+        Returns:
+            str: Hex digest identifying this exact request
+        """
+        prompt_hash = hashlib.sha256(prompt.encode('utf-8')).hexdigest()
+        config = json.dumps(generation_config or {}, sort_keys=True, default=str)
+        material = f"{model_name}\n{config}\n{prompt_hash}"
+        return hashlib.sha256(material.encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Look up a cached response
+
+        Returns:
+            str or None: Cached response text, None on miss or expiry
+        """
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+
+            if row is None:
+                self.misses += 1
+                return None
+
+            response, created_at = row
+            if now - created_at > self.ttl_seconds:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._conn.commit()
+                self.evictions += 1
+                self.misses += 1
+                return None
+
+            self._conn.execute(
+                "UPDATE responses SET last_access = ? WHERE key = ?", (now, key)
+            )
+            self._conn.commit()
+            self.hits += 1
+            return response
+
+    def put(self, key: str, model_name: str, response: str) -> None:
+        """
+        Store a response and enforce the size limits
+
+        Args:
+            key: Key from make_key()
+            model_name: Model that produced the response
+            response: Response text
+        """
+        now = time.time()
+        size = len(response.encode('utf-8'))
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses "
+                "(key, model, response, size, created_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, model_name, response, size, now, now)
+            )
+            self._evict(now)
+            self._conn.commit()
+
+    def _evict(self, now: float) -> None:
+        """Drop expired entries, then least recently used ones until under limits"""
+        cursor = self._conn.execute(
+            "DELETE FROM responses WHERE created_at < ?", (now - self.ttl_seconds,)
+        )
+        self.evictions += max(cursor.rowcount, 0)
+
+        count, total = self._conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+        ).fetchone()
+
+        while count > self.max_entries or total > self.max_bytes:
+            row = self._conn.execute(
+                "SELECT key, size FROM responses ORDER BY last_access ASC LIMIT 1"
+            ).fetchone()
+            if row is None:
+                break
+            self._conn.execute("DELETE FROM responses WHERE key = ?", (row[0],))
+            self.evictions += 1
+            count -= 1
+            total -= row[1]
+
+    def delete(self, key: str) -> None:
+        """Drop one response (e.g. one that turned out to be unusable)"""
+        with self._lock:
+            self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self._conn.commit()
+
+    def clear(self) -> None:
+        """Remove every cached response"""
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Cache counters for monitoring
+
+        Returns:
+            dict: hits, misses, hit rate, evictions, entries and bytes stored
+        """
+        with self._lock:
+            count, total = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+            ).fetchone()
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "evictions": self.evictions,
+                "entries": count,
+                "bytes": total,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "ttl_seconds": self.ttl_seconds
+            }
+
+
+# Singleton instance
+_llm_cache = None
+_llm_cache_lock = threading.Lock()
+
+def get_llm_cache() -> Optional[LLMCache]:
+    """
+    Get or create the process-wide LLM cache
+
+    Configured from the environment:
+        LLM_CACHE_ENABLED      (default: true)
+        LLM_CACHE_PATH         (default: ./llm_cache/responses.db)
+        LLM_CACHE_TTL          seconds (default: 7 days)
+        LLM_CACHE_MAX_ENTRIES  (default: 5000)
+        LLM_CACHE_MAX_MB       (default: 200)
+
+    Returns:
+        LLMCache or None if caching is disabled
+    """
+    global _llm_cache
+    if os.getenv('LLM_CACHE_ENABLED', 'true').lower() in ('0', 'false', 'no'):
+        return None
+
+    with _llm_cache_lock:
+        if _llm_cache is None:
+            _llm_cache = LLMCache(
+                path=os.getenv('LLM_CACHE_PATH', './llm_cache/responses.db'),
+                ttl_seconds=int(os.getenv('LLM_CACHE_TTL', str(7 * 24 * 3600))),
+                max_entries=int(os.getenv('LLM_CACHE_MAX_ENTRIES', '5000')),
+                max_bytes=int(os.getenv('LLM_CACHE_MAX_MB', '200')) * 1024 * 1024
+            )
+    return _llm_cache
@@ -0,0 +1,177 @@
+"""
+model_router.py
+---------------
+Per-tool model routing.
+
+Not every tool needs the same model: pulling JSON out of a job description
+is easy work for a small, fast model, while writing the final LaTeX
+benefits from a stronger one. The routing table maps each tool to a model
+tier plus its own max output tokens and temperature. When a tier's output
+fails schema validation, BaseAgent._generate_json() retries one tier up.
+
+Every call is recorded per route (tool -> model): calls, errors, latency
+and fallbacks, served at GET /api/agent/metrics.
+
+Environment:
+    MODEL_ROUTING              true | false (default: true; false = every tool on 'flash')
+    MODEL_TIER_LITE            model for the lite tier  (default: gemini-2.5-flash-lite)
+    MODEL_TIER_FLASH           model for the flash tier (default: gemini-2.5-flash)
+    MODEL_TIER_PRO             model for the pro tier   (default: gemini-2.5-pro)
+    MODEL_ROUTE_<TOOL>         tier override, e.g. MODEL_ROUTE_ANALYZE_RESUME=flash
+"""
+
+import os
+import threading
+from typing import Any, Dict, Optional
+
+
+# Cheapest first; fallbacks move right
+TIER_ORDER = ['lite', 'flash', 'pro']
+
+DEFAULT_TIER_MODELS = {
+    'lite': 'gemini-2.5-flash-lite',
+    'flash': 'gemini-2.5-flash',
+    'pro': 'gemini-2.5-pro',
+}
+
+
+class Route:
+    """
+    How one tool calls the model
+
+    Args:
+        tier: Model tier (see TIER_ORDER)
+        max_output_tokens: Output cap (None = model default). On 2.5 models
+                           this also covers thinking tokens, so keep headroom.
+        temperature: Sampling temperature (None = model default)
+    """
+
+    def __init__(self, tier: str, max_output_tokens: Optional[int] = None,
+                 temperature: Optional[float] = None):
+        self.tier = tier
+        self.max_output_tokens = max_output_tokens
+        self.temperature = temperature
+
+    def generation_config(self) -> Dict[str, Any]:
+        config = {}
+        if self.max_output_tokens is not None:
+            config['max_output_tokens'] = self.max_output_tokens
+        if self.temperature is not None:
+            config['temperature'] = self.temperature
+        return config
+
+
+# Tool name -> route ('generate_section:skills' uses 'generate_section')
+ROUTES = {
+    'analyze_job_description': Route('lite', max_output_tokens=4096, temperature=0.1),
+    'enrich_job_description': Route('lite', max_output_tokens=2048, temperature=0.1),
+    'analyze_resume': Route('lite', max_output_tokens=8192, temperature=0.1),
+    'enrich_resume': Route('lite', max_output_tokens=8192, temperature=0.1),
+    'create_matching_strategy': Route('flash', max_output_tokens=8192, temperature=0.4),
+    'generate_tailored_resume': Route('flash', max_output_tokens=16384, temperature=0.6),
+    'generate_section': Route('flash', max_output_tokens=4096, temperature=0.6),
+    'get_suggestions': Route('lite', max_output_tokens=2048, temperature=0.7),
+}
+
+DEFAULT_ROUTE = Route('flash')
+
+
+class RouteStats:
+    """Counters for one tool -> model route"""
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.fallbacks = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "error_rate": round(self.errors / self.calls, 3) if self.calls else 0.0,
+            "avg_ms": round(self.total_ms / self.calls, 1) if self.calls else 0.0,
+            "max_ms": round(self.max_ms, 1),
+            "fallbacks_to_bigger_tier": self.fallbacks,
+        }
+
+
+class ModelRouter:
+    """Resolves tools to models and keeps per-route metrics"""
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self.tier_models = {tier: os.getenv(f'MODEL_TIER_{tier.upper()}', model)
+                            for tier, model in DEFAULT_TIER_MODELS.items()}
+        self._stats: Dict[str, RouteStats] = {}
+        self._lock = threading.Lock()
+
+    def route(self, tool: Optional[str]) -> Route:
+        """Route for a tool (DEFAULT_ROUTE for unknown tools or when routing is off)"""
+        if not self.enabled or not tool:
+            return DEFAULT_ROUTE
+        base = tool.split(':', 1)[0]
+        route = ROUTES.get(base, DEFAULT_ROUTE)
+        override = os.getenv(f'MODEL_ROUTE_{base.upper()}')
+        if override in self.tier_models:
+            route = Route(override, route.max_output_tokens, route.temperature)
+        return route
+
+    def model_for(self, tier: str) -> str:
+        return self.tier_models.get(tier, self.tier_models['flash'])
+
+    def next_tier(self, tier: str) -> Optional[str]:
+        """One tier up, or None if already at the top"""
+        index = TIER_ORDER.index(tier) if tier in TIER_ORDER else len(TIER_ORDER) - 1
+        return TIER_ORDER[index + 1] if index + 1 < len(TIER_ORDER) else None
+
+    def _entry(self, tool: str, model: str) -> RouteStats:
+        key = f"{(tool or 'default').split(':', 1)[0]} -> {model}"
+        if key not in self._stats:
+            self._stats[key] = RouteStats()
+        return self._stats[key]
+
+    def record(self, tool: str, model: str, elapsed_ms: float, ok: bool) -> None:
+        """Record one upstream call"""
+        with self._lock:
+            entry = self._entry(tool, model)
+            entry.calls += 1
+            entry.total_ms += elapsed_ms
+            entry.max_ms = max(entry.max_ms, elapsed_ms)
+            if not ok:
+                entry.errors += 1
+
+    def record_fallback(self, tool: str, model: str) -> None:
+        """Record that a route's output failed validation and was escalated"""
+        with self._lock:
+            self._entry(tool, model).fallbacks += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Per-route metrics
+
+        Returns:
+            dict: enabled flag, tier -> model map and one entry per route
+        """
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "tiers": dict(self.tier_models),
+                "routes": {key: entry.to_dict() for key, entry in sorted(self._stats.items())}
+            }
+
+
+# Singleton instance
+_router = None
+_router_lock = threading.Lock()
+
+def get_model_router() -> ModelRouter:
+    """Get or create the process-wide model router"""
+    global _router
+    with _router_lock:
+        if _router is None:
+            _router = ModelRouter(
+                enabled=os.getenv('MODEL_ROUTING', 'true').lower() not in ('0', 'false', 'no')
+            )
+    return _router
@@ -0,0 +1,387 @@
+"""
+pipeline.py
+-----------
+The four-tool workflow, declared once as a DAG.
+
+    analyze_job_description ─┐
+                             ├─> create_matching_strategy ─> generate_tailored_resume
+    analyze_resume ──────────┘
+
+Tool #1 and Tool #2 don't depend on each other, so they run at the same
+time; every other node starts as soon as its inputs are ready.
+
+Every pipeline entry point (StrategyAgent.run_complete_analysis,
+ResumeGeneratorAgent.run_complete_pipeline and the Flask handlers) goes
+through build_resume_pipeline(), so concurrency, retries, timeouts and
+memoization are configured here and nowhere else. stream_pipeline() runs
+the same DAG but yields an event as each stage finishes and each LaTeX
+fragment is written; stream_latex() streams Tool #4 alone.
+
+Under a request deadline (deadline.py) each stage may use what's left
+after reserving time for the cheapest path of every later stage, so a
+tight budget degrades the tail first. A stage whose expected cost
+doesn't fit, or that runs out of time, falls back to a cheaper path
+(sectioned LaTeX, the local stand-ins from degraded.py) or is skipped,
+and the result carries a 'deadline' report saying which. Fallback
+outputs are never memoized.
+
+Environment:
+    RESUME_GENERATION_MODE     single | sectioned (default: single)
+    PIPELINE_MAX_CONCURRENCY   (default: 4)
+    PIPELINE_NODE_RETRIES      (default: 1)
+    PIPELINE_NODE_TIMEOUT      seconds per attempt (default: 120)
+    PIPELINE_MEMOIZE           (default: true)
+"""
+
+import asyncio
+import functools
+import os
+import queue
+import threading
+from deadline import DeadlineExceeded, current_deadline, deadline_scope, expected_seconds, stage_budget
+from degraded import degraded_job_analysis, degraded_resume_analysis, degraded_strategy_from_analysis
+from pipeline_dag import Node, PipelineDAG, Unmemoized
+from skill_normalizer import with_skill_fingerprints
+
+
+def _deadline_stage(stage: str, paths, fallback=None, downstream=()):
+    """
+    Wrap a stage so it respects the request deadline
+
+    Args:
+        stage: Node name, for the deadline report
+        paths: [(tool, async_func), ...] from best to cheapest
+        fallback: Local (non-LLM) function with the same arguments, or None
+                  to skip the stage when no path fits
+        downstream: Later stages' tools, for stage_budget (time kept in reserve)
+
+    Returns:
+        Async function with the first path's name (keeps memo keys stable);
+        anything but the first path's output is returned as Unmemoized
+    """
+    @functools.wraps(paths[0][1])
+    async def run(**kwargs):
+        deadline = current_deadline()
+        if deadline is None:
+            return await paths[0][1](**kwargs)
+
+        reason = None
+        for i, (tool, func) in enumerate(paths):
+            budget = stage_budget(downstream)
+            expected = expected_seconds(tool)
+            if expected > budget:
+                reason = f"{tool} needs ~{expected:.0f}s, {budget:.0f}s available"
+                continue
+            try:
+                output = await asyncio.wait_for(func(**kwargs), timeout=budget)
+            except (asyncio.TimeoutError, DeadlineExceeded):
+                # The worker thread can't be cancelled; its result still lands in the LLM cache
+                reason = f"{tool} ran past its {budget:.0f}s"
+                break
+            if i:
+                deadline.degrade(stage, f"{reason}; used {tool}")
+                return Unmemoized(output)
+            return output
+
+        if fallback is None:
+            deadline.skip(stage, reason)
+            return Unmemoized(None)
+        deadline.degrade(stage, f"{reason}; used local fallback")
+        return Unmemoized(fallback(**kwargs))
+
+    return run
+
+
+def _strategy_memo_inputs(kwargs: dict) -> dict:
+    """Strategy memo key: skill lists compared as sets, so reordered or respelled skills still hit"""
+    return {
+        'job_analysis': with_skill_fingerprints('analyze_job_description', kwargs['job_analysis']),
+        'resume_data': with_skill_fingerprints('analyze_resume', kwargs['resume_data']),
+    }
+
+
+def _streaming_latex(agent, on_chunk):
+    """
+    Tool #4 as a node that hands each LaTeX fragment to on_chunk as the
+    model writes it, and returns the whole document
+
+    Joining the fragments gives what generate_tailored_resume returns, so
+    the node keeps that name and shares its memo entries. A retry first
+    calls on_chunk(None) so the consumer can drop what it already got; an
+    attempt abandoned by the node timeout stops forwarding fragments.
+    The stream runs without the request deadline (it isn't cut off once
+    it starts).
+    """
+    state = {'attempt': 0}
+
+    @functools.wraps(agent.generate_tailored_resume_async)
+    def run(resume_data, strategy, job_analysis):
+        state['attempt'] += 1
+        attempt = state['attempt']
+        if attempt > 1:
+            on_chunk(None)
+        parts = []
+        with deadline_scope(None):
+            for chunk in agent.generate_tailored_resume_stream(resume_data, strategy, job_analysis):
+                if state['attempt'] != attempt:
+                    break  # timed out; a newer attempt owns the stream
+                if chunk:
+                    parts.append(chunk)
+                    on_chunk(chunk)
+        return ''.join(parts)
+
+    return run
+
+
+def build_resume_pipeline(agent, generate_latex: bool = True,
+                          latex_mode: str = None, on_latex_chunk=None) -> PipelineDAG:
+    """
+    Declare the tool nodes for an agent
+
+    Args:
+        agent: StrategyAgent (Tools 1-3) or ResumeGeneratorAgent (all four)
+        generate_latex: Include Tool #4
+        latex_mode: 'single' (one LLM call) or 'sectioned' (one call per
+                    section, in parallel); defaults to RESUME_GENERATION_MODE
+        on_latex_chunk: Stream Tool #4 instead, calling this with each
+                        LaTeX fragment (see _streaming_latex)
+
+    Returns:
+        PipelineDAG ready to run with job_description= and resume_text=
+    """
+    retries = int(os.getenv('PIPELINE_NODE_RETRIES', '1'))
+    timeout = float(os.getenv('PIPELINE_NODE_TIMEOUT', '120'))
+
+    latex_tools = []
+    if generate_latex and on_latex_chunk is not None:
+        latex_func = _streaming_latex(agent, on_latex_chunk)
+    elif generate_latex:
+        latex_mode = latex_mode or os.getenv('RESUME_GENERATION_MODE', 'single')
+        latex_paths = [('generate_section', agent.generate_tailored_resume_sectioned_async)]
+        if latex_mode != 'sectioned':
+            latex_paths.insert(0, ('generate_tailored_resume', agent.generate_tailored_resume_async))
+        # Keep time for LaTeX's cheapest path; the strategy has a local fallback
+        latex_tools = [tuple(tool for tool, _ in latex_paths)]
+        latex_func = _deadline_stage('latex', latex_paths)
+
+    nodes = [
+        Node('job_analysis',
+             _deadline_stage('job_analysis',
+                             [('analyze_job_description', agent.analyze_job_description_async)],
+                             fallback=degraded_job_analysis, downstream=latex_tools),
+             inputs=['job_description'], retries=retries, timeout=timeout),
+        Node('resume_data',
+             _deadline_stage('resume_data', [('analyze_resume', agent.analyze_resume_async)],
+                             fallback=degraded_resume_analysis, downstream=latex_tools),
+             inputs=['resume_text'], retries=retries, timeout=timeout),
+        Node('strategy',
+             _deadline_stage('strategy',
+                             [('create_matching_strategy', agent.create_matching_strategy_async)],
+                             fallback=degraded_strategy_from_analysis, downstream=latex_tools),
+             inputs=['job_analysis', 'resume_data'], retries=retries, timeout=timeout,
+             memo_inputs=_strategy_memo_inputs),
+    ]
+
+    if generate_latex:
+        nodes.append(
+            Node('latex', latex_func,
+                 inputs=['resume_data', 'strategy', 'job_analysis'],
+                 retries=retries, timeout=timeout)
+        )
+
+    return _dag(nodes, agent)
+
+
+def _dag(nodes, agent) -> PipelineDAG:
+    return PipelineDAG(
+        nodes,
+        max_concurrency=int(os.getenv('PIPELINE_MAX_CONCURRENCY', '4')),
+        memoize=os.getenv('PIPELINE_MEMOIZE', 'true').lower() not in ('0', 'false', 'no'),
+        namespace=getattr(agent, 'model_name', '')
+    )
+
+
+def _flatten(result: dict) -> dict:
+    """Turn DAG output into the pipeline's response shape"""
+    flat = dict(result["outputs"])
+    flat["timings"] = result["timings"]
+    deadline = current_deadline()
+    if deadline is not None:
+        flat["deadline"] = deadline.report()
+    return flat
+
+
+async def run_analysis_async(agent, job_description: str, resume_text: str) -> dict:
+    """
+    Run Tools 1-3, with Tools 1 and 2 in parallel
+
+    Args:
+        agent: StrategyAgent (or subclass)
+        job_description: The job posting text
+        resume_text: The candidate's resume text
+
+    Returns:
+        dict: job_analysis, resume_data, strategy and per-node timings
+    """
+    return await run_pipeline_async(agent, job_description, resume_text, generate_latex=False)
+
+
+async def run_pipeline_async(agent, job_description: str, resume_text: str,
+                             generate_latex: bool = True, latex_mode: str = None) -> dict:
+    """
+    Run the full pipeline, waiting only where the data depends on it
+
+    Args:
+        agent: ResumeGeneratorAgent (or StrategyAgent if generate_latex=False)
+        job_description: The job posting text
+        resume_text: The candidate's resume text
+        generate_latex: Also run Tool #4
+        latex_mode: 'single' or 'sectioned' (see build_resume_pipeline)
+
+    Returns:
+        dict: job_analysis, resume_data, strategy, (optionally) latex, timings
+              and, under a request deadline, the deadline report (latex is
+              None if it was skipped)
+    """
+    dag = build_resume_pipeline(agent, generate_latex, latex_mode)
+    result = await dag.run_async(job_description=job_description, resume_text=resume_text)
+    return _flatten(result)
+
+
+def run_pipeline(agent, job_description: str, resume_text: str,
+                 generate_latex: bool = True, latex_mode: str = None) -> dict:
+    """
+    Synchronous entry point for Flask handlers and scripts
+
+    Same arguments and return value as run_pipeline_async().
+    """
+    dag = build_resume_pipeline(agent, generate_latex, latex_mode)
+    return _flatten(dag.run(job_description=job_description, resume_text=resume_text))
+
+
+def stream_pipeline(agent, job_description: str, resume_text: str,
+                    heartbeat_seconds: float = 15.0, deadline_seconds: float = None):
+    """
+    Run the full pipeline, yielding progress events as stages finish
+
+    Events (name, payload), in the order the data becomes available:
+        job_analysis / resume_data   {'data': ..., 'timing': ...}  (either order)
+        strategy                     {'data': ..., 'timing': ...}
+        latex_chunk                  {'index': n, 'chunk': '...'}
+        latex_reset                  {}  (Tool #4 is being retried: drop the
+                                          chunks received so far)
+        done                         {'timings': {...}, 'latex_length': n,
+                                      'deadline': report or None}
+        error                        {'error': '...', 'stage': '...'}
+        heartbeat                    None  (keeps proxies from timing out)
+
+    All four tools are DAG nodes (build_resume_pipeline), so Tool #4 gets
+    the same memoization, retries and timeout; a memoized document comes
+    as a single latex_chunk.
+
+    Args:
+        agent: ResumeGeneratorAgent
+        job_description: The job posting text
+        resume_text: The candidate's resume text
+        heartbeat_seconds: Idle time before a heartbeat is emitted
+        deadline_seconds: Budget for Tools 1-3 (None = no deadline). The
+                          LaTeX stream itself isn't cut off once it starts.
+
+    Yields:
+        tuple: (event_name, payload)
+    """
+    events = queue.Queue()
+
+    def on_latex_chunk(chunk):
+        events.put(("latex_reset", {}) if chunk is None else ("latex_chunk", chunk))
+
+    def on_node_complete(name, output, timing):
+        if name != "latex":
+            events.put((name, {"data": output, "timing": timing}))
+        elif timing.get("memoized") and output:
+            events.put(("latex_chunk", output))
+
+    def run():
+        try:
+            # A new thread starts with an empty context, so open the scope here
+            with deadline_scope(deadline_seconds) as deadline:
+                dag = build_resume_pipeline(agent, on_latex_chunk=on_latex_chunk)
+                result = dag.run(on_node_complete,
+                                 job_description=job_description, resume_text=resume_text)
+                result["deadline"] = deadline.report() if deadline else None
+            events.put(("_complete", result))
+        except Exception as e:
+            events.put(("error", {"error": str(e), "stage": getattr(e, 'node_name', None)}))
+
+    # The DAG runs in a worker thread so we can yield while it works
+    threading.Thread(target=run, daemon=True).start()
+
+    index = 0
+    while True:
+        try:
+            event, payload = events.get(timeout=heartbeat_seconds)
+        except queue.Empty:
+            yield "heartbeat", None
+            continue
+
+        if event == "error":
+            yield event, payload
+            return
+        if event == "_complete":
+            break
+        if event == "latex_chunk":
+            yield event, {"index": index, "chunk": payload}
+            index += 1
+            continue
+        if event == "latex_reset":
+            index = 0
+        yield event, payload
+
+    yield "done", {"timings": payload["timings"],
+                   "latex_length": len(payload["outputs"].get("latex") or ''),
+                   "deadline": payload["deadline"]}
+
+
+def stream_latex(agent, resume_data: dict, strategy: dict, job_analysis: dict):
+    """
+    Tool #4 alone, as a one-node DAG, yielding LaTeX fragments as they are written
+
+    For a plain file download: bytes already sent can't be taken back, so
+    the node isn't retried. A memoized document comes as one fragment.
+
+    Args:
+        agent: ResumeGeneratorAgent
+        resume_data / strategy / job_analysis: Outputs of Tools 1-3
+
+    Yields:
+        str: LaTeX fragments, in document order
+
+    Raises:
+        PipelineNodeError: Tool #4 failed or timed out
+    """
+    fragments = queue.Queue()
+    finished = object()
+
+    def on_node_complete(name, output, timing):
+        if timing.get("memoized") and output:
+            fragments.put(output)
+
+    def run():
+        try:
+            node = Node('latex', _streaming_latex(agent, fragments.put),
+                        inputs=['resume_data', 'strategy', 'job_analysis'],
+                        timeout=float(os.getenv('PIPELINE_NODE_TIMEOUT', '120')))
+            _dag([node], agent).run(on_node_complete, resume_data=resume_data,
+                                    strategy=strategy, job_analysis=job_analysis)
+            fragments.put(finished)
+        except Exception as e:
+            fragments.put(e)
+
+    threading.Thread(target=run, daemon=True).start()
+    while True:
+        item = fragments.get()
+        if item is finished:
+            return
+        if isinstance(item, Exception):
+            raise item
+        yield item
@@ -0,0 +1,301 @@
+"""
+pipeline_dag.py
+---------------
+Small declarative DAG executor for agent workflows.
+
+Each tool is declared as a Node with the names of its inputs. An input
+is either another node's output or a value passed to run(). The engine:
+- starts every node as soon as all of its inputs are available
+- memoizes node outputs by a hash of their inputs (with the LLM cache's
+  TTL, and never while LLM_CACHE_ENABLED=false)
+- retries failed nodes and enforces a per-node timeout (calls refused by
+  the circuit breaker or past the request deadline are not retried)
+- reports per-node timing (and an optional callback as each node finishes)
+
+Example:
+    dag = PipelineDAG([
+        Node('job_analysis', agent.analyze_job_description_async, ['job_description']),
+        Node('resume_data', agent.analyze_resume_async, ['resume_text']),
+        Node('strategy', agent.create_matching_strategy_async, ['job_analysis', 'resume_data']),
+    ])
+    result = dag.run(job_description=jd, resume_text=resume)
+    result['outputs']['strategy'], result['timings']['strategy']
+"""
+
+import asyncio
+import copy
+import hashlib
+import inspect
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional
+
+from circuit_breaker import CircuitOpenError
+from deadline import DeadlineExceeded
+
+
+# Failures a retry can't fix: the breaker is open, or the request is out of time
+NO_RETRY_ERRORS = (CircuitOpenError, DeadlineExceeded)
+
+
+class PipelineNodeError(Exception):
+    """Raised when a node still fails after all of its retries"""
+
+    def __init__(self, node_name: str, error: Exception):
+        super().__init__(f"Pipeline node '{node_name}' failed: {error or type(error).__name__}")
+        self.node_name = node_name
+        self.error = error
+
+
+class Node:
+    """
+    One step of a pipeline
+
+    Args:
+        name: Output name (other nodes refer to it as an input)
+        func: Callable taking the inputs as keyword arguments.
+              Coroutine functions are awaited, plain functions run in a thread.
+        inputs: Names of nodes / run() arguments this node needs
+        retries: Extra attempts after a failure
+        timeout: Seconds allowed per attempt (None = no limit)
+        memoize: Reuse the output for identical inputs
+        memo_inputs: Maps the inputs to what the memo key is hashed from
+                     (default: the inputs as given)
+    """
+
+    def __init__(self, name: str, func: Callable, inputs: Optional[List[str]] = None,
+                 retries: int = 0, timeout: Optional[float] = None, memoize: bool = True,
+                 memo_inputs: Optional[Callable[[Dict[str, Any]], Dict[str, Any]]] = None):
+        self.name = name
+        self.func = func
+        self.inputs = list(inputs or [])
+        self.retries = retries
+        self.timeout = timeout
+        self.memoize = memoize
+        self.memo_inputs = memo_inputs
+
+
+class Unmemoized:
+    """
+    Node output that must not be memoized
+
+    A node returns its value wrapped in this when it took a fallback path
+    (e.g. under a request deadline): the value is passed on as usual but
+    must not be served later in place of the node's normal result.
+    """
+
+    __slots__ = ('value',)
+
+    def __init__(self, value: Any):
+        self.value = value
+
+
+class NodeMemo:
+    """
+    Thread-safe LRU map from input hash to node output (shared by all DAGs)
+
+    Args:
+        max_entries: Outputs kept
+        ttl_seconds: Age after which an output is a miss (same as the LLM cache)
+    """
+
+    def __init__(self, max_entries: int = 256, ttl_seconds: float = 7 * 24 * 3600):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()  # key -> (stored_at, value)
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        with self._lock:
+            if key not in self._entries:
+                return None, False
+            stored_at, value = self._entries[key]
+            if time.monotonic() - stored_at > self.ttl_seconds:
+                del self._entries[key]
+                return None, False
+            self._entries.move_to_end(key)
+            # Copy so callers can't mutate the memoized value
+            return copy.deepcopy(value), True
+
+    def put(self, key: str, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+_node_memo = NodeMemo(ttl_seconds=int(os.getenv('LLM_CACHE_TTL', str(7 * 24 * 3600))))
+
+
+def memo_enabled() -> bool:
+    """Node memoization follows the LLM cache: off when LLM_CACHE_ENABLED=false"""
+    return os.getenv('LLM_CACHE_ENABLED', 'true').lower() not in ('0', 'false', 'no')
+
+
+def hash_inputs(namespace: str, node_name: str, inputs: Dict[str, Any]) -> str:
+    """
+    Stable hash of a node's inputs
+
+    Args:
+        namespace: Distinguishes otherwise identical nodes (e.g. model name)
+        node_name: Node being memoized
+        inputs: Keyword arguments the node will receive
+
+    Returns:
+        str: Hex digest
+    """
+    payload = json.dumps(inputs, sort_keys=True, default=str)
+    return hashlib.sha256(f"{namespace}\n{node_name}\n{payload}".encode('utf-8')).hexdigest()
+
+
+class PipelineDAG:
+    """
+    Dependency-driven executor for a set of Nodes
+
+    Args:
+        nodes: Node definitions (any order)
+        max_concurrency: Maximum nodes running at once (None = unlimited)
+        memoize: Enable output memoization for nodes that allow it
+        namespace: Prefix for memo keys
+        retry_backoff: Seconds before the first retry (doubles each time)
+    """
+
+    def __init__(self, nodes: List[Node], max_concurrency: Optional[int] = None,
+                 memoize: bool = True, namespace: str = "",
+                 retry_backoff: float = 0.5):
+        self.nodes = {node.name: node for node in nodes}
+        self.max_concurrency = max_concurrency
+        self.memoize = memoize
+        self.namespace = namespace
+        self.retry_backoff = retry_backoff
+        self._check_graph()
+
+    def _check_graph(self) -> None:
+        """Reject cycles early (unknown inputs are checked in run())"""
+        visiting, done = set(), set()
+
+        def visit(name):
+            if name in done or name not in self.nodes:
+                return
+            if name in visiting:
+                raise ValueError(f"Pipeline has a cycle through '{name}'")
+            visiting.add(name)
+            for dep in self.nodes[name].inputs:
+                visit(dep)
+            visiting.discard(name)
+            done.add(name)
+
+        for name in self.nodes:
+            visit(name)
+
+    async def run_async(self, on_node_complete: Optional[Callable] = None,
+                        **initial_inputs) -> Dict[str, Any]:
+        """
+        Execute the pipeline
+
+        Args:
+            on_node_complete: Optional callback(name, output, timing) fired
+                              as each node finishes
+            **initial_inputs: Values for inputs that aren't nodes
+
+        Returns:
+            dict: {'outputs': {node: output}, 'timings': {node: timing}}
+        """
+        for node in self.nodes.values():
+            missing = [dep for dep in node.inputs
+                       if dep not in self.nodes and dep not in initial_inputs]
+            if missing:
+                raise ValueError(f"Node '{node.name}' is missing inputs: {missing}")
+
+        semaphore = asyncio.Semaphore(self.max_concurrency) if self.max_concurrency else None
+        outputs: Dict[str, Any] = {}
+        timings: Dict[str, Dict[str, Any]] = {}
+        tasks: Dict[str, asyncio.Task] = {}
+        pipeline_start = time.perf_counter()
+
+        async def execute(node: Node):
+            # Wait only for the nodes this one actually depends on
+            deps = [tasks[dep] for dep in node.inputs if dep in tasks]
+            if deps:
+                await asyncio.gather(*deps)
+
+            kwargs = {dep: outputs[dep] if dep in self.nodes else initial_inputs[dep]
+                      for dep in node.inputs}
+
+            if semaphore:
+                async with semaphore:
+                    output, timing = await self._run_node(node, kwargs)
+            else:
+                output, timing = await self._run_node(node, kwargs)
+
+            timing['finished_at_ms'] = round((time.perf_counter() - pipeline_start) * 1000, 1)
+            outputs[node.name] = output
+            timings[node.name] = timing
+
+            if on_node_complete:
+                on_node_complete(node.name, output, timing)
+
+        for node in self.nodes.values():
+            tasks[node.name] = asyncio.ensure_future(execute(node))
+
+        try:
+            await asyncio.gather(*tasks.values())
+        except Exception:
+            for task in tasks.values():
+                task.cancel()
+            raise
+
+        return {"outputs": outputs, "timings": timings}
+
+    def run(self, on_node_complete: Optional[Callable] = None, **initial_inputs) -> Dict[str, Any]:
+        """Synchronous wrapper around run_async()"""
+        return asyncio.run(self.run_async(on_node_complete, **initial_inputs))
+
+    async def _run_node(self, node: Node, kwargs: Dict[str, Any]):
+        """Run one node with memoization, timeout and retries"""
+        use_memo = self.memoize and node.memoize and memo_enabled()
+        # Include the function name so alternative implementations of a node don't collide
+        memo_name = f"{node.name}:{getattr(node.func, '__name__', '')}"
+        key_inputs = node.memo_inputs(kwargs) if use_memo and node.memo_inputs else kwargs
+        key = hash_inputs(self.namespace, memo_name, key_inputs) if use_memo else None
+
+        if use_memo:
+            cached, found = _node_memo.get(key)
+            if found:
+                return cached, {"ms": 0.0, "attempts": 0, "memoized": True}
+
+        start = time.perf_counter()
+        attempts = 0
+        while True:
+            attempts += 1
+            try:
+                output = await asyncio.wait_for(self._call(node, kwargs), timeout=node.timeout)
+                break
+            except Exception as e:
+                if attempts > node.retries or isinstance(e, NO_RETRY_ERRORS):
+                    raise PipelineNodeError(node.name, e) from e
+                reason = "timed out" if isinstance(e, asyncio.TimeoutError) else str(e)
+                print(f"⚠️  Node '{node.name}' {reason} - retry {attempts}/{node.retries}")
+                await asyncio.sleep(self.retry_backoff * (2 ** (attempts - 1)))
+
+        # Skipped or degraded (deadline / breaker) outputs mustn't stand in for the real thing
+        fallback = isinstance(output, Unmemoized)
+        if fallback:
+            output = output.value
+        if (use_memo and not fallback and output is not None
+                and not (isinstance(output, dict) and output.get('degraded'))):
+            _node_memo.put(key, output)
+
+        elapsed_ms = round((time.perf_counter() - start) * 1000, 1)
+        return output, {"ms": elapsed_ms, "attempts": attempts, "memoized": False}
+
+    @staticmethod
+    async def _call(node: Node, kwargs: Dict[str, Any]):
+        """Await coroutine functions, run plain functions in a worker thread"""
+        if inspect.iscoroutinefunction(node.func):
+            return await node.func(**kwargs)
+        return await asyncio.to_thread(node.func, **kwargs)
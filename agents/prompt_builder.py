@@ -0,0 +1,184 @@
+"""
+prompt_builder.py
+-----------------
+Compact serialization and per-tool token budgets for LLM prompts.
+
+Tools 3 and 4 embed whole analysis dicts in their prompts. Pretty-printed
+JSON (indent=2) full of nulls and empty arrays costs input tokens on every
+request without telling the model anything. build_prompt():
+- serializes each data block as compact JSON, dropping empty fields
+- counts tokens (tiktoken; ~4 chars/token if it isn't available)
+- if the prompt is over the tool's budget, trims long lists and strings
+  step by step until it fits (never the resume content a generation
+  tool rewrites - dropping jobs or bullets there would lose them from
+  the output; see UNTRIMMED_BLOCKS)
+- logs the size before (indent=2) and after compaction
+
+Environment:
+    PROMPT_COMPACTION              true | false (default: true)
+    PROMPT_BUDGET_<TOOL>           token budget override, e.g.
+                                   PROMPT_BUDGET_CREATE_MATCHING_STRATEGY=6000
+"""
+
+import json
+import os
+import threading
+from typing import Any, Callable, Optional
+
+
+# Default input-token budgets per tool (section prompts share one budget)
+TOKEN_BUDGETS = {
+    'create_matching_strategy': 8000,
+    'generate_tailored_resume': 10000,
+    'generate_section': 6000,
+}
+
+# Trimming levels tried in order when a prompt is over budget:
+# (max list items, max string characters)
+TRIM_LEVELS = [(12, 800), (8, 400), (5, 250), (3, 150), (2, 80), (1, 40)]
+
+# Blocks that are compacted but never trimmed: the generation tools turn
+# them into the resume itself, so a trimmed list is missing content
+UNTRIMMED_BLOCKS = {
+    'generate_tailored_resume': {'resume_data'},
+    'generate_section': {'relevant'},
+}
+
+
+def _is_empty(value: Any) -> bool:
+    """None, '', [] and {} carry no information for the model"""
+    return value is None or (isinstance(value, (str, list, dict)) and not value)
+
+
+def compact(value: Any) -> Any:
+    """
+    Recursively drop empty fields (None, '', [], {})
+
+    0 and False are kept - they carry information.
+    """
+    if isinstance(value, dict):
+        cleaned = {k: compact(v) for k, v in value.items()}
+        return {k: v for k, v in cleaned.items() if not _is_empty(v)}
+    if isinstance(value, (list, tuple)):
+        cleaned = [compact(v) for v in value]
+        return [v for v in cleaned if not _is_empty(v)]
+    if isinstance(value, str):
+        return value.strip()
+    return value
+
+
+def to_compact_json(value: Any) -> str:
+    """Serialize without whitespace or empty fields"""
+    return json.dumps(compact(value), separators=(',', ':'), ensure_ascii=False, default=str)
+
+
+def _trim(value: Any, max_items: int, max_chars: int) -> Any:
+    """Shorten lists to max_items and strings to max_chars (recursively)"""
+    if isinstance(value, dict):
+        return {k: _trim(v, max_items, max_chars) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_trim(v, max_items, max_chars) for v in value[:max_items]]
+    if isinstance(value, str) and len(value) > max_chars:
+        return value[:max_chars].rstrip() + '…'
+    return value
+
+
+# ========================================================================
+# TOKEN COUNTING
+# ========================================================================
+
+_encoder = None
+_encoder_loaded = False
+_encoder_lock = threading.Lock()
+
+def _get_encoder():
+    """tiktoken encoder, or None if tiktoken (or its BPE file) is unavailable"""
+    global _encoder, _encoder_loaded
+    with _encoder_lock:
+        if not _encoder_loaded:
+            _encoder_loaded = True
+            try:
+                import tiktoken
+                # Gemini's tokenizer isn't public; cl100k is a close proxy for budgeting
+                _encoder = tiktoken.get_encoding('cl100k_base')
+            except Exception as e:
+                print(f"⚠️  tiktoken unavailable ({e}) - estimating tokens as chars/4")
+                _encoder = None
+    return _encoder
+
+
+def count_tokens(text: str) -> int:
+    """Approximate input-token count of a prompt"""
+    encoder = _get_encoder()
+    if encoder is not None:
+        return len(encoder.encode(text, disallowed_special=()))
+    return (len(text) + 3) // 4
+
+
+def token_budget(tool: str) -> Optional[int]:
+    """
+    Budget for a tool ('generate_section:skills' uses 'generate_section')
+
+    Returns:
+        int or None: Token budget (None = unlimited)
+    """
+    base = tool.split(':', 1)[0]
+    override = os.getenv(f'PROMPT_BUDGET_{base.upper()}')
+    if override:
+        return int(override)
+    return TOKEN_BUDGETS.get(base)
+
+
+# ========================================================================
+# PROMPT BUILDING
+# ========================================================================
+
+def build_prompt(tool: str, render: Callable[..., str], **blocks: Any) -> str:
+    """
+    Render a prompt with compact, budgeted data blocks
+
+    Args:
+        tool: Tool name (selects the budget, used in the log line)
+        render: Function taking each block (already serialized to a
+                string) as a keyword argument and returning the prompt
+        **blocks: Data to embed (dicts / lists)
+
+    Returns:
+        str: The prompt to send
+
+    Example:
+        prompt = build_prompt(
+            'create_matching_strategy',
+            lambda job_analysis, resume_data: f"JOB:\\n{job_analysis}\\nRESUME:\\n{resume_data}",
+            job_analysis=job_analysis, resume_data=resume_data
+        )
+    """
+    verbose = render(**{name: json.dumps(data, indent=2) for name, data in blocks.items()})
+    if os.getenv('PROMPT_COMPACTION', 'true').lower() in ('0', 'false', 'no'):
+        return verbose
+
+    compacted = {name: compact(data) for name, data in blocks.items()}
+    prompt = render(**{name: to_compact_json(data) for name, data in compacted.items()})
+    tokens = count_tokens(prompt)
+
+    budget = token_budget(tool)
+    keep = UNTRIMMED_BLOCKS.get(tool.split(':', 1)[0], set())
+    trimmed = False
+    if budget:
+        for max_items, max_chars in TRIM_LEVELS:
+            if tokens <= budget:
+                break
+            prompt = render(**{name: to_compact_json(data if name in keep
+                                                     else _trim(data, max_items, max_chars))
+                               for name, data in compacted.items()})
+            tokens = count_tokens(prompt)
+            trimmed = True
+        if tokens > budget:
+            print(f"⚠️  {tool} prompt still over budget ({tokens:,} > {budget:,} tokens)")
+
+    before = count_tokens(verbose)
+    saved = 100 * (before - tokens) / before if before else 0
+    print(f"📉 {tool} prompt: {before:,} → {tokens:,} tokens (-{saved:.0f}%)"
+          f"{' [trimmed to budget]' if trimmed else ''}")
+
+    return prompt
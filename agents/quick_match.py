@@ -0,0 +1,109 @@
+"""
+quick_match.py
+--------------
+Instant, LLM-free match score between a resume and a job description.
+
+Both texts are mapped onto the canonical skill vocabulary of
+skill_taxonomy.py (one Aho-Corasick pass each, see jd_extractor.py) and
+scored with NumPy vector ops:
+- skill_coverage: share of the required skills the resume mentions
+- keyword_coverage: share of the JD's important keywords the resume mentions
+- weighted_overlap: required skills weigh 3, nice-to-have 1, and every
+  skill gets a bonus for how often the JD repeats it
+
+A typical call takes a few milliseconds, so the dashboard can show a
+score while the full strategy (three LLM calls) is still being generated.
+"""
+
+import time
+from typing import Any, Dict, List
+
+import numpy as np
+
+from jd_extractor import get_extractor
+from skill_taxonomy import SKILL_TAXONOMY
+
+
+REQUIRED_WEIGHT = 3.0
+NICE_TO_HAVE_WEIGHT = 1.0
+MENTION_WEIGHT = 0.5   # x log1p(mentions in the JD)
+
+# overall score = weighted sum of the three coverages
+SCORE_WEIGHTS = {'skill_coverage': 0.5, 'keyword_coverage': 0.2, 'weighted_overlap': 0.3}
+
+
+class QuickMatcher:
+    """Scores resume / job description pairs over a fixed skill vocabulary"""
+
+    def __init__(self):
+        self.extractor = get_extractor()
+        self.vocabulary: List[str] = [canonical for skills in SKILL_TAXONOMY.values()
+                                      for canonical in skills]
+        self.index = {skill: i for i, skill in enumerate(self.vocabulary)}
+
+    def _vector(self, skills) -> np.ndarray:
+        """Skill -> value mapping (or iterable of skills, value 1) as a vocabulary vector"""
+        vector = np.zeros(len(self.vocabulary), dtype=np.float32)
+        items = skills.items() if isinstance(skills, dict) else ((s, 1) for s in skills)
+        for skill, value in items:
+            i = self.index.get(skill)
+            if i is not None:
+                vector[i] = value
+        return vector
+
+    @staticmethod
+    def _coverage(wanted: np.ndarray, has: np.ndarray) -> float:
+        total = float(wanted.sum())
+        return float(wanted @ has) / total if total else 0.0
+
+    def score(self, resume_text: str, job_description: str) -> Dict[str, Any]:
+        """
+        Score how well a resume covers a job description
+
+        Args:
+            resume_text: Plain resume text
+            job_description: Raw job posting
+
+        Returns:
+            dict: score (0-100), the three coverages (0-1), matched / missing
+                  skills and elapsed_ms
+        """
+        start = time.perf_counter()
+
+        jd = self.extractor.extract(job_description)
+        mentions = self.extractor.count_skills(job_description)
+        has = (self._vector(self.extractor.count_skills(resume_text)) > 0).astype(np.float32)
+
+        required = self._vector(jd['required_skills'])
+        nice = self._vector(jd['nice_to_have_skills'])
+        keywords = self._vector(jd['important_keywords'])
+        weights = (REQUIRED_WEIGHT * required + NICE_TO_HAVE_WEIGHT * nice
+                   + MENTION_WEIGHT * np.log1p(self._vector(mentions)))
+
+        coverages = {
+            'skill_coverage': self._coverage(required, has),
+            'keyword_coverage': self._coverage(keywords, has),
+            'weighted_overlap': self._coverage(weights, has),
+        }
+        score = 100 * sum(SCORE_WEIGHTS[name] * value for name, value in coverages.items())
+
+        matched = [s for s in jd['required_skills'] if has[self.index[s]]]
+        return {
+            'score': int(round(score)),
+            **{name: round(value, 3) for name, value in coverages.items()},
+            'matched_skills': matched,
+            'missing_skills': [s for s in jd['required_skills'] if not has[self.index[s]]],
+            'nice_to_have_matched': [s for s in jd['nice_to_have_skills'] if has[self.index[s]]],
+            'elapsed_ms': round((time.perf_counter() - start) * 1000, 2),
+        }
+
+
+# Singleton instance
+_matcher = None
+
+def quick_match(resume_text: str, job_description: str) -> Dict[str, Any]:
+    """Score with the shared QuickMatcher (see QuickMatcher.score)"""
+    global _matcher
+    if _matcher is None:
+        _matcher = QuickMatcher()
+    return _matcher.score(resume_text, job_description)
@@ -11,20 +11,37 @@ This engine learns from resumes and job descriptions to provide
 intelligent, context-aware resume tailoring suggestions.
 """
 
+import hashlib
 import os
+import shutil
+import threading
+import time
 from typing import List, Dict, Any, Optional
-import google.generativeai as genai
 from langchain.text_splitter import RecursiveCharacterTextSplitter
-from langchain_google_genai import GoogleGenerativeAIEmbeddings, ChatGoogleGenerativeAI
+from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain.vectorstores import FAISS
 from langchain.chains import RetrievalQA
 from langchain.prompts import PromptTemplate
 from langchain.schema import Document
 import pickle
 from dotenv import load_dotenv
+from llm_backend import get_llm_backend, llm_backend_mode, make_langchain_llm
+from circuit_breaker import CircuitOpenError, get_circuit_breaker
+from embedding_backend import embedding_id, make_embeddings
+from embedding_cache import CachedEmbeddings, embed_with_stats, get_embedding_cache
+from deadline import current_deadline, expected_seconds
+from hedging import get_hedging_policy
+from model_router import get_model_router
+from rate_limiter import get_llm_scheduler
+from singleflight import get_singleflight
+from store_journal import JournalBuffer, StoreJournal, chunk_id
+from vector_store_cache import get_vector_store_cache
 
 load_dotenv()
 
+# Per-user locks are shared by users whose ids hash to the same stripe
+LOCK_STRIPES = 64
+
 
 class RAGEngine:
     """
@@ -41,29 +58,48 @@ class RAGEngine:
         """Initialize RAG engine with Google Gemini"""
         self.api_key = api_key or os.getenv('GEMINI_API_KEY')
         
-        if not self.api_key or self.api_key == 'your-gemini-api-key-here':
+        replay = llm_backend_mode() == 'replay'
+        
+        if not replay and (not self.api_key or self.api_key == 'your-gemini-api-key-here'):
             raise ValueError(
                 "❌ ERROR: No valid API key found!\n"
                 "Please add your Gemini API key to the .env file\n"
                 "Get free key from: https://makersuite.google.com/app/apikey"
             )
         
-        # Configure Gemini
-        genai.configure(api_key=self.api_key)
+        # Same backend as the agents (configures Gemini, or replays offline)
+        self.backend = get_llm_backend("gemini-2.5-flash", api_key=self.api_key)
         
-        # Initialize embeddings model (free)
-        self.embeddings = GoogleGenerativeAIEmbeddings(
-            model="models/embedding-001",
-            google_api_key=self.api_key
-        )
+        # Embeddings: EMBEDDING_BACKEND (embedding_backend.py); no network in
+        # replay mode, so deterministic hash embeddings there
+        self.embeddings = make_embeddings('hashing' if replay else None, api_key=self.api_key)
+        self.embedding_id = embedding_id(self.embeddings)
         
-        # Initialize LLM (Gemini 2.5 Flash - Same as base_agent)
-        self.llm = ChatGoogleGenerativeAI(
-            model="gemini-2.5-flash",
-            google_api_key=self.api_key,
-            temperature=0.7,
-            convert_system_message_to_human=True
-        )
+        # Re-ingestion only embeds changed chunks (hashing is cheaper than a lookup)
+        embedding_cache = get_embedding_cache()
+        if embedding_cache and not self.embedding_id.startswith('hashing'):
+            self.embeddings = CachedEmbeddings(self.embeddings, embedding_cache)
+        
+        if self.backend.name != 'gemini':
+            # Replay / record: route the RAG chain through the backend too
+            self.llm = make_langchain_llm(self.backend)
+        else:
+            # Initialize LLM (Gemini 2.5 Flash - Same as base_agent)
+            self.llm = ChatGoogleGenerativeAI(
+                model="gemini-2.5-flash",
+                google_api_key=self.api_key,
+                temperature=0.7,
+                convert_system_message_to_human=True,
+                # Retries are handled by the shared scheduler, not per client
+                max_retries=1
+            )
+        
+        # Shared rate limiter / retry scheduler (same one the agents use)
+        self.scheduler = get_llm_scheduler()
+        self.flight = get_singleflight()
+        self.router = get_model_router()
+        self.breaker = get_circuit_breaker()
+        self.hedger = get_hedging_policy()
         
         # Text splitter for chunking documents
         self.text_splitter = RecursiveCharacterTextSplitter(
@@ -73,14 +109,251 @@ class RAGEngine:
             separators=["\n\n", "\n", " ", ""]
         )
         
-        # Vector store (FAISS)
-        self.vector_store = None
+        # Per-user FAISS indexes: loaded on demand, hot ones kept in memory
+        self.stores = get_vector_store_cache()
         self.vector_store_path = "./vector_stores"
         
+        # Upserts append to a per-user journal; the index is rewritten in full
+        # once the journal reaches this many ops (store_journal.py)
+        self.journal_compact_ops = int(os.getenv('RAG_JOURNAL_COMPACT_OPS', '50'))
+        self._journals: Dict[str, StoreJournal] = {}
+        self._journals_guard = threading.Lock()
+        self.stores.on_evict(self._forget_journals)
+        # Striped, so the lock count stays fixed however many users there are
+        self._user_locks = [threading.RLock() for _ in range(LOCK_STRIPES)]
+        self._journal_locks = [threading.RLock() for _ in range(LOCK_STRIPES)]
+        
+        # Feedback is applied in memory at once and journaled in batches
+        self.feedback_log = JournalBuffer(
+            self._write_journal,
+            batch_size=int(os.getenv('RAG_FEEDBACK_BATCH', '20')),
+            flush_seconds=float(os.getenv('RAG_FEEDBACK_FLUSH_SECONDS', '5'))
+        )
+        
         # Create vector store directory
         os.makedirs(self.vector_store_path, exist_ok=True)
         
-        print("✅ RAG Engine initialized with Google Gemini + FAISS")
+        print(f"✅ RAG Engine initialized with {'replay backend' if replay else 'Google Gemini'} + FAISS "
+              f"({self.embedding_id} embeddings)")
+    
+    
+    def _store_path(self, user_id: str) -> str:
+        # Indexes from different embedding backends aren't interchangeable
+        if self.embedding_id == 'gemini':
+            return os.path.join(self.vector_store_path, f"user_{user_id}")
+        return os.path.join(self.vector_store_path, self.embedding_id, f"user_{user_id}")
+    
+    
+    def _load_store(self, user_id: str) -> Optional[FAISS]:
+        # Runs as a load singleflight leader while an upsert may hold the user
+        # lock waiting for it, so nothing here may block on the user lock
+        store_path = self._store_path(user_id)
+        # Feedback still in the buffer must be in the journal before it's replayed
+        self.feedback_log.flush(user_id)
+        journal = self._journal(user_id)
+        with journal.lock:  # not mid-swap (_save_snapshot)
+            self._recover_snapshot(store_path)
+            if not os.path.exists(store_path):
+                return None
+            print(f"📂 Loading vector store for user {user_id} from disk")
+            vector_store = FAISS.load_local(
+                store_path,
+                self.embeddings,
+                allow_dangerous_deserialization=True
+            )
+            journal.replay(vector_store)
+        return vector_store
+    
+    
+    def _user_lock(self, user_id: str) -> threading.RLock:
+        return self._user_locks[hash(user_id) % LOCK_STRIPES]
+    
+    
+    def _journal(self, user_id: str) -> StoreJournal:
+        # One per user while their store is in memory, so its op count stays
+        # in memory too; the lock is striped, so a journal object recreated
+        # after eviction still shares it with one that is in use
+        with self._journals_guard:
+            journal = self._journals.get(user_id)
+            if journal is None:
+                journal = self._journals[user_id] = StoreJournal(
+                    self._store_path(user_id), lock=self._journal_locks[hash(user_id) % LOCK_STRIPES])
+            return journal
+    
+    
+    def _forget_journals(self, evicted: List[str]) -> None:
+        """VectorStoreCache eviction hook: drop journals of users no longer in memory"""
+        with self._journals_guard:
+            for user_id in [u for u in self._journals if u not in self.stores]:
+                del self._journals[user_id]
+    
+    
+    def _embed(self, texts: List[str]):
+        """(vectors, chunks reused from the embedding cache)"""
+        if not texts:
+            return [], 0
+        # Only the Gemini embedding API counts against the shared rate limit
+        if self.embedding_id == 'gemini':
+            return self.scheduler.call(embed_with_stats, self.embeddings, texts)
+        return embed_with_stats(self.embeddings, texts)
+    
+    
+    @staticmethod
+    def _recover_snapshot(store_path: str) -> None:
+        """
+        Finish or undo a snapshot swap interrupted by a crash
+        
+        _save_snapshot moves the live index to '.old' before renaming the
+        new one into place. If only '.old' is left, it (with its journal)
+        is still the latest complete state, so it goes back; if both are
+        there, the swap finished and '.old' is stale.
+        """
+        old_path = store_path + '.old'
+        if not os.path.exists(old_path):
+            return
+        if os.path.exists(store_path):
+            shutil.rmtree(old_path, ignore_errors=True)
+        else:
+            print(f"🩹 Restoring {store_path} from an interrupted snapshot")
+            os.replace(old_path, store_path)
+    
+    
+    def _save_snapshot(self, user_id: str, vector_store: FAISS) -> None:
+        """
+        Save the full index and drop its journal (swapped in by rename)
+        
+        The swap holds the journal's lock, as do loads and journal
+        appends, so none of them sees the moment between the two renames;
+        a crash there is repaired by _recover_snapshot on the next load or
+        save. Caller holds the user lock.
+        """
+        store_path = self._store_path(user_id)
+        tmp_path, old_path = store_path + '.tmp', store_path + '.old'
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        vector_store.save_local(tmp_path)
+        journal = self._journal(user_id)
+        with journal.lock:
+            self._recover_snapshot(store_path)
+            if os.path.exists(store_path):
+                os.replace(store_path, old_path)
+            os.replace(tmp_path, store_path)
+            shutil.rmtree(old_path, ignore_errors=True)
+            journal.clear()  # the new folder has no journal
+    
+    
+    def _write_journal(self, user_id: str, changes: List[tuple]) -> bool:
+        """
+        Append (added, deleted) change sets to a user's journal
+        
+        Returns:
+            bool: True if the journal was long enough to be compacted
+        """
+        journal = self._journal(user_id)
+        journal.record_batch(changes)
+        if journal.op_count() < self.journal_compact_ops:
+            return False
+        # The feedback flusher calls this too, possibly while a load waits on
+        # it and an upsert holding the user lock waits on that load - so don't
+        # wait for the lock; whichever write finds it free compacts
+        user_lock = self._user_lock(user_id)
+        if not user_lock.acquire(blocking=False):
+            return False
+        try:
+            # Only the in-memory store has every change; if it was evicted,
+            # the next load replays the journal and a later write compacts
+            vector_store = self.stores.get(user_id)
+            if vector_store is None:
+                return False
+            self._save_snapshot(user_id, vector_store)
+            return True
+        finally:
+            user_lock.release()
+    
+    
+    def upsert_documents(self, user_id: str, documents: List[Document],
+                         replace_sources: Optional[List[str]] = None,
+                         deferred: bool = False) -> Dict[str, Any]:
+        """
+        Bring a user's index in line with a set of documents
+        
+        Chunks get stable IDs, so only new chunks are embedded and added
+        and only chunks that disappeared are deleted; everything else
+        (including feedback) stays in place. The changes are appended to
+        the store's journal rather than rewriting the index.
+        
+        Args:
+            user_id: User identifier
+            documents: Current documents (metadata needs a 'source')
+            replace_sources: Sources these documents fully replace; existing
+                             chunks from them that aren't in `documents` are
+                             removed (default: the documents' own sources)
+            deferred: Journal the changes in the next feedback_log batch
+                      instead of right away
+            
+        Returns:
+            dict: chunks, added, removed, kept, embedded, compacted
+        """
+        chunks = self.text_splitter.split_documents(documents)
+        by_id = {}
+        for chunk in chunks:
+            by_id.setdefault(chunk_id(user_id, chunk.metadata.get('source', ''), chunk.page_content), chunk)
+        sources = set(replace_sources if replace_sources is not None
+                      else (doc.metadata.get('source') for doc in documents))
+        
+        with self._user_lock(user_id):
+            vector_store = self.get_vector_store(user_id)
+            existing = dict(vector_store.docstore._dict) if vector_store else {}
+            
+            new_ids = [i for i in by_id if i not in existing]
+            stale_ids = [i for i, doc in existing.items()
+                         if doc.metadata.get('source') in sources and i not in by_id]
+            vectors, reused = self._embed([by_id[i].page_content for i in new_ids])
+            added = [(i, by_id[i].page_content, by_id[i].metadata, vector)
+                     for i, vector in zip(new_ids, vectors)]
+            
+            compacted = False
+            if vector_store is None:
+                vector_store = FAISS.from_embeddings(
+                    text_embeddings=[(text, vector) for _, text, _, vector in added],
+                    embedding=self.embeddings,
+                    metadatas=[metadata for _, _, metadata, _ in added],
+                    ids=new_ids
+                )
+                self._save_snapshot(user_id, vector_store)
+                compacted = True
+            elif added or stale_ids:
+                if stale_ids:
+                    vector_store.delete(stale_ids)
+                if added:
+                    vector_store.add_embeddings([(text, vector) for _, text, _, vector in added],
+                                                metadatas=[metadata for _, _, metadata, _ in added],
+                                                ids=new_ids)
+            self.stores.put(user_id, vector_store)  # re-measure its footprint
+            
+            if not compacted and (added or stale_ids):
+                if deferred:
+                    self.feedback_log.add(user_id, added, stale_ids)
+                else:
+                    compacted = self._write_journal(user_id, [(added, stale_ids)])
+        
+        return {
+            "chunks": len(by_id),
+            "added": len(new_ids),
+            "removed": len(stale_ids),
+            "kept": len(by_id) - len(new_ids),
+            "embedded": len(new_ids) - reused,
+            "compacted": compacted
+        }
+    
+    
+    def get_vector_store(self, user_id: str) -> Optional[FAISS]:
+        """
+        A user's vector store, from memory or disk
+        
+        Returns:
+            FAISS store, or None if the user hasn't ingested anything
+        """
+        return self.stores.get(user_id, lambda: self._load_store(user_id))
     
     
     def ingest_documents(self, resume_text: str, job_description: str, 
@@ -125,22 +398,17 @@ class RAGEngine:
             else:
                 has_jd = False
             
-            # Split into chunks
-            chunks = self.text_splitter.split_documents(documents)
-            
-            # Create vector store with FAISS
-            self.vector_store = FAISS.from_documents(
-                documents=chunks,
-                embedding=self.embeddings
-            )
-            
-            # Save to disk
-            store_path = os.path.join(self.vector_store_path, f"user_{user_id}")
-            self.vector_store.save_local(store_path)
+            # Replace the resume / JD chunks that changed; feedback stays
+            changes = self.upsert_documents(user_id, documents,
+                                            replace_sources=["resume", "job_description"])
+            store_path = self._store_path(user_id)
             
             return {
                 "success": True,
-                "chunks_created": len(chunks),
+                "chunks_created": changes["chunks"],
+                "chunks_embedded": changes["embedded"],
+                "chunks_added": changes["added"],
+                "chunks_removed": changes["removed"],
                 "has_job_description": has_jd,
                 "vector_store_path": store_path,
                 "message": f"Resume ingested successfully! {'Job description also added.' if has_jd else 'Add a job description for better tailoring.'}"
@@ -155,22 +423,24 @@ class RAGEngine:
             }
     
     
-    def retrieve_context(self, query: str, k: int = 5) -> List[Document]:
+    def retrieve_context(self, query: str, user_id: str, k: int = 5) -> List[Document]:
         """
-        Retrieve relevant context from vector store
+        Retrieve relevant context from a user's vector store
         
         Args:
             query: User query or instruction
+            user_id: User identifier
             k: Number of relevant chunks to retrieve
             
         Returns:
             List of relevant document chunks
         """
-        if not self.vector_store:
+        vector_store = self.get_vector_store(user_id)
+        if not vector_store:
             raise ValueError("Vector store not initialized. Call ingest_documents first.")
         
         # Semantic search
-        relevant_docs = self.vector_store.similarity_search(query, k=k)
+        relevant_docs = vector_store.similarity_search(query, k=k)
         return relevant_docs
     
     
@@ -188,28 +458,31 @@ class RAGEngine:
         Returns:
             Dict with generated content and metadata
         """
+        deadline = current_deadline()
+        if deadline is not None and expected_seconds('rag_tailor') > deadline.remaining():
+            deadline.skip('rag_tailor', f"{deadline.remaining():.0f}s left")
+            return {
+                "success": False,
+                "skipped": True,
+                "error": "Request deadline too short for tailoring",
+                "message": "Retry with a longer deadline"
+            }
+
         try:
-            # Load user's vector store from disk if not in memory
-            if not self.vector_store:
-                store_path = os.path.join(self.vector_store_path, f"user_{user_id}")
-                if os.path.exists(store_path):
-                    self.vector_store = FAISS.load_local(
-                        store_path,
-                        self.embeddings,
-                        allow_dangerous_deserialization=True
-                    )
-                else:
-                    return {
-                        "success": False,
-                        "error": "Vector store not found. Please analyze documents first.",
-                        "message": "Call /api/rag/analyze first to ingest documents"
-                    }
+            # This user's index (cached in memory, loaded from disk on a miss)
+            vector_store = self.get_vector_store(user_id)
+            if not vector_store:
+                return {
+                    "success": False,
+                    "error": "Vector store not found. Please analyze documents first.",
+                    "message": "Call /api/rag/analyze first to ingest documents"
+                }
             
             # Retrieve relevant context
             if context_override:
                 context = context_override
             else:
-                relevant_docs = self.retrieve_context(instruction, k=5)
+                relevant_docs = self.retrieve_context(instruction, user_id, k=5)
                 context = "\n\n".join([doc.page_content for doc in relevant_docs])
             
             # Create prompt template
@@ -244,13 +517,16 @@ TAILORED CONTENT:"""
             qa_chain = RetrievalQA.from_chain_type(
                 llm=self.llm,
                 chain_type="stuff",
-                retriever=self.vector_store.as_retriever(search_kwargs={"k": 5}),
+                retriever=vector_store.as_retriever(search_kwargs={"k": 5}),
                 return_source_documents=True,
                 chain_type_kwargs={"prompt": prompt}
             )
             
             # Generate response
-            result = qa_chain({"query": instruction})
+            start = time.perf_counter()
+            self.breaker.check()
+            result = self.scheduler.call(self.breaker.call, qa_chain, {"query": instruction})
+            self.hedger.record('rag_tailor', (time.perf_counter() - start) * 1000)
             
             return {
                 "success": True,
@@ -313,16 +589,17 @@ USER FEEDBACK: {feedback}
 RATING: {rating}/5
                 """,
                 metadata={
+                    "source": "feedback",
                     "type": "feedback",
                     "user_id": user_id,
                     "rating": rating
                 }
             )
             
-            # Add to vector store for future reference
-            if self.vector_store:
-                chunks = self.text_splitter.split_documents([feedback_doc])
-                self.vector_store.add_documents(chunks)
+            # Add to vector store for future reference; searchable at once,
+            # written to disk with the next journal batch (no full save)
+            if self.get_vector_store(user_id):
+                self.upsert_documents(user_id, [feedback_doc], replace_sources=[], deferred=True)
                 
                 return {
                     "success": True,
@@ -352,6 +629,11 @@ RATING: {rating}/5
         Returns:
             List of improvement suggestions
         """
+        deadline = current_deadline()
+        if deadline is not None and expected_seconds('get_suggestions') > deadline.remaining():
+            deadline.skip('suggestions', f"{deadline.remaining():.0f}s left")
+            return []
+
         try:
             # Handle empty or generic JD
             has_specific_jd = job_description and len(job_description.strip()) > 50
@@ -392,11 +674,32 @@ Format each suggestion as a single numbered line like:
 
 SUGGESTIONS:"""
 
-            model = genai.GenerativeModel('gemini-2.5-flash')
-            response = model.generate_content(prompt)
+            # Suggestions are light work - routed to a smaller tier (model_router.py)
+            route = self.router.route('get_suggestions')
+            backend = get_llm_backend(self.router.model_for(route.tier), api_key=self.api_key)
+            
+            def suggest():
+                self.breaker.check()
+                start = time.perf_counter()
+                try:
+                    text = self.hedger.call('get_suggestions', self.scheduler.call, self.breaker.call,
+                                            backend.generate, prompt, route.generation_config())
+                except CircuitOpenError:
+                    raise
+                except Exception:
+                    self.router.record('get_suggestions', backend.model_name,
+                                       (time.perf_counter() - start) * 1000, ok=False)
+                    raise
+                self.router.record('get_suggestions', backend.model_name,
+                                   (time.perf_counter() - start) * 1000, ok=True)
+                return text
+            
+            # Duplicate analyze requests for the same upload share one call
+            key = hashlib.sha256(f"suggestions\n{backend.model_name}\n{prompt}".encode('utf-8')).hexdigest()
+            response_text = self.flight.do(key, suggest)
             
             # Parse suggestions - look for numbered lines
-            raw_lines = response.text.strip().split('\n')
+            raw_lines = response_text.strip().split('\n')
             suggestions = []
             for line in raw_lines:
                 line = line.strip()
@@ -413,6 +716,9 @@ SUGGESTIONS:"""
             
             return suggestions[:5]  # Return top 5
             
+        except CircuitOpenError as e:
+            print(f"🔌 Suggestions skipped: {e}")
+            return [f"AI suggestions are temporarily unavailable. Please try again in {e.retry_after:.0f} seconds."]
         except Exception as e:
             print(f"❌ Suggestion generation error: {e}")
             return [f"Unable to generate suggestions: {str(e)}. Please check your GEMINI_API_KEY."]
@@ -15,6 +15,7 @@ This agent:
 from typing import Dict, List, Any, Optional
 from rag_engine import get_rag_engine
 from resume_generator import ResumeGeneratorAgent
+from agent_pool import get_agent_pool
 
 
 class RAGResumeAgent:
@@ -34,7 +35,7 @@ class RAGResumeAgent:
         
         # Try to load traditional agent (optional - for LaTeX generation)
         try:
-            self.traditional_agent = ResumeGeneratorAgent()
+            self.traditional_agent = get_agent_pool().get(ResumeGeneratorAgent)
             print("✅ Traditional Agent loaded")
         except Exception as e:
             print(f"⚠️ Traditional Agent not available: {e}")
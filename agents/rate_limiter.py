@@ -0,0 +1,286 @@
+"""
+rate_limiter.py
+---------------
+Shared client-side scheduler for every Gemini call in the process.
+
+BaseAgent, RAGEngine.get_suggestions and the LangChain chains all go
+through one LLMScheduler, which provides:
+- a token bucket (requests per minute, with a small burst allowance)
+- bounded concurrency (at most N calls in flight)
+- retries with exponential backoff + full jitter on 429 / transient errors
+- Retry-After support (the server's hint wins over our own backoff)
+- no retry that would start after the request's deadline (deadline.py)
+- adaptive rate: the bucket slows down on every 429 and creeps back up
+  on success (AIMD), so we can run close to the quota ceiling
+- queue-depth and retry metrics
+"""
+
+import os
+import random
+import re
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+from deadline import current_deadline
+
+
+# Exception class names (google.api_core / requests / builtins) worth retrying
+RATE_LIMIT_ERRORS = {'ResourceExhausted', 'TooManyRequests'}
+TRANSIENT_ERRORS = {'ServiceUnavailable', 'InternalServerError', 'DeadlineExceeded',
+                    'GatewayTimeout', 'Aborted', 'Unknown', 'ConnectionError',
+                    'Timeout', 'TimeoutError', 'ReadTimeout', 'ConnectTimeout'}
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+
+def _status_code(error: Exception) -> Optional[int]:
+    """HTTP status attached to an exception, if any"""
+    for attr in ('code', 'status_code'):
+        value = getattr(error, attr, None)
+        if isinstance(value, int):
+            return value
+    response = getattr(error, 'response', None)
+    value = getattr(response, 'status_code', None)
+    return value if isinstance(value, int) else None
+
+
+def is_rate_limit_error(error: Exception) -> bool:
+    """True for quota / 429 errors"""
+    return type(error).__name__ in RATE_LIMIT_ERRORS or _status_code(error) == 429
+
+
+def is_retryable_error(error: Exception) -> bool:
+    """True for 429s and transient upstream failures"""
+    if is_rate_limit_error(error):
+        return True
+    if type(error).__name__ in TRANSIENT_ERRORS:
+        return True
+    return _status_code(error) in RETRYABLE_STATUS
+
+
+def retry_after_seconds(error: Exception) -> Optional[float]:
+    """
+    Server-suggested wait before retrying, if the error carries one
+
+    Checks a Retry-After header, then Gemini's RetryInfo text
+    ("retry_delay { seconds: 7 }" / "Please retry in 7.5s").
+    """
+    response = getattr(error, 'response', None)
+    headers = getattr(response, 'headers', None) or {}
+    header = headers.get('Retry-After') if hasattr(headers, 'get') else None
+    if header:
+        try:
+            return float(header)
+        except ValueError:
+            pass
+
+    text = str(error)
+    match = (re.search(r'retry_delay\s*\{\s*seconds:\s*(\d+)', text)
+             or re.search(r'retry in\s*([\d.]+)\s*s', text, re.IGNORECASE))
+    if match:
+        return float(match.group(1))
+    return None
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket with an adjustable refill rate
+
+    Args:
+        rate_per_second: Tokens added per second
+        capacity: Maximum burst size
+    """
+
+    def __init__(self, rate_per_second: float, capacity: float):
+        self.rate = rate_per_second
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self) -> float:
+        """
+        Take one token, sleeping until one is available
+
+        Returns:
+            float: Seconds spent waiting
+        """
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+                delay = (1 - self._tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+
+class LLMScheduler:
+    """
+    Rate-limited, retrying executor for LLM calls
+
+    Args:
+        requests_per_minute: Target (maximum) request rate
+        burst: Token bucket capacity
+        max_concurrency: Maximum calls in flight
+        max_retries: Retries after the first attempt
+        base_delay: First backoff delay in seconds
+        max_delay: Backoff ceiling in seconds
+        min_rate_fraction: Floor for the adaptive rate (fraction of the target)
+    """
+
+    def __init__(self, requests_per_minute: float = 60, burst: int = 10,
+                 max_concurrency: int = 8, max_retries: int = 4,
+                 base_delay: float = 1.0, max_delay: float = 30.0,
+                 min_rate_fraction: float = 0.1):
+        self.target_rate = requests_per_minute / 60.0
+        self.min_rate = self.target_rate * min_rate_fraction
+        self.bucket = TokenBucket(self.target_rate, burst)
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self._lock = threading.Lock()
+        self._waiting = 0
+        self._in_flight = 0
+        self._max_waiting = 0
+        self.calls = 0
+        self.retries = 0
+        self.rate_limited = 0
+        self.failures = 0
+        self.total_wait_seconds = 0.0
+
+    def call(self, func: Callable, *args, **kwargs) -> Any:
+        """
+        Run func(*args, **kwargs) under the rate limit, retrying transient errors
+
+        Returns:
+            Whatever func returns
+
+        Raises:
+            The last exception if it isn't retryable or retries are exhausted
+        """
+        attempt = 0
+        while True:
+            self._acquire()
+            try:
+                result = func(*args, **kwargs)
+            except Exception as e:
+                self._release()
+                if is_rate_limit_error(e):
+                    self._slow_down()
+                if not is_retryable_error(e) or attempt >= self.max_retries:
+                    with self._lock:
+                        self.failures += 1
+                    raise
+
+                delay = retry_after_seconds(e)
+                if delay is None:
+                    # Full jitter: uniform in [0, min(cap, base * 2^attempt)]
+                    delay = random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+                deadline = current_deadline()
+                if deadline is not None and deadline.remaining() <= delay:
+                    with self._lock:
+                        self.failures += 1
+                    raise
+                attempt += 1
+                with self._lock:
+                    self.retries += 1
+                print(f"⏳ LLM call failed ({type(e).__name__}) - retry {attempt}/{self.max_retries} in {delay:.1f}s")
+                time.sleep(delay)
+                continue
+
+            self._release()
+            self._speed_up()
+            return result
+
+    def _acquire(self) -> None:
+        """Wait for a rate token and a concurrency slot"""
+        with self._lock:
+            self._waiting += 1
+            self._max_waiting = max(self._max_waiting, self._waiting)
+        start = time.monotonic()
+        try:
+            self.bucket.acquire()
+            self._slots.acquire()
+        finally:
+            with self._lock:
+                self._waiting -= 1
+        with self._lock:
+            self._in_flight += 1
+            self.calls += 1
+            self.total_wait_seconds += time.monotonic() - start
+
+    def _release(self) -> None:
+        with self._lock:
+            self._in_flight -= 1
+        self._slots.release()
+
+    def _slow_down(self) -> None:
+        """Multiplicative decrease after a 429"""
+        with self._lock:
+            self.rate_limited += 1
+            self.bucket.rate = max(self.min_rate, self.bucket.rate / 2)
+
+    def _speed_up(self) -> None:
+        """Additive increase after a success, back up to the target rate"""
+        if self.bucket.rate < self.target_rate:
+            with self._lock:
+                self.bucket.rate = min(self.target_rate, self.bucket.rate + self.target_rate * 0.05)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Scheduler metrics for monitoring
+
+        Returns:
+            dict: queue depth, in-flight calls, retries, 429s and current rate
+        """
+        with self._lock:
+            return {
+                "queue_depth": self._waiting,
+                "max_queue_depth": self._max_waiting,
+                "in_flight": self._in_flight,
+                "max_concurrency": self.max_concurrency,
+                "calls": self.calls,
+                "retries": self.retries,
+                "rate_limited": self.rate_limited,
+                "failures": self.failures,
+                "avg_wait_ms": round(self.total_wait_seconds * 1000 / self.calls, 1) if self.calls else 0.0,
+                "current_rpm": round(self.bucket.rate * 60, 1),
+                "target_rpm": round(self.target_rate * 60, 1)
+            }
+
+
+# Singleton instance
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+def get_llm_scheduler() -> LLMScheduler:
+    """
+    Get or create the process-wide LLM scheduler
+
+    Configured from the environment:
+        LLM_RPM              requests per minute (default: 60)
+        LLM_BURST            token bucket capacity (default: 10)
+        LLM_MAX_CONCURRENCY  calls in flight (default: 8)
+        LLM_MAX_RETRIES      retries per call (default: 4)
+    """
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = LLMScheduler(
+                requests_per_minute=float(os.getenv('LLM_RPM', '60')),
+                burst=int(os.getenv('LLM_BURST', '10')),
+                max_concurrency=int(os.getenv('LLM_MAX_CONCURRENCY', '8')),
+                max_retries=int(os.getenv('LLM_MAX_RETRIES', '4'))
+            )
+    return _scheduler
@@ -6,10 +6,21 @@ Imports JobAnalyzerAgent - doesn't duplicate anything!
 
 This file contains ONLY the ResumeAgent class and its methods.
 Everything else is imported from previous files.
+
+Environment:
+    RESUME_PREPARSE            true | false (default: true) - take contact info and
+                               skills from resume_preparser.py and ask the LLM only
+                               for the rest
 """
 
 from job_analyzer import JobAnalyzerAgent  # Import the job analyzer!
+from resume_preparser import preparse_resume
+from skill_normalizer import normalize_output
+from structured_output import conform
+import asyncio
 import json
+import os
+import time
 
 
 class ResumeAgent(JobAnalyzerAgent):
@@ -44,7 +55,10 @@ class ResumeAgent(JobAnalyzerAgent):
         print("📄 Analyzing Resume...")
         print("-" * 60)
         
-        prompt = f"""You are a resume analyzer. Extract ALL information from this resume.
+        try:
+            resume_data = self._preparsed_analysis(resume_text)
+            if resume_data is None:
+                prompt = f"""You are a resume analyzer. Extract ALL information from this resume.
 
 Resume:
 {resume_text}
@@ -94,10 +108,9 @@ IMPORTANT:
 
 Be thorough. Return ONLY the JSON, no other text."""
 
-        try:
-            response = self.model.generate_content(prompt)
-            response_text = response.text.replace('```json', '').replace('```', '').strip()
-            resume_data = json.loads(response_text)
+                resume_data = self._generate_json(prompt, tool='analyze_resume')
+
+            normalize_output('analyze_resume', resume_data)
             
             # Show what we found
             print("✅ Resume analysis complete!")
@@ -125,5 +138,95 @@ Be thorough. Return ONLY the JSON, no other text."""
         except Exception as e:
             print(f"❌ Error: {e}")
             raise
+    
+    
+    def _preparsed_analysis(self, resume_text: str):
+        """
+        Pre-parsed contact info and skills, with the LLM filling the rest
+
+        The LLM sees the resume without its contact lines and skill
+        sections and returns only the fields resume_preparser can't fill,
+        plus skills that show up only in experience or projects.
+
+        Returns:
+            dict: Structured resume data, or None to fall back to the full LLM analysis
+        """
+        if os.getenv('RESUME_PREPARSE', 'true').lower() in ('0', 'false', 'no'):
+            return None
+
+        start = time.perf_counter()
+        parsed = preparse_resume(resume_text)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        partial = parsed['resume_data']
+        contact = partial['contact_info']
+
+        if not (partial.get('name') and partial.get('skills') and (contact['email'] or contact['phone'])):
+            print("↪️  Name, contact details or skills not found locally - using the full LLM analysis")
+            return None
+        print(f"⚡ Pre-parsed contact info and {len(partial['skills'])} skills in {elapsed_ms:.1f} ms")
+
+        # Ask only for contact fields the pre-parser didn't find
+        missing_contact = {field: f"{field} if present" for field, value in contact.items() if not value}
+
+        prompt = f"""You are a resume analyzer. Extract the remaining information from this resume.
+
+Resume (name, contact details and skills were already extracted):
+{parsed['remaining_text']}
+
+Skills already found in the Skills section: {json.dumps(partial['skills'])}
+
+Extract and return the following in JSON format:
+{{
+    "contact_info": {json.dumps(missing_contact)},
+    "summary": "Professional summary/objective if present",
+    "experience": [
+        {{
+            "title": "Job title",
+            "company": "Company name",
+            "duration": "Time period",
+            "responsibilities": ["what", "they", "did"]
+        }}
+    ],
+    "education": [
+        {{
+            "degree": "Degree name",
+            "institution": "School name",
+            "year": "Graduation year",
+            "details": "Relevant coursework, GPA, etc if mentioned"
+        }}
+    ],
+    "projects": ["List any projects mentioned"],
+    "achievements": ["Notable achievements or awards"],
+    "certifications": ["Any certifications"],
+    "extracurricular_activities": ["Clubs, volunteering, leadership, sports, hobbies if mentioned"],
+    "other_technical_skills": ["technical skills used in experience/projects NOT in the list above"],
+    "other_soft_skills": ["soft skills shown in experience/projects NOT in the list above"]
+}}
+
+If any field doesn't exist, use null or empty array. Return ONLY the JSON, no other text."""
+
+        enrichment = self._generate_json(prompt, tool='enrich_resume')
+
+        # Skills used only in experience or projects
+        known = {s.lower() for s in partial['skills']}
+        for field, extra in (('technical_skills', enrichment.pop('other_technical_skills', None) or []),
+                             ('soft_skills', enrichment.pop('other_soft_skills', None) or [])):
+            for skill in extra:
+                if isinstance(skill, str) and skill.strip() and skill.strip().lower() not in known:
+                    partial[field] = partial.get(field, []) + [skill.strip()]
+                    partial['skills'] = partial['skills'] + [skill.strip()]
+                    known.add(skill.strip().lower())
+
+        # Pre-parsed values win; the LLM only fills the gaps
+        llm_contact = enrichment.get('contact_info') or {}
+        enrichment['contact_info'] = {field: value or llm_contact.get(field)
+                                      for field, value in contact.items()}
+        return conform('analyze_resume', {**enrichment, **{k: v for k, v in partial.items()
+                                                            if k != 'contact_info'}})
+    
+    
+    async def analyze_resume_async(self, resume_text: str) -> dict:
+        """Async version of analyze_resume (runs in a worker thread)"""
+        return await asyncio.to_thread(self.analyze_resume, resume_text)
 
 
@@ -8,8 +8,177 @@ This is Tool #4 - Generates tailored resumes in LaTeX format!
 """
 
 from strategy_creator import StrategyAgent
+from pipeline import run_pipeline
+from prompt_builder import build_prompt
+from functools import lru_cache
+import asyncio
 import json
 import os
+import time
+
+
+@lru_cache(maxsize=None)
+def load_latex_template(template_path: str) -> str:
+    """Read a LaTeX template from disk (cached - templates don't change at runtime)"""
+    with open(template_path, 'r') as f:
+        return f.read()
+
+
+# LaTeX skeleton for each resume section, in default document order.
+# name -> (prompt heading, LaTeX format, resume_data fields the section needs;
+#          None = the whole resume)
+RESUME_SECTIONS = {
+    'header': (
+        'HEADER FORMAT',
+        r"""\begin{center}
+    {\Huge \scshape [NAME]} \\ \vspace{1pt}
+    \small \raisebox{-0.1\height}\faPhone\ [PHONE] ~ 
+    \href{mailto:[EMAIL]}{\raisebox{-0.2\height}\faEnvelope\ [EMAIL]} ~ 
+    \href{[LINKEDIN]}{\raisebox{-0.2\height}\faLinkedin\ LinkedIn} ~
+    \href{[GITHUB]}{\raisebox{-0.2\height}\faGithub\ GitHub}
+    \vspace{-8pt}
+\end{center}""",
+        ['name', 'contact_info']
+    ),
+    'summary': (
+        'SUMMARY SECTION',
+        r"""\section{Summary}
+[Write strategic summary emphasizing what strategy recommends]""",
+        None
+    ),
+    'education': (
+        'EDUCATION SECTION',
+        r"""\section{Education}
+  \resumeSubHeadingListStart
+    \resumeSubheading
+      {[Degree]}{[Location]}
+      {[Program Details]}{[Dates]}
+  \resumeSubHeadingListEnd
+\vspace{-12pt}""",
+        ['education', 'certifications']
+    ),
+    'experience': (
+        'EXPERIENCE SECTION',
+        r"""\section{Professional Experience}
+  \resumeSubHeadingListStart
+    \resumeSubheading
+      {[Job Title]}{[Dates]}
+      {[Company]}{[Location]}
+      \resumeItemListStart
+        \resumeItem{[Bullet point emphasizing relevant skills]}
+        \resumeItem{[Bullet point with keywords from strategy]}
+      \resumeItemListEnd
+  \resumeSubHeadingListEnd
+\vspace{-16pt}""",
+        ['experience']
+    ),
+    'projects': (
+        'PROJECTS SECTION',
+        r"""\section{Key Projects}
+    \vspace{-5pt}
+    \resumeSubHeadingListStart
+      \resumeProjectHeading
+          {\textbf{[Project Name]} $|$ \emph{[Technologies]}},{[Year]}
+          \resumeItemListStart
+            \resumeItem{[Achievement]}
+          \resumeItemListEnd
+          \vspace{-13pt}
+    \resumeSubHeadingListEnd""",
+        ['projects']
+    ),
+    'skills': (
+        'SKILLS SECTION',
+        r"""\section{Technical Skills}
+ \begin{itemize}[leftmargin=0.15in, label={}]
+    \small{\item{
+     \textbf{[Category]:} [Skills list] \\
+    }}
+ \end{itemize}
+\vspace{-16pt}""",
+        ['skills', 'technical_skills', 'soft_skills', 'certifications']
+    ),
+}
+
+# Only generated when the candidate has extracurriculars and the strategy
+# recommends showing them (same rule as instruction 4 of the full prompt)
+EXTRACURRICULAR_SECTION = (
+    'EXTRACURRICULAR SECTION',
+    r"""\section{Leadership \& Activities}
+  \resumeSubHeadingListStart
+    \resumeProjectHeading
+        {\textbf{[Activity]} $|$ \emph{[Role]}}{[Dates]}
+        \resumeItemListStart
+          \resumeItem{[Impact relevant to the job]}
+        \resumeItemListEnd
+  \resumeSubHeadingListEnd
+\vspace{-12pt}""",
+    ['extracurricular_activities', 'achievements']
+)
+
+# Words that identify each section in the strategy's ordering advice
+SECTION_ALIASES = {
+    'summary': ['summary', 'objective', 'profile'],
+    'education': ['education', 'degree', 'academic'],
+    'experience': ['experience', 'employment', 'work history'],
+    'projects': ['project'],
+    'skills': ['skill'],
+    'extracurricular': ['extracurricular', 'activities', 'volunteer'],
+}
+
+
+class FenceStripper:
+    """
+    Incremental version of `text.replace('```latex', '').replace('```', '').strip()`
+    
+    Feed it streamed fragments; it holds back only what it can't decide yet
+    (a possible partial fence at the end, or trailing whitespace).
+    """
+    
+    FENCE = '```latex'
+    
+    def __init__(self):
+        self._tail = ''          # possible start of a fence, undecided
+        self._whitespace = ''    # trailing whitespace, dropped if nothing follows
+        self._started = False    # leading whitespace is dropped until True
+    
+    def feed(self, text: str) -> str:
+        """Add a fragment, return the cleaned text that is safe to emit"""
+        buffer = self._tail + text
+        
+        # Hold back a suffix that could still grow into a fence
+        self._tail = ''
+        for size in range(min(len(self.FENCE) - 1, len(buffer)), 0, -1):
+            if self.FENCE.startswith(buffer[-size:]):
+                self._tail = buffer[-size:]
+                buffer = buffer[:-size]
+                break
+        
+        cleaned = buffer.replace('```latex', '').replace('```', '')
+        return self._emit(cleaned)
+    
+    def flush(self) -> str:
+        """Emit whatever is left at the end of the stream"""
+        cleaned = self._tail.replace('```', '')
+        self._tail = ''
+        out = self._emit(cleaned)
+        self._whitespace = ''
+        return out
+    
+    def _emit(self, cleaned: str) -> str:
+        if not self._started:
+            cleaned = cleaned.lstrip()
+            if not cleaned:
+                return ''
+            self._started = True
+        
+        body = cleaned.rstrip()
+        if not body:
+            self._whitespace += cleaned
+            return ''
+        
+        out = self._whitespace + body
+        self._whitespace = cleaned[len(body):]
+        return out
 
 
 class ResumeGeneratorAgent(StrategyAgent):
@@ -30,12 +199,53 @@ class ResumeGeneratorAgent(StrategyAgent):
         base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
         template_path = os.path.join(base_dir, 'tests', 'templates', 'resume_template.tex')
         
-        with open(template_path, 'r') as f:
-            self.latex_template = f.read()
+        self.latex_template = load_latex_template(template_path)
         
         print("📄 LaTeX template loaded successfully!\n")
     
     
+    def _build_resume_prompt(self, resume_data: dict, strategy: dict,
+                             job_analysis: dict) -> str:
+        """Build the Tool #4 prompt (shared by the normal and streaming paths)"""
+        section_formats = '\n\n'.join(f"{heading}:\n{latex}"
+                                       for heading, latex, _ in RESUME_SECTIONS.values())
+        
+        def render(resume_data, job_analysis, strategy):
+            return f"""You are an expert resume writer. Generate tailored resume CONTENT in LaTeX format.
+
+ORIGINAL RESUME DATA:
+{resume_data}
+
+JOB REQUIREMENTS:
+{job_analysis}
+
+STRATEGIC PLAN (MUST FOLLOW):
+{strategy}
+
+Generate ONLY the resume content sections in LaTeX format. Use these LaTeX commands:
+
+{section_formats}
+
+CRITICAL INSTRUCTIONS:
+1. FOLLOW THE STRATEGY EXACTLY - emphasize what it says to emphasize
+2. INCORPORATE all keywords from strategy naturally
+3. If GitHub/Portfolio present in contact_info, include them in header
+4. If extracurriculars exist and strategy recommends, add them as section
+5. ORDER sections per strategy recommendations
+6. Make summary compelling and targeted to the job
+7. Quantify achievements where possible
+8. Use strong action verbs
+9. Ensure ATS-friendly (keywords, formatting)
+10. Keep LaTeX syntax PERFECT - no syntax errors
+
+Generate the COMPLETE resume content starting with the header and ending with the last section.
+Do NOT include \\documentclass or \\begin{{document}} - only the content sections.
+"""
+        
+        return build_prompt('generate_tailored_resume', render, resume_data=resume_data,
+                            job_analysis=job_analysis, strategy=strategy)
+    
+    
     def generate_tailored_resume(self, resume_data: dict, strategy: dict, 
                                   job_analysis: dict) -> str:
         """
@@ -64,96 +274,11 @@ class ResumeGeneratorAgent(StrategyAgent):
         print("-" * 60)
         
         # Create prompt for content generation
-        prompt = f"""You are an expert resume writer. Generate tailored resume CONTENT in LaTeX format.
-
-ORIGINAL RESUME DATA:
-{json.dumps(resume_data, indent=2)}
-
-JOB REQUIREMENTS:
-{json.dumps(job_analysis, indent=2)}
-
-STRATEGIC PLAN (MUST FOLLOW):
-{json.dumps(strategy, indent=2)}
-
-Generate ONLY the resume content sections in LaTeX format. Use these LaTeX commands:
-
-HEADER FORMAT:
-\\begin{{center}}
-    {{\\Huge \\scshape [NAME]}} \\\\ \\vspace{{1pt}}
-    \\small \\raisebox{{-0.1\\height}}\\faPhone\\ [PHONE] ~ 
-    \\href{{mailto:[EMAIL]}}{{\\raisebox{{-0.2\\height}}\\faEnvelope\\ [EMAIL]}} ~ 
-    \\href{{[LINKEDIN]}}{{\\raisebox{{-0.2\\height}}\\faLinkedin\\ LinkedIn}} ~
-    \\href{{[GITHUB]}}{{\\raisebox{{-0.2\\height}}\\faGithub\\ GitHub}}
-    \\vspace{{-8pt}}
-\\end{{center}}
-
-SUMMARY SECTION:
-\\section{{Summary}}
-[Write strategic summary emphasizing what strategy recommends]
-
-EDUCATION SECTION:
-\\section{{Education}}
-  \\resumeSubHeadingListStart
-    \\resumeSubheading
-      {{[Degree]}}{{[Location]}}
-      {{[Program Details]}}{{[Dates]}}
-  \\resumeSubHeadingListEnd
-\\vspace{{-12pt}}
-
-EXPERIENCE SECTION:
-\\section{{Professional Experience}}
-  \\resumeSubHeadingListStart
-    \\resumeSubheading
-      {{[Job Title]}}{{[Dates]}}
-      {{[Company]}}{{[Location]}}
-      \\resumeItemListStart
-        \\resumeItem{{[Bullet point emphasizing relevant skills]}}
-        \\resumeItem{{[Bullet point with keywords from strategy]}}
-      \\resumeItemListEnd
-  \\resumeSubHeadingListEnd
-\\vspace{{-16pt}}
-
-PROJECTS SECTION:
-\\section{{Key Projects}}
-    \\vspace{{-5pt}}
-    \\resumeSubHeadingListStart
-      \\resumeProjectHeading
-          {{\\textbf{{[Project Name]}} $|$ \\emph{{[Technologies]}}}},{{[Year]}}
-          \\resumeItemListStart
-            \\resumeItem{{[Achievement]}}
-          \\resumeItemListEnd
-          \\vspace{{-13pt}}
-    \\resumeSubHeadingListEnd
-
-SKILLS SECTION:
-\\section{{Technical Skills}}
- \\begin{{itemize}}[leftmargin=0.15in, label={{}}]
-    \\small{{\\item{{
-     \\textbf{{[Category]:}} [Skills list] \\\\
-    }}}}
- \\end{{itemize}}
-\\vspace{{-16pt}}
-
-CRITICAL INSTRUCTIONS:
-1. FOLLOW THE STRATEGY EXACTLY - emphasize what it says to emphasize
-2. INCORPORATE all keywords from strategy naturally
-3. If GitHub/Portfolio present in contact_info, include them in header
-4. If extracurriculars exist and strategy recommends, add them as section
-5. ORDER sections per strategy recommendations
-6. Make summary compelling and targeted to the job
-7. Quantify achievements where possible
-8. Use strong action verbs
-9. Ensure ATS-friendly (keywords, formatting)
-10. Keep LaTeX syntax PERFECT - no syntax errors
-
-Generate the COMPLETE resume content starting with the header and ending with the last section.
-Do NOT include \\documentclass or \\begin{{document}} - only the content sections.
-"""
+        prompt = self._build_resume_prompt(resume_data, strategy, job_analysis)
 
         try:
             # Generate content using Gemini
-            response = self.model.generate_content(prompt)
-            latex_content = response.text
+            latex_content = self._generate(prompt, tool='generate_tailored_resume')
             
             # Clean up response (remove markdown if present)
             latex_content = latex_content.replace('```latex', '').replace('```', '').strip()
@@ -173,6 +298,193 @@ Do NOT include \\documentclass or \\begin{{document}} - only the content section
             raise
     
     
+    async def generate_tailored_resume_async(self, resume_data: dict, strategy: dict,
+                                             job_analysis: dict) -> str:
+        """Async version of generate_tailored_resume (runs in a worker thread)"""
+        return await asyncio.to_thread(self.generate_tailored_resume,
+                                       resume_data, strategy, job_analysis)
+    
+    
+    def generate_tailored_resume_stream(self, resume_data: dict, strategy: dict,
+                                        job_analysis: dict):
+        """
+        Streaming version of generate_tailored_resume
+        
+        Yields the template text before {{CONTENT}} immediately, then the
+        model's LaTeX as it is produced (markdown fences stripped on the fly),
+        then the rest of the template. Joining every fragment gives the same
+        document generate_tailored_resume() returns.
+        
+        Args:
+            resume_data: Structured resume from Tool #2
+            strategy: Strategic plan from Tool #3
+            job_analysis: Job requirements from Tool #1
+            
+        Yields:
+            str: LaTeX fragments, in document order
+        """
+        print("✍️  Streaming Tailored Resume in LaTeX Format...")
+        print("-" * 60)
+        
+        prompt = self._build_resume_prompt(resume_data, strategy, job_analysis)
+        prefix, _, suffix = self.latex_template.partition('{{CONTENT}}')
+        
+        yield prefix
+        
+        stripper = FenceStripper()
+        try:
+            for fragment in self._generate_stream(prompt, tool='generate_tailored_resume'):
+                cleaned = stripper.feed(fragment)
+                if cleaned:
+                    yield cleaned
+        except Exception as e:
+            print(f"❌ Error streaming resume: {e}")
+            raise
+        
+        remainder = stripper.flush()
+        if remainder:
+            yield remainder
+        
+        yield suffix
+        print("✅ Resume stream complete!\n")
+    
+    
+    def _section_plan(self, resume_data: dict, strategy: dict):
+        """
+        Decide which sections to generate and in what order
+        
+        The header always comes first. Sections named in the strategy's
+        structural_recommendations.experience_order are reordered to match
+        the order they are mentioned in; the rest keep the default order.
+        
+        Returns:
+            tuple: (ordered section names, {name: section spec})
+        """
+        sections = dict(RESUME_SECTIONS)
+        enhanced = strategy.get('enhanced_elements') or {}
+        if resume_data.get('extracurricular_activities') and enhanced.get('extracurriculars_strategy'):
+            sections['extracurricular'] = EXTRACURRICULAR_SECTION
+        
+        body = [name for name in sections if name != 'header']
+        
+        structure = strategy.get('structural_recommendations') or {}
+        advice = str(structure.get('experience_order') or '').lower()
+        mentions = {}
+        for name in body:
+            positions = [advice.find(alias) for alias in SECTION_ALIASES.get(name, [name])
+                         if alias in advice]
+            if positions:
+                mentions[name] = min(positions)
+        
+        # Mentioned sections swap among their own slots, in mention order
+        slots = [i for i, name in enumerate(body) if name in mentions]
+        for slot, name in zip(slots, sorted(mentions, key=mentions.get)):
+            body[slot] = name
+        
+        return ['header'] + body, sections
+    
+    
+    def _build_section_prompt(self, name: str, section: tuple, resume_data: dict,
+                              strategy: dict, job_analysis: dict) -> str:
+        """Build the prompt for one section (section-parallel mode)"""
+        heading, latex_format, fields = section
+        relevant = resume_data if fields is None else {f: resume_data.get(f) for f in fields}
+        
+        def render(relevant, job_analysis, strategy):
+            return f"""You are an expert resume writer. Generate ONE section of a tailored resume in LaTeX format.
+
+RELEVANT RESUME DATA:
+{relevant}
+
+JOB REQUIREMENTS:
+{job_analysis}
+
+STRATEGIC PLAN (MUST FOLLOW):
+{strategy}
+
+Generate ONLY the {name.upper()} section. Use this LaTeX format:
+
+{heading}:
+{latex_format}
+
+CRITICAL INSTRUCTIONS:
+1. FOLLOW THE STRATEGY EXACTLY - emphasize what it says to emphasize
+2. INCORPORATE the strategy's keywords that belong in this section naturally
+3. If GitHub/Portfolio present in contact_info, include them in the header
+4. Quantify achievements where possible
+5. Use strong action verbs
+6. Ensure ATS-friendly (keywords, formatting)
+7. Keep LaTeX syntax PERFECT - no syntax errors
+
+Return ONLY this section's LaTeX - no other sections, no \\documentclass, no explanations.
+"""
+        
+        return build_prompt(f'generate_section:{name}', render, relevant=relevant,
+                            job_analysis=job_analysis, strategy=strategy)
+    
+    
+    def _generate_section(self, name: str, section: tuple, resume_data: dict,
+                          strategy: dict, job_analysis: dict) -> str:
+        """Generate and clean one section's LaTeX"""
+        prompt = self._build_section_prompt(name, section, resume_data, strategy, job_analysis)
+        latex = self._generate(prompt, tool=f'generate_section:{name}')
+        return latex.replace('```latex', '').replace('```', '').strip()
+    
+    
+    async def generate_tailored_resume_sectioned_async(self, resume_data: dict, strategy: dict,
+                                                       job_analysis: dict) -> str:
+        """
+        Section-parallel version of generate_tailored_resume
+        
+        Each section (header, summary, education, experience, projects,
+        skills and - when recommended - extracurriculars) is generated by its
+        own concurrent LLM call from the same strategy and job analysis, then
+        assembled in the order the strategy recommends. Wall-clock time is
+        roughly that of the longest section instead of the whole document.
+        
+        Args:
+            resume_data: Structured resume from Tool #2
+            strategy: Strategic plan from Tool #3
+            job_analysis: Job requirements from Tool #1
+            
+        Returns:
+            str: Complete LaTeX resume code ready for Overleaf
+        """
+        print("✍️  Generating Tailored Resume (section-parallel)...")
+        print("-" * 60)
+        
+        order, sections = self._section_plan(resume_data, strategy)
+        start = time.perf_counter()
+        
+        try:
+            contents = await asyncio.gather(*[
+                asyncio.to_thread(self._generate_section, name, sections[name],
+                                  resume_data, strategy, job_analysis)
+                for name in order
+            ])
+        except Exception as e:
+            print(f"❌ Error generating resume sections: {e}")
+            raise
+        
+        latex_content = '\n\n'.join(content for content in contents if content)
+        final_resume = self.latex_template.replace('{{CONTENT}}', latex_content)
+        
+        print("✅ Resume generated successfully!")
+        print(f"   Length: {len(final_resume)} characters")
+        print(f"   Sections: {', '.join(name.title() for name in order)}")
+        print(f"   Wall-clock: {time.perf_counter() - start:.1f}s for {len(order)} parallel calls")
+        print()
+        
+        return final_resume
+    
+    
+    def generate_tailored_resume_sectioned(self, resume_data: dict, strategy: dict,
+                                           job_analysis: dict) -> str:
+        """Synchronous wrapper around generate_tailored_resume_sectioned_async"""
+        return asyncio.run(self.generate_tailored_resume_sectioned_async(
+            resume_data, strategy, job_analysis))
+    
+    
     def run_complete_pipeline(self, job_description: str, resume_text: str, 
                                output_filename: str = "tailored_resume.tex") -> str:
         """
@@ -198,31 +510,26 @@ Do NOT include \\documentclass or \\begin{{document}} - only the content section
         print("COMPLETE RESUME TAILORING PIPELINE")
         print("🚀 "*30 + "\n")
         
-        # Run Tools 1-3 (inherited method)
+        # Run all four tools through the pipeline DAG (Tools 1 + 2 in parallel)
         print("="*70)
-        print("RUNNING TOOLS 1-3: Analysis & Strategy")
+        print("RUNNING TOOLS 1-4: Analysis, Strategy & Resume")
         print("="*70)
-        analysis = self.run_complete_analysis(job_description, resume_text)
+        result = run_pipeline(self, job_description, resume_text)
         
         # Extract results
-        job_analysis = analysis['job_analysis']
-        resume_data = analysis['resume_data']
-        strategy = analysis['strategy']
+        strategy = result['strategy']
+        analysis = {
+            "job_analysis": result['job_analysis'],
+            "resume_data": result['resume_data'],
+            "strategy": strategy
+        }
         
-        # Tool #4: Generate resume
-        print("\n" + "="*70)
-        print("TOOL 4: Generating Tailored Resume")
-        print("="*70)
-        tailored_resume = self.generate_tailored_resume(
-            resume_data, 
-            strategy, 
-            job_analysis
-        )
+        for tool, timing in result['timings'].items():
+            print(f"   ⏱️  {tool}: {timing['ms']} ms")
         
-        # Save to file
         output_path = os.path.join(os.path.dirname(__file__), output_filename)
         with open(output_path, 'w') as f:
-            f.write(tailored_resume)
+            f.write(result['latex'])
         
         print("\n" + "="*70)
         print("✅ COMPLETE PIPELINE FINISHED!")
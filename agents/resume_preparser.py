@@ -0,0 +1,237 @@
+"""
+resume_preparser.py
+-------------------
+Heuristic resume pre-parser (no LLM).
+
+Splits a resume into sections by their headings and pulls out everything
+that compiled regexes can find reliably:
+- name, email, phone, location, LinkedIn, GitHub and portfolio URLs
+- skill lists (technical vs soft, using skill_taxonomy.py)
+- date ranges per section ("Jan 2020 - Present", "2023-2024")
+
+The result is a partial resume_data. ResumeAgent.analyze_resume() only
+asks the LLM for the remaining fields, and sends it the resume without
+the contact lines and skills sections. The upload endpoint returns the same
+result as an instant preview.
+"""
+
+import re
+from typing import Any, Dict, List, Optional
+
+from jd_extractor import AhoCorasick, longest_word_matches
+from skill_taxonomy import SOFT_CATEGORIES, iter_aliases
+
+
+# Section -> heading phrases (matched against the whole heading, lowercased)
+SECTION_HEADINGS = {
+    'summary': ('summary', 'professional summary', 'profile', 'objective', 'about me',
+                'career objective', 'professional profile'),
+    'technical_skills': ('technical skills', 'technologies', 'tech stack', 'tools'),
+    'soft_skills': ('soft skills', 'interpersonal skills'),
+    'skills': ('skills', 'core competencies', 'competencies', 'key skills', 'skills & tools',
+               'skills and tools'),
+    'experience': ('experience', 'work experience', 'professional experience', 'employment',
+                   'employment history', 'work history', 'career history'),
+    'education': ('education', 'academic background', 'education & training', 'academics'),
+    'projects': ('projects', 'personal projects', 'selected projects', 'key projects'),
+    'achievements': ('achievements', 'awards', 'honors', 'honours', 'awards & honors',
+                     'accomplishments'),
+    'certifications': ('certifications', 'certificates', 'licenses & certifications',
+                       'licenses and certifications'),
+    'extracurricular_activities': ('extracurricular activities', 'extracurriculars',
+                                   'activities', 'volunteering', 'volunteer experience',
+                                   'leadership & activities', 'leadership'),
+}
+HEADING_LOOKUP = {phrase: section for section, phrases in SECTION_HEADINGS.items()
+                  for phrase in phrases}
+
+SKILL_SECTIONS = ('skills', 'technical_skills', 'soft_skills')
+
+EMAIL_RE = re.compile(r'[\w.+-]+@[\w-]+(?:\.[\w-]+)+')
+PHONE_RE = re.compile(r'(?<!\d)(?:\+?\d{1,3}[\s.-]?)?(?:\(\d{2,4}\)|\d{2,4})[\s.-]?\d{3,4}[\s.-]?\d{3,4}(?!\d)')
+LINKEDIN_RE = re.compile(r'(?:https?://)?(?:[\w-]+\.)?linkedin\.com/(?:in|pub)/[\w%-]+/?', re.IGNORECASE)
+GITHUB_RE = re.compile(r'(?:https?://)?(?:www\.)?github\.com/[\w-]+/?(?![\w/-])', re.IGNORECASE)
+URL_RE = re.compile(r'(?:https?://|www\.)[^\s|,;()]+', re.IGNORECASE)
+PORTFOLIO_RE = re.compile(r'\b(?:portfolio|website)\s*:\s*(\S+)', re.IGNORECASE)
+LOCATION_RE = re.compile(r'\b(?:location|address|based in)\s*[:\-]\s*([^|\n]+)', re.IGNORECASE)
+
+MONTH = r'(?:jan|feb|mar|apr|may|jun|jul|aug|sep|sept|oct|nov|dec)[a-z]*\.?'
+DATE = rf'(?:{MONTH}\s*\d{{4}}|\d{{1,2}}/\d{{4}}|(?:19|20)\d{{2}})'
+DATE_RANGE_RE = re.compile(rf'({DATE})\s*(?:-|–|—|to)\s*({DATE}|present|current|now|today)',
+                           re.IGNORECASE)
+
+BULLET = re.compile(r'^\s*(?:[-*•·▪◦]|\d+[.)])\s*')
+SKILL_SPLIT = re.compile(r'\s*(?:,|;|\||•|·|\s/\s)\s*')
+
+
+def _heading(line: str):
+    """
+    (section, inline content) if the line is a section heading, else None
+
+    "EDUCATION", "Work Experience:" and "Skills: Python, SQL" are headings.
+    """
+    stripped = line.strip()
+    if not stripped or BULLET.match(line):
+        return None
+    label, sep, rest = stripped.partition(':')
+    key = re.sub(r'\s+', ' ', label).strip().lower()
+    section = HEADING_LOOKUP.get(key)
+    if section is None:
+        return None
+    return section, rest.strip() if sep else ''
+
+
+def segment_sections(resume_text: str) -> Dict[str, List[str]]:
+    """
+    Split a resume into its sections
+
+    Returns:
+        dict: section -> lines, in order of appearance. Lines before the
+              first heading are under 'header'; a repeated section is merged.
+    """
+    sections: Dict[str, List[str]] = {'header': []}
+    current = 'header'
+    for line in resume_text.splitlines():
+        heading = _heading(line)
+        if heading:
+            current, inline = heading
+            sections.setdefault(current, [])
+            if inline:
+                sections[current].append(inline)
+        elif line.strip():
+            sections[current].append(line.rstrip())
+    return sections
+
+
+def _split_skills(lines: List[str]) -> List[str]:
+    """'Languages: Python, SQL' / bullet lines -> ['Python', 'SQL']"""
+    skills = []
+    for line in lines:
+        line = BULLET.sub('', line)
+        if ':' in line:  # drop a "Languages:" style label
+            label, rest = line.split(':', 1)
+            if len(label.split()) <= 3 and rest.strip():
+                line = rest
+        for item in SKILL_SPLIT.split(line):
+            item = item.strip().strip('.')
+            if item and len(item) <= 50 and item.lower() not in (s.lower() for s in skills):
+                skills.append(item)
+    return skills
+
+
+def _first(pattern: re.Pattern, text: str) -> Optional[str]:
+    match = pattern.search(text)
+    return match.group(0).rstrip('/.') if match else None
+
+
+def _name(header: List[str]) -> Optional[str]:
+    """First header line that looks like a name (up to 5 words, no digits, '@' or ':')"""
+    for line in header[:3]:
+        text = line.strip()
+        if (text and len(text.split()) <= 5 and not re.search(r'[\d@:/|]', text)
+                and re.fullmatch(r"[^\W\d_][\w .'-]*", text)):
+            return text
+    return None
+
+
+class ResumePreParser:
+    """Builds the soft-skill matcher once; parse() is regex work only"""
+
+    def __init__(self):
+        self.automaton = AhoCorasick(
+            (alias, category) for alias, _, category in iter_aliases()
+        )
+
+    def _is_soft(self, skill: str) -> bool:
+        return any(category in SOFT_CATEGORIES
+                   for _, _, category in longest_word_matches(self.automaton, skill.lower()))
+
+    @staticmethod
+    def _is_contact_line(line: str) -> bool:
+        return any(pattern.search(line) for pattern in
+                   (EMAIL_RE, PHONE_RE, LINKEDIN_RE, GITHUB_RE, URL_RE, LOCATION_RE, PORTFOLIO_RE))
+
+    def parse(self, resume_text: str) -> Dict[str, Any]:
+        """
+        Pre-parse a resume
+
+        Args:
+            resume_text: Plain resume text
+
+        Returns:
+            dict: 'resume_data' (the fields found: name, contact_info, skills,
+                  technical_skills, soft_skills), 'sections' (section -> line
+                  count), 'dates' (section -> date ranges) and 'remaining_text'
+                  (the resume without its contact lines and skill sections)
+        """
+        sections = segment_sections(resume_text)
+        header_text = '\n'.join(sections['header'])
+
+        contact = {
+            'email': _first(EMAIL_RE, resume_text),
+            'phone': _first(PHONE_RE, header_text),
+            'location': None,
+            'linkedin': _first(LINKEDIN_RE, resume_text),
+            'github': _first(GITHUB_RE, header_text) or _first(GITHUB_RE, resume_text),
+            'portfolio': None,
+        }
+        location = LOCATION_RE.search(header_text)
+        if location:
+            contact['location'] = location.group(1).strip()
+        for url in URL_RE.findall(header_text):
+            if 'linkedin.com' not in url.lower() and 'github.com' not in url.lower():
+                contact['portfolio'] = url.rstrip('/.')
+                break
+        if contact['portfolio'] is None:
+            portfolio = PORTFOLIO_RE.search(header_text)
+            if portfolio:
+                contact['portfolio'] = portfolio.group(1).rstrip('/.')
+
+        resume_data: Dict[str, Any] = {'contact_info': contact}
+        name = _name(sections['header'])
+        if name:
+            resume_data['name'] = name
+
+        technical = _split_skills(sections.get('technical_skills', []))
+        soft = _split_skills(sections.get('soft_skills', []))
+        for skill in _split_skills(sections.get('skills', [])):
+            (soft if self._is_soft(skill) else technical).append(skill)
+        if technical or soft:
+            resume_data['skills'] = technical + soft
+            resume_data['technical_skills'] = technical
+            resume_data['soft_skills'] = soft
+
+        dates = {}
+        for section, lines in sections.items():
+            found = [f"{m.group(1)} - {m.group(2)}"
+                     for m in DATE_RANGE_RE.finditer('\n'.join(lines))]
+            if found:
+                dates[section] = found
+
+        # Header lines not already captured (e.g. a one-line summary) stay in
+        remaining = [line for line in sections['header']
+                     if line.strip() != name and not self._is_contact_line(line)]
+        for section, lines in sections.items():
+            if section == 'header' or section in SKILL_SECTIONS:
+                continue
+            remaining.append(section.replace('_', ' ').upper())
+            remaining.extend(lines)
+            remaining.append('')
+
+        return {
+            'resume_data': resume_data,
+            'sections': {section: len(lines) for section, lines in sections.items() if lines},
+            'dates': dates,
+            'remaining_text': '\n'.join(remaining).strip(),
+        }
+
+
+# Singleton instance (the skill matcher is built once)
+_preparser = None
+
+def preparse_resume(resume_text: str) -> Dict[str, Any]:
+    """Run the shared ResumePreParser (see ResumePreParser.parse)"""
+    global _preparser
+    if _preparser is None:
+        _preparser = ResumePreParser()
+    return _preparser.parse(resume_text)
@@ -0,0 +1,130 @@
+"""
+singleflight.py
+---------------
+In-process coalescing of identical in-flight calls.
+
+When several threads ask for the same key at the same time (the dashboard
+firing /api/rag/analyze twice, or many users pasting the same popular job
+posting), only the first one - the leader - runs the function. The others
+wait for it and receive the same result (or the same exception).
+
+Unlike the response cache, nothing is kept once the call finishes, so
+this also covers LLM_CACHE_ENABLED=false and responses still being
+generated.
+"""
+
+import threading
+from typing import Any, Callable, Dict
+
+from deadline import DeadlineExceeded, current_deadline
+
+
+class _Call:
+    """One in-flight call that followers can wait on"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.followers = 0
+
+
+class SingleFlight:
+    """
+    Deduplicate concurrent calls by key
+
+    Example:
+        flight = SingleFlight()
+        text = flight.do(prompt_hash, model_call, prompt)
+    """
+
+    def __init__(self):
+        self._calls: Dict[str, _Call] = {}
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.leaders = 0
+        self.coalesced = 0
+
+    def do(self, key: str, func: Callable, *args, **kwargs) -> Any:
+        """
+        Run func(*args, **kwargs) unless the same key is already running
+
+        Args:
+            key: Identity of the call (e.g. prompt hash)
+            func: The upstream call
+
+        Returns:
+            The leader's result
+
+        Raises:
+            The leader's exception, in the leader and every follower.
+            Followers wait no longer than their own request deadline
+            (DeadlineExceeded), and if the leader ran out of its deadline
+            while theirs has time left they run the call themselves.
+        """
+        with self._lock:
+            self.calls += 1
+
+        while True:
+            with self._lock:
+                call = self._calls.get(key)
+                if call is not None:
+                    call.followers += 1
+                    leader = False
+                else:
+                    call = self._calls[key] = _Call()
+                    self.leaders += 1
+                    leader = True
+
+            if leader:
+                break
+
+            deadline = current_deadline()
+            if not call.done.wait(timeout=deadline.remaining() if deadline else None):
+                raise DeadlineExceeded("Request deadline passed while waiting for an identical call")
+            if isinstance(call.error, DeadlineExceeded) and not (deadline and deadline.expired()):
+                continue  # the leader's deadline, not ours
+            with self._lock:
+                self.coalesced += 1
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = func(*args, **kwargs)
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Coalescing counters
+
+        Returns:
+            dict: calls, upstream calls made, calls saved and currently in flight
+        """
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "upstream_calls": self.leaders,
+                "calls_saved": self.coalesced,
+                "in_flight": len(self._calls)
+            }
+
+
+# Singleton instance
+_singleflight = None
+_singleflight_lock = threading.Lock()
+
+def get_singleflight() -> SingleFlight:
+    """Get or create the process-wide SingleFlight shared by all agents"""
+    global _singleflight
+    with _singleflight_lock:
+        if _singleflight is None:
+            _singleflight = SingleFlight()
+    return _singleflight
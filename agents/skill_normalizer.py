@@ -0,0 +1,213 @@
+"""
+skill_normalizer.py
+-------------------
+Canonical skill names for every agent output.
+
+The model writes the same skill many ways ("PySpark", "Spark (Python)",
+"pyspark"), which defeats exact-match caching and scoring. This index
+maps each variant to one canonical name from skill_taxonomy.py:
+1. compact form: lowercase with spaces, dots, hyphens, underscores and
+   brackets removed ("Node.js" / "node js" -> "nodejs")
+2. exact lookup of that form in a prefix trie of every alias
+3. otherwise the longest alias that is a prefix, if the rest is only a
+   version or a generic word ("Python 3.11", "React framework", but not
+   "React Native")
+4. otherwise the same again without any "(...)" qualifier
+   ("AWS (EC2, S3)") and then without filler words ("Experience with
+   LLMs", "Computer vision background")
+
+Unknown skills are kept as written (whitespace tidied). canonical_key()
+gives a stable key for any skill, known or not; skills_fingerprint() and
+with_skill_fingerprints() build on it for the pipeline's memo keys.
+"""
+
+import hashlib
+import re
+from typing import Any, Dict, Iterable, List, Optional
+
+from skill_taxonomy import SKILL_TAXONOMY
+
+
+# Extra spellings that only make sense for whole skill strings
+EXTRA_SYNONYMS = {
+    'PySpark': ['spark (python)', 'spark python', 'python spark'],
+    'Go': ['go'],
+    'R': ['r'],
+    'Node.js': ['node'],
+    'Large Language Models': ['large language models (llms)', 'llm systems'],
+}
+
+# Words that may follow a skill without changing it ("Django framework")
+GENERIC_SUFFIXES = ('programming', 'programminglanguage', 'language', 'lang', 'framework',
+                    'frameworks', 'library', 'libraries', 'development', 'skills', 'basics',
+                    'ecosystem', 'platform', 'stack')
+
+VERSION_RE = re.compile(r'^v?[\d.]+x?$')
+PARENTHETICAL_RE = re.compile(r'\s*\([^)]*\)')
+COMPACT_RE = re.compile(r'[\s._()\-]+')
+FILLER_RE = re.compile(
+    r'^(?:(?:strong|solid|proven|deep|hands-on|good|excellent)\s+)?'
+    r'(?:(?:experience|expertise|proficiency|knowledge|background|familiarity)\s+(?:with|in|of)\s+)?'
+    r'|\s+(?:background|experience|expertise|knowledge|skills)$',
+    re.IGNORECASE
+)
+
+MEMO_SIZE = 10000
+
+# Output fields normalized per tool (lists of strings, or of dicts with a 'skill' key)
+NORMALIZED_FIELDS = {
+    'analyze_job_description': ('required_skills', 'nice_to_have_skills', 'important_keywords'),
+    'analyze_resume': ('skills', 'technical_skills', 'soft_skills'),
+    'create_matching_strategy': ('skills_to_emphasize', 'keywords_to_add'),
+}
+
+
+def compact(text: str) -> str:
+    """Lowercase with separators removed: the lookup form of a skill"""
+    return COMPACT_RE.sub('', text.lower())
+
+
+class SkillTrie:
+    """Prefix trie mapping compact alias forms to canonical names"""
+
+    def __init__(self):
+        self._root: Dict[str, Any] = {}
+
+    def add(self, key: str, value: str) -> None:
+        node = self._root
+        for ch in key:
+            node = node.setdefault(ch, {})
+        node.setdefault('$', value)  # first writer wins (canonical names go first)
+
+    def get(self, key: str) -> Optional[str]:
+        node = self._root
+        for ch in key:
+            node = node.get(ch)
+            if node is None:
+                return None
+        return node.get('$')
+
+    def longest_prefix(self, key: str):
+        """(value, length) of the longest key prefix present, or (None, 0)"""
+        node, best = self._root, (None, 0)
+        for i, ch in enumerate(key):
+            node = node.get(ch)
+            if node is None:
+                break
+            if '$' in node:
+                best = (node['$'], i + 1)
+        return best
+
+
+class SkillNormalizer:
+    """Canonical names and keys for skill strings"""
+
+    def __init__(self):
+        self.trie = SkillTrie()
+        for skills in SKILL_TAXONOMY.values():
+            for canonical in skills:
+                self.trie.add(compact(canonical), canonical)
+        for skills in SKILL_TAXONOMY.values():
+            for canonical, aliases in skills.items():
+                for alias in aliases + EXTRA_SYNONYMS.get(canonical, []):
+                    self.trie.add(compact(alias), canonical)
+        self._memo: Dict[str, Optional[str]] = {}
+
+    def _lookup(self, key: str) -> Optional[str]:
+        exact = self.trie.get(key)
+        if exact:
+            return exact
+        canonical, length = self.trie.longest_prefix(key)
+        rest = key[length:]
+        if canonical and length > 1 and (VERSION_RE.match(rest) or rest in GENERIC_SUFFIXES):
+            return canonical
+        return None
+
+    def canonical(self, skill: str) -> Optional[str]:
+        """Canonical name for a skill, or None if it isn't in the taxonomy"""
+        if skill not in self._memo:
+            found = self._lookup(compact(skill))
+            if found is None:
+                bare = PARENTHETICAL_RE.sub('', skill).strip()
+                for candidate in (bare, FILLER_RE.sub('', bare)):
+                    if found is None and candidate:
+                        found = self._lookup(compact(candidate))
+            if len(self._memo) >= MEMO_SIZE:
+                self._memo.clear()
+            self._memo[skill] = found
+        return self._memo[skill]
+
+    def normalize(self, skill: str) -> str:
+        """Canonical name, or the skill as written with whitespace tidied"""
+        return self.canonical(skill) or ' '.join(skill.split())
+
+    def canonical_key(self, skill: str) -> str:
+        """Stable key: the same for every spelling of a known skill"""
+        return compact(self.normalize(skill))
+
+    def normalize_list(self, skills: Iterable[Any]) -> List[Any]:
+        """
+        Normalize a list of skills, dropping duplicates (first spelling wins)
+
+        Dict items with a 'skill' key (strategy entries) get that key
+        normalized and are never dropped; other items pass through.
+        """
+        result, seen = [], set()
+        for item in skills:
+            if isinstance(item, str):
+                key = self.canonical_key(item)
+                if key and key not in seen:
+                    seen.add(key)
+                    result.append(self.normalize(item))
+            elif isinstance(item, dict) and isinstance(item.get('skill'), str):
+                result.append({**item, 'skill': self.normalize(item['skill'])})
+            else:
+                result.append(item)
+        return result
+
+
+# Singleton instance (the trie is built once)
+_normalizer = None
+
+def get_skill_normalizer() -> SkillNormalizer:
+    """Get or create the shared SkillNormalizer"""
+    global _normalizer
+    if _normalizer is None:
+        _normalizer = SkillNormalizer()
+    return _normalizer
+
+
+def canonical_key(skill: str) -> str:
+    """Stable cache key for a skill (see SkillNormalizer.canonical_key)"""
+    return get_skill_normalizer().canonical_key(skill)
+
+
+def skills_fingerprint(skills: Iterable[str]) -> str:
+    """Order- and spelling-independent hash of a skill set"""
+    keys = sorted({canonical_key(s) for s in skills if isinstance(s, str)})
+    return hashlib.sha256('\n'.join(keys).encode('utf-8')).hexdigest()[:16]
+
+
+def with_skill_fingerprints(tool: str, data: Any) -> Any:
+    """
+    Copy of a tool's output with each skill list replaced by its fingerprint
+
+    Meant for cache keys: two outputs that list the same skills in another
+    order or spelling give the same key. Non-dict data is returned as is.
+    """
+    if not isinstance(data, dict):
+        return data
+    view = dict(data)
+    for field in NORMALIZED_FIELDS.get(tool, ()):
+        if isinstance(view.get(field), list):
+            view[field] = skills_fingerprint(view[field])
+    return view
+
+
+def normalize_output(tool: str, data: Dict[str, Any]) -> Dict[str, Any]:
+    """Normalize the skill fields of a tool's output in place (see NORMALIZED_FIELDS)"""
+    normalizer = get_skill_normalizer()
+    for field in NORMALIZED_FIELDS.get(tool, ()):
+        if isinstance(data.get(field), list):
+            data[field] = normalizer.normalize_list(data[field])
+    return data
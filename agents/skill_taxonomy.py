@@ -0,0 +1,176 @@
+"""
+skill_taxonomy.py
+-----------------
+Bundled skills taxonomy: canonical skill names, their synonyms and a
+category. Used by the local job description extractor (jd_extractor.py).
+
+Aliases are matched case-insensitively on word boundaries. Leave out
+aliases that are also everyday words ("go", "r", "spring") unless they
+come with context ("golang", "r programming", "spring boot").
+"""
+
+from typing import Dict, List
+
+
+# category -> canonical name -> aliases (the canonical name matches too,
+# except for AMBIGUOUS_NAMES)
+SKILL_TAXONOMY: Dict[str, Dict[str, List[str]]] = {
+    'languages': {
+        'Python': ['python3', 'python 3'],
+        'Java': [],
+        'JavaScript': ['js', 'ecmascript', 'es6'],
+        'TypeScript': ['ts'],
+        'C': [],
+        'C++': ['cpp', 'c/c++'],
+        'C#': ['c sharp', 'csharp'],
+        'Go': ['golang', 'go lang'],
+        'Rust': [],
+        'Scala': [],
+        'Kotlin': [],
+        'Swift': [],
+        'Ruby': [],
+        'PHP': [],
+        'R': ['r programming', 'r language', 'rstudio'],
+        'MATLAB': [],
+        'SQL': ['t-sql', 'pl/sql', 'ansi sql'],
+        'Bash': ['shell scripting', 'shell script', 'unix shell'],
+    },
+    'ml_ai': {
+        'Machine Learning': ['ml', 'machine-learning'],
+        'Artificial Intelligence': ['ai', 'ml/ai', 'ai/ml'],
+        'Deep Learning': ['dl', 'neural networks', 'neural network'],
+        'Large Language Models': ['llm', 'llms', 'large language model', 'generative ai', 'genai'],
+        'Transformers': ['transformer', 'transformer models', 'hugging face', 'huggingface'],
+        'Natural Language Processing': ['nlp'],
+        'Computer Vision': ['image recognition', 'object detection'],
+        'PyTorch': ['torch'],
+        'TensorFlow': ['tf', 'keras'],
+        'scikit-learn': ['sklearn', 'scikit learn'],
+        'XGBoost': ['lightgbm', 'gradient boosting'],
+        'MLOps': ['ml ops', 'model deployment', 'model serving'],
+        'Real-time Inference': ['real-time inference', 'realtime inference', 'online inference'],
+        'Reinforcement Learning': ['rl'],
+        'Retrieval-Augmented Generation': ['rag'],
+        'LangChain': [],
+        'Prompt Engineering': [],
+        'Statistics': ['statistical analysis', 'statistical modeling', 'statistical modelling'],
+    },
+    'data': {
+        'Data Analytics': ['data analysis', 'analytics'],
+        'Data Engineering': ['data pipelines', 'data pipeline', 'etl', 'elt'],
+        'Data Quality': ['data quality assessment', 'data validation'],
+        'Apache Spark': ['spark'],
+        'PySpark': [],
+        'Hadoop': ['hdfs', 'mapreduce'],
+        'Kafka': ['apache kafka'],
+        'Airflow': ['apache airflow'],
+        'Pandas': [],
+        'NumPy': [],
+        'Databricks': [],
+        'Snowflake': [],
+        'Tableau': [],
+        'Power BI': ['powerbi'],
+        'Distributed Systems': ['distributed computing'],
+    },
+    'databases': {
+        'PostgreSQL': ['postgres', 'psql'],
+        'MySQL': [],
+        'MongoDB': ['mongo'],
+        'Redis': [],
+        'Elasticsearch': ['elastic search', 'opensearch'],
+        'Cassandra': [],
+        'DynamoDB': [],
+        'Vector Databases': ['vector database', 'faiss', 'pinecone', 'chromadb'],
+    },
+    'cloud_devops': {
+        'AWS': ['amazon web services', 'ec2', 's3', 'sagemaker', 'lambda'],
+        'Azure': ['microsoft azure'],
+        'GCP': ['google cloud', 'google cloud platform', 'vertex ai', 'bigquery'],
+        'OCI': ['oracle cloud'],
+        'Cloud Computing': ['cloud', 'cloud deployment', 'cloud platforms', 'cloud providers'],
+        'Docker': ['containers', 'containerization'],
+        'Kubernetes': ['k8s'],
+        'Terraform': ['infrastructure as code', 'iac'],
+        'CI/CD': ['continuous integration', 'continuous delivery', 'continuous deployment',
+                  'github actions', 'jenkins', 'gitlab ci'],
+        'DevOps': ['devops model', 'sre', 'site reliability'],
+        'Linux': ['unix'],
+        'Git': ['version control'],
+        'GitHub': ['github profile'],
+        'Automation': ['automation methodologies', 'test automation'],
+        'Monitoring': ['observability', 'network monitoring', 'prometheus', 'grafana'],
+        'Microservices': ['microservice', 'service-oriented architecture'],
+    },
+    'web': {
+        'React': ['react.js', 'reactjs'],
+        'Angular': ['angularjs'],
+        'Vue.js': ['vue', 'vuejs'],
+        'Node.js': ['nodejs'],
+        'Django': [],
+        'Flask': [],
+        'FastAPI': [],
+        'Spring Boot': ['spring framework'],
+        '.NET': ['dotnet', '.net core', 'asp.net'],
+        'REST APIs': ['restful', 'rest api', 'restful apis'],
+        'GraphQL': [],
+        'HTML': ['html5'],
+        'CSS': ['css3', 'tailwind'],
+    },
+    'security': {
+        'Cybersecurity': ['security', 'information security', 'infosec'],
+        'Network Security': ['network and database security'],
+        'Privacy Compliance': ['privacy', 'compliance', 'gdpr', 'security policies'],
+        'Threat Detection': ['detections', 'detection engineering', 'intrusion detection', 'siem'],
+        'Networking': ['tcp/ip', 'network infrastructure', 'network traffic'],
+    },
+    'practices': {
+        'Agile': ['scrum', 'kanban'],
+        'Testing': ['unit testing', 'integration testing', 'tdd', 'pytest'],
+        'System Design': ['software architecture', 'architecture design'],
+        'Root Cause Analysis': ['root cause analyses', 'rca', 'troubleshooting'],
+        'Requirements Analysis': ['requirements gathering', 'data collection requirements'],
+        'Open Source': ['open-source', 'oss contributions', 'contributions'],
+        'Portfolio': ['project portfolio', 'portfolio demonstrating'],
+    },
+    'soft': {
+        'Leadership': ['team leadership', 'leading teams', 'mentoring', 'mentorship'],
+        'Communication': ['verbal and written communication', 'written communication',
+                          'verbal communication', 'communication skills'],
+        'Teamwork': ['collaboration', 'teamwork and collaboration', 'cross-functional'],
+        'Critical Thinking': ['investigative mindset', 'analytical thinking'],
+        'Problem Solving': ['solve complex problems', 'problem-solving'],
+        'Organizational Skills': ['organizational', 'time management'],
+        'Community Engagement': ['tech communities', 'meetups', 'community involvement'],
+    },
+}
+
+# Categories that describe how someone works rather than what tools they know
+SOFT_CATEGORIES = {'soft'}
+
+# Canonical names too ambiguous to match on their own: only their aliases
+# match, plus the capitalized name inside a list ("Go, C and R" - see
+# jd_extractor.list_name_matches)
+AMBIGUOUS_NAMES = {'go', 'r', 'c'}
+
+
+def iter_aliases():
+    """
+    Yield (alias, canonical, category) for every alias, canonical names included
+
+    Yields:
+        tuple: (lowercase alias, canonical name, category)
+    """
+    for category, skills in SKILL_TAXONOMY.items():
+        for canonical, aliases in skills.items():
+            if canonical.lower() not in AMBIGUOUS_NAMES:
+                yield canonical.lower(), canonical, category
+            for alias in aliases:
+                yield alias.lower(), canonical, category
+
+
+def skill_category(canonical: str) -> str:
+    """Category of a canonical skill name ('' if unknown)"""
+    for category, skills in SKILL_TAXONOMY.items():
+        if canonical in skills:
+            return category
+    return ''
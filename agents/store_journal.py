@@ -0,0 +1,237 @@
+"""
+store_journal.py
+----------------
+Delta journal for per-user FAISS indexes.
+
+Re-analysis used to rebuild a user's index and rewrite it to disk in
+full. Chunks now have stable IDs (a hash of user, source and text), so
+an upsert only adds the chunks that are new and deletes the ones that
+are gone. Those changes are appended to journal.jsonl next to the saved
+index instead of rewriting it:
+
+    {"op": "add", "ids": [...], "texts": [...], "metadatas": [...], "vectors": [...]}
+    {"op": "delete", "ids": [...]}
+
+Vectors are stored (base64 float32), so replaying the journal on load
+never calls the embedding backend. Once the journal holds enough ops,
+the index is saved in full and the journal starts over (compaction).
+A torn last line from a crash mid-write is ignored on replay. The op
+count that triggers compaction is kept in memory (the file is counted
+once per StoreJournal), so a write never re-reads the journal.
+
+Frequent small writes (feedback ratings) go through a JournalBuffer,
+which collects them per store and appends each batch with one fsync -
+when the batch is full, on a timer, and at exit. Flushes run one at a
+time, so once flush(key) returns every change queued for that store
+before the call is in its journal (loads rely on this).
+"""
+
+import atexit
+import base64
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+def chunk_id(user_id: str, source: str, text: str) -> str:
+    """Stable ID for a chunk: the same text from the same source keeps its ID"""
+    return hashlib.sha256(f"{user_id}\n{source}\n{text}".encode('utf-8')).hexdigest()[:32]
+
+
+def _encode_vector(vector: Sequence[float]) -> str:
+    return base64.b64encode(np.asarray(vector, dtype=np.float32).tobytes()).decode('ascii')
+
+
+def _decode_vector(data: str) -> List[float]:
+    return np.frombuffer(base64.b64decode(data), dtype=np.float32).tolist()
+
+
+class StoreJournal:
+    """
+    Append-only log of changes to one saved index
+
+    Args:
+        store_dir: Folder the index was saved to (FAISS.save_local)
+        lock: RLock to guard the file with (default: a new one); pass a
+              lock that outlives this object if it may be recreated
+    """
+
+    FILENAME = 'journal.jsonl'
+
+    def __init__(self, store_dir: str, lock: Optional[threading.RLock] = None):
+        self.path = os.path.join(store_dir, self.FILENAME)
+        # Held while the file changes; hold it to read or move the store folder
+        self.lock = lock or threading.RLock()
+        self._ops = None  # counted from the file on first use
+
+    def _count_lines(self) -> int:
+        if not os.path.exists(self.path):
+            return 0
+        with open(self.path, 'rb') as f:
+            return sum(1 for _ in f)
+
+    def _append(self, entries: List[Dict[str, Any]]) -> None:
+        lines = ''.join(json.dumps(entry) + '\n' for entry in entries)
+        with self.lock:
+            if self._ops is None:
+                self._ops = self._count_lines()
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(lines)
+                f.flush()
+                os.fsync(f.fileno())
+            self._ops += len(entries)
+
+    def record(self, added: Sequence[tuple] = (), deleted: Sequence[str] = ()) -> None:
+        """
+        Append one upsert's changes
+
+        Args:
+            added: (id, text, metadata, vector) per new chunk
+            deleted: IDs of removed chunks
+        """
+        self.record_batch([(added, deleted)])
+
+    def record_batch(self, changes: Sequence[Tuple[Sequence[tuple], Sequence[str]]]) -> None:
+        """Append several upserts' (added, deleted) changes, in order, with one fsync"""
+        entries = []
+        for added, deleted in changes:
+            if deleted:
+                entries.append({"op": "delete", "ids": list(deleted)})
+            if added:
+                ids, texts, metadatas, vectors = zip(*added)
+                entries.append({"op": "add", "ids": list(ids), "texts": list(texts),
+                                "metadatas": list(metadatas),
+                                "vectors": [_encode_vector(v) for v in vectors]})
+        if entries:
+            self._append(entries)
+
+    def entries(self) -> List[Dict[str, Any]]:
+        """Every complete entry, oldest first"""
+        if not os.path.exists(self.path):
+            return []
+        result = []
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    result.append(json.loads(line))
+                except json.JSONDecodeError:
+                    print(f"⚠️  Ignoring a torn journal line in {self.path}")
+        return result
+
+    def op_count(self) -> int:
+        """Number of ops since the last compaction"""
+        with self.lock:
+            if self._ops is None:
+                self._ops = self._count_lines()
+            return self._ops
+
+    def replay(self, store: Any) -> int:
+        """
+        Apply the journal to a freshly loaded store
+
+        Returns:
+            int: Entries applied
+        """
+        entries = self.entries()
+        for entry in entries:
+            present = set(store.index_to_docstore_id.values())
+            if entry.get('op') == 'delete':
+                ids = [i for i in entry['ids'] if i in present]
+                if ids:
+                    store.delete(ids)
+            elif entry.get('op') == 'add':
+                rows = [(i, text, meta, vector) for i, text, meta, vector in
+                        zip(entry['ids'], entry['texts'], entry['metadatas'], entry['vectors'])
+                        if i not in present]
+                if rows:
+                    ids, texts, metadatas, vectors = zip(*rows)
+                    store.add_embeddings(list(zip(texts, [_decode_vector(v) for v in vectors])),
+                                         metadatas=list(metadatas), ids=list(ids))
+        return len(entries)
+
+    def clear(self) -> None:
+        """Start over (the index was just saved in full)"""
+        with self.lock:
+            if os.path.exists(self.path):
+                os.remove(self.path)
+            self._ops = 0
+
+
+class JournalBuffer:
+    """
+    Batches journal writes per store
+
+    Changes are already applied in memory when they're added here; only
+    their persistence is deferred. A crash loses at most one flush
+    interval of them.
+
+    Args:
+        write: Callback(key, changes) that appends one batch of
+               (added, deleted) change sets (StoreJournal.record_batch)
+        batch_size: Flush a store's batch once it holds this many chunks
+        flush_seconds: Flush everything at least this often
+    """
+
+    def __init__(self, write: Callable[[str, List[tuple]], None],
+                 batch_size: int = 20, flush_seconds: float = 5.0):
+        self.write = write
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self._pending: Dict[str, List[tuple]] = {}
+        self._lock = threading.Lock()
+        self._flushing = threading.Lock()  # a popped batch is written before the next flush
+        self._flusher = None
+        self.flushes = 0
+        self.written = 0
+        atexit.register(self.flush)
+
+    def add(self, key: str, added: Sequence[tuple] = (), deleted: Sequence[str] = ()) -> None:
+        """Queue changes for a store (flushing it if its batch is full)"""
+        with self._lock:
+            batch = self._pending.setdefault(key, [])
+            batch.append((list(added), list(deleted)))
+            full = _size(batch) >= self.batch_size
+            if self._flusher is None:
+                self._flusher = threading.Thread(target=self._run, daemon=True,
+                                                 name='journal-flush')
+                self._flusher.start()
+        if full:
+            self.flush(key)
+
+    def flush(self, key: str = None) -> None:
+        """Write the queued changes for one store, or for all of them"""
+        with self._flushing:
+            with self._lock:
+                keys = [key] if key is not None else list(self._pending)
+                batches = [(k, self._pending.pop(k)) for k in keys if k in self._pending]
+            for k, changes in batches:
+                try:
+                    self.write(k, changes)
+                except Exception as e:
+                    print(f"❌ Journal flush for {k} failed, will retry: {e}")
+                    with self._lock:
+                        self._pending[k] = changes + self._pending.get(k, [])
+                    continue
+                with self._lock:
+                    self.flushes += 1
+                    self.written += _size(changes)
+
+    def pending(self) -> int:
+        """Chunks added or deleted but not written yet"""
+        with self._lock:
+            return sum(_size(batch) for batch in self._pending.values())
+
+    def _run(self) -> None:
+        while True:
+            time.sleep(self.flush_seconds)
+            self.flush()
+
+
+def _size(changes: Sequence[tuple]) -> int:
+    return sum(len(added) + len(deleted) for added, deleted in changes)
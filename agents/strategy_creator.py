@@ -8,7 +8,10 @@ This is the "BRAIN" of the agent - where strategic decisions are made!
 """
 
 from resume_analyzer import ResumeAgent
-import json
+from pipeline import run_analysis_async
+from prompt_builder import build_prompt
+from skill_normalizer import normalize_output
+import asyncio
 
 
 class StrategyAgent(ResumeAgent):
@@ -61,13 +64,15 @@ class StrategyAgent(ResumeAgent):
         print("-" * 60)
         
         # Create a comprehensive prompt for strategic analysis
-        prompt = f"""You are an expert resume strategist. Your job is to create a detailed strategy for tailoring a resume to maximize the match with a job posting.
+        # (data blocks are compacted and kept within the tool's token budget)
+        def render(job_analysis, resume_data):
+            return f"""You are an expert resume strategist. Your job is to create a detailed strategy for tailoring a resume to maximize the match with a job posting.
 
 JOB REQUIREMENTS:
-{json.dumps(job_analysis, indent=2)}
+{job_analysis}
 
 CANDIDATE'S BACKGROUND:
-{json.dumps(resume_data, indent=2)}
+{resume_data}
 
 Analyze the match and create a strategic plan in JSON format:
 {{
@@ -146,10 +151,12 @@ IMPORTANT:
 
 Return ONLY the JSON, no other text."""
 
+        prompt = build_prompt('create_matching_strategy', render,
+                              job_analysis=job_analysis, resume_data=resume_data)
+
         try:
-            response = self.model.generate_content(prompt)
-            response_text = response.text.replace('```json', '').replace('```', '').strip()
-            strategy = json.loads(response_text)
+            strategy = normalize_output('create_matching_strategy',
+                                        self._generate_json(prompt, tool='create_matching_strategy'))
             
             # Display strategy summary
             print("✅ Strategy created!")
@@ -168,14 +175,19 @@ Return ONLY the JSON, no other text."""
             raise
     
     
+    async def create_matching_strategy_async(self, job_analysis: dict, resume_data: dict) -> dict:
+        """Async version of create_matching_strategy (runs in a worker thread)"""
+        return await asyncio.to_thread(self.create_matching_strategy, job_analysis, resume_data)
+    
+    
     def run_complete_analysis(self, job_description: str, resume_text: str) -> dict:
         """
         Run the complete 3-step analysis process
         
         This orchestrates all three tools:
-        1. Analyze job (Tool #1)
-        2. Analyze resume (Tool #2)
-        3. Create strategy (Tool #3)
+        1. Analyze job (Tool #1)        } run at the same time -
+        2. Analyze resume (Tool #2)     } neither needs the other
+        3. Create strategy (Tool #3)    - waits for both
         
         Returns:
             dict: Complete analysis with all data and strategy
@@ -185,29 +197,15 @@ Return ONLY the JSON, no other text."""
         print("COMPLETE AGENT ANALYSIS - 3 TOOLS")
         print("🤖 "*30 + "\n")
         
-        # Step 1: Analyze Job
-        print("="*70)
-        print("STEP 1 of 3: Understanding Job Requirements")
-        print("="*70)
-        job_analysis = self.analyze_job_description(job_description)
-        
-        # Step 2: Analyze Resume
-        print("\n" + "="*70)
-        print("STEP 2 of 3: Understanding Your Background")
+        # Steps 1 + 2 run concurrently, Step 3 waits for both
         print("="*70)
-        resume_data = self.analyze_resume(resume_text)
-        
-        # Step 3: Create Strategy
-        print("\n" + "="*70)
-        print("STEP 3 of 3: Creating Strategic Plan (THE BRAIN!)")
+        print("STEPS 1-3: Job + Resume analysis (in parallel), then Strategic Plan")
         print("="*70)
-        strategy = self.create_matching_strategy(job_analysis, resume_data)
-        
-        # Return everything
-        return {
-            "job_analysis": job_analysis,
-            "resume_data": resume_data,
-            "strategy": strategy
-        }
+        return asyncio.run(self.run_complete_analysis_async(job_description, resume_text))
+    
+    
+    async def run_complete_analysis_async(self, job_description: str, resume_text: str) -> dict:
+        """Async version of run_complete_analysis (Tools 1 and 2 in parallel)"""
+        return await run_analysis_async(self, job_description, resume_text)
 
 
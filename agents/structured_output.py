@@ -0,0 +1,267 @@
+"""
+structured_output.py
+--------------------
+JSON output schemas and a fault-tolerant JSON parser for the analyzer tools.
+
+The model is asked for JSON (response_mime_type='application/json' when the
+installed google-generativeai supports it), but a response can still arrive
+wrapped in ```json fences, with prose around it, with trailing commas or
+cut off mid-object. parse_json() repairs what it can and salvages every
+complete field of a truncated object instead of throwing the call away.
+It works on a partial stream buffer too.
+
+Each tool has a schema (field -> expected type). missing_fields() tells the
+agent which fields to re-ask for, so a partial answer costs one small
+follow-up call instead of a full re-run.
+"""
+
+import inspect
+import json
+import re
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+
+# Top-level fields each tool must return, with their expected JSON type
+SCHEMAS = {
+    'analyze_job_description': {
+        'required_skills': list,
+        'nice_to_have_skills': list,
+        'education_required': str,
+        'experience_level': str,
+        'key_responsibilities': list,
+        'important_keywords': list,
+        'company_culture': str,
+    },
+    # Fast path: the fields jd_extractor.py can't fill
+    'enrich_job_description': {
+        'experience_level': str,
+        'education_required': str,
+        'key_responsibilities': list,
+        'company_culture': str,
+        'other_required_skills': list,
+        'other_nice_to_have_skills': list,
+    },
+    'analyze_resume': {
+        'name': str,
+        'contact_info': dict,
+        'summary': str,
+        'skills': list,
+        'technical_skills': list,
+        'soft_skills': list,
+        'experience': list,
+        'education': list,
+        'projects': list,
+        'achievements': list,
+        'certifications': list,
+        'extracurricular_activities': list,
+    },
+    # Pre-parsed path: the fields resume_preparser.py can't fill
+    'enrich_resume': {
+        'contact_info': dict,
+        'summary': str,
+        'experience': list,
+        'education': list,
+        'projects': list,
+        'achievements': list,
+        'certifications': list,
+        'extracurricular_activities': list,
+        'other_technical_skills': list,
+        'other_soft_skills': list,
+    },
+    'create_matching_strategy': {
+        'overall_match_score': int,
+        'match_summary': str,
+        'strong_matches': list,
+        'partial_matches': list,
+        'gaps': list,
+        'skills_to_emphasize': list,
+        'experience_to_highlight': list,
+        'keywords_to_add': list,
+        'structural_recommendations': dict,
+        'enhanced_elements': dict,
+        'differentiation_strategy': str,
+        'specific_actions': list,
+    },
+}
+
+
+class StructuredOutputError(ValueError):
+    """Raised when no JSON object can be recovered from a response"""
+
+
+# ========================================================================
+# REQUESTING JSON
+# ========================================================================
+
+@lru_cache(maxsize=1)
+def supports_json_mime_type() -> bool:
+    """True if this google-generativeai accepts response_mime_type"""
+    try:
+        import google.generativeai as genai
+        config_cls = genai.types.GenerationConfig
+        fields = getattr(config_cls, '__dataclass_fields__', None) or inspect.signature(config_cls).parameters
+        return 'response_mime_type' in fields
+    except Exception:
+        return False
+
+
+def json_generation_config() -> Dict[str, Any]:
+    """Generation config asking for a JSON response (empty if unsupported)"""
+    return {'response_mime_type': 'application/json'} if supports_json_mime_type() else {}
+
+
+# ========================================================================
+# TOLERANT PARSING
+# ========================================================================
+
+TYPE_NAMES = {list: 'array', dict: 'object', str: 'string', int: 'number'}
+_NUMBER = re.compile(r'-?\d+(?:\.\d+)?')
+_TRAILING_COMMA = re.compile(r',\s*([}\]])')
+_CLOSERS = {'{': '}', '[': ']'}
+
+
+def _scan(text: str):
+    """
+    Walk a JSON object prefix, tracking strings and open brackets
+
+    Returns:
+        (end, stack, in_string, cut_points): end is the index just past the
+        top-level object if it closes (else None); cut_points are
+        (index, stack) pairs at each comma where everything before is a
+        complete value.
+    """
+    stack: List[str] = []
+    in_string = escaped = False
+    cut_points = []
+    for i, ch in enumerate(text):
+        if in_string:
+            if escaped:
+                escaped = False
+            elif ch == '\\':
+                escaped = True
+            elif ch == '"':
+                in_string = False
+            continue
+        if ch == '"':
+            in_string = True
+        elif ch in '{[':
+            stack.append(ch)
+        elif ch in '}]':
+            if stack:
+                stack.pop()
+            if not stack:
+                return i + 1, [], False, cut_points
+        elif ch == ',':
+            cut_points.append((i, list(stack)))
+    return None, stack, in_string, cut_points
+
+
+def _loads(candidate: str) -> Optional[Any]:
+    for attempt in (candidate, _TRAILING_COMMA.sub(r'\1', candidate)):
+        try:
+            return json.loads(attempt)
+        except json.JSONDecodeError:
+            continue
+    return None
+
+
+def parse_json(text: str) -> Tuple[Dict[str, Any], bool]:
+    """
+    Parse a model response into a dict, repairing it if needed
+
+    Handles code fences, prose around the object, trailing commas and
+    truncated output (closes open brackets, or drops the last incomplete
+    value).
+
+    Args:
+        text: Raw response text (or a partial stream buffer)
+
+    Returns:
+        (data, repaired): repaired is True if the object had to be
+        repaired or salvaged
+
+    Raises:
+        StructuredOutputError: Nothing usable in the response
+    """
+    cleaned = text.replace('```json', '').replace('```', '').strip()
+    try:
+        data = json.loads(cleaned)
+        if isinstance(data, dict):
+            return data, False
+    except json.JSONDecodeError:
+        pass
+
+    start = cleaned.find('{')
+    if start == -1:
+        raise StructuredOutputError(f"No JSON object in response: {cleaned[:80]!r}")
+    body = cleaned[start:]
+
+    end, stack, in_string, cut_points = _scan(body)
+    if end is not None:
+        data = _loads(body[:end])
+        if isinstance(data, dict):
+            return data, True
+
+    # Truncated: close everything that is still open (a half-written
+    # string is likely a cut-off value, so that case skips straight on)...
+    candidates = []
+    if end is None and not in_string:
+        tail = body.rstrip().rstrip(',:')
+        candidates.append(tail + ''.join(_CLOSERS[b] for b in reversed(stack)))
+    # ...or cut back to the last complete field
+    for index, open_stack in reversed(cut_points):
+        candidates.append(body[:index] + ''.join(_CLOSERS[b] for b in reversed(open_stack)))
+
+    for candidate in candidates:
+        data = _loads(candidate)
+        if isinstance(data, dict):
+            return data, True
+
+    raise StructuredOutputError(f"Could not repair JSON response: {cleaned[:80]!r}")
+
+
+# ========================================================================
+# SCHEMA CHECKS
+# ========================================================================
+
+def missing_fields(tool: str, data: Dict[str, Any], fields: Optional[List[str]] = None) -> List[str]:
+    """Schema fields (or just the requested ones) absent from data (null counts as present)"""
+    return [field for field in SCHEMAS.get(tool, {})
+            if field not in data and (fields is None or field in fields)]
+
+
+def conform(tool: str, data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Light type coercion so callers can rely on the schema's shape
+
+    A string where a list is expected becomes a one-item list, and a
+    number written as text ("85", "85/100", "85%") becomes an int; fields
+    that are still missing get an empty value of the right type.
+    """
+    for field, expected in SCHEMAS.get(tool, {}).items():
+        value = data.get(field)
+        if field not in data:
+            data[field] = expected() if expected in (list, dict) else None
+        elif expected is list and isinstance(value, str):
+            data[field] = [value]
+        elif expected is int and not (isinstance(value, int) and not isinstance(value, bool)):
+            data[field] = _to_int(value)
+    return data
+
+
+def _to_int(value: Any) -> Optional[int]:
+    """First number in value, rounded (None if there isn't one)"""
+    if isinstance(value, float):
+        return round(value)
+    match = _NUMBER.search(value) if isinstance(value, str) else None
+    return round(float(match.group())) if match else None
+
+
+def missing_fields_prompt(original_prompt: str, tool: str, fields: List[str]) -> str:
+    """Follow-up prompt asking only for the fields that didn't come back"""
+    wanted = ', '.join(f'"{f}" ({TYPE_NAMES[SCHEMAS[tool][f]]})' for f in fields)
+    return f"""{original_prompt}
+
+Your previous answer was cut short. Return ONLY a JSON object with these fields: {wanted}.
+Do not repeat any other fields."""
@@ -0,0 +1,205 @@
+"""
+vector_store_cache.py
+---------------------
+Per-user FAISS indexes kept in memory, with LRU eviction.
+
+RAGEngine is a process-wide singleton, so it can't hold "the" vector
+store: every user has their own index under vector_stores/user_{id}.
+This cache maps user_id -> loaded index. Hot users stay in memory; cold
+ones are loaded from disk on demand (concurrent misses for the same user
+share one load). Entries are evicted least-recently-used first when the
+estimated memory footprint or the entry count goes over its limit, and
+any entry idle for too long is dropped on the next access. Owners of
+other per-user state can drop it too (on_evict).
+
+Environment:
+    RAG_STORE_CACHE_MB         memory budget for loaded indexes (default: 256)
+    RAG_STORE_CACHE_MAX_USERS  max indexes kept in memory (default: 64)
+    RAG_STORE_IDLE_SECONDS     drop an index unused for this long (default: 1800)
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional
+
+from singleflight import SingleFlight
+
+
+def estimate_footprint(store: Any) -> int:
+    """
+    Rough bytes held by a LangChain FAISS store
+
+    Vectors (ntotal x d float32) plus the text of every stored document.
+    Anything without those attributes counts as 0.
+    """
+    index = getattr(store, 'index', None)
+    size = getattr(index, 'ntotal', 0) * getattr(index, 'd', 0) * 4
+    docs = getattr(getattr(store, 'docstore', None), '_dict', None) or {}
+    for doc in docs.values():
+        size += len(getattr(doc, 'page_content', '') or '') + 200  # metadata / object overhead
+    return size
+
+
+class _Entry:
+    __slots__ = ('store', 'bytes', 'last_used')
+
+    def __init__(self, store: Any, size: int):
+        self.store = store
+        self.bytes = size
+        self.last_used = time.monotonic()
+
+
+class VectorStoreCache:
+    """
+    Bounded LRU map from user_id to a loaded vector store
+
+    Args:
+        max_bytes: Estimated memory budget across all entries
+        max_entries: Max users kept in memory
+        idle_seconds: Entries unused for this long are evicted
+    """
+
+    def __init__(self, max_bytes: int = 256 * 1024 * 1024, max_entries: int = 64,
+                 idle_seconds: float = 1800.0):
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.idle_seconds = idle_seconds
+
+        self._entries: 'OrderedDict[str, _Entry]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._loads = SingleFlight()
+        self._bytes = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.loads = 0
+        self.evictions = {'size': 0, 'count': 0, 'idle': 0}
+        self._listeners: List[Callable[[List[str]], None]] = []
+
+    def on_evict(self, listener: Callable[[List[str]], None]) -> None:
+        """Call listener(user_ids) after entries are evicted (outside the cache lock)"""
+        self._listeners.append(listener)
+
+    def _notify(self, evicted: List[str]) -> None:
+        for listener in self._listeners if evicted else ():
+            listener(evicted)
+
+    def _drop(self, user_id: str, reason: str) -> str:
+        entry = self._entries.pop(user_id)
+        self._bytes -= entry.bytes
+        self.evictions[reason] += 1
+        return user_id
+
+    def _evict(self) -> List[str]:
+        """Drop idle entries, then least-recently-used ones until within limits"""
+        cutoff = time.monotonic() - self.idle_seconds
+        evicted = [self._drop(user_id, 'idle')
+                   for user_id in [u for u, e in self._entries.items() if e.last_used < cutoff]]
+        # Always keep the newest entry, even if it alone is over budget
+        while len(self._entries) > 1 and self._bytes > self.max_bytes:
+            evicted.append(self._drop(next(iter(self._entries)), 'size'))
+        while len(self._entries) > self.max_entries:
+            evicted.append(self._drop(next(iter(self._entries)), 'count'))
+        return evicted
+
+    def __contains__(self, user_id: str) -> bool:
+        with self._lock:
+            return user_id in self._entries
+
+    def put(self, user_id: str, store: Any) -> None:
+        """Insert or replace a user's store (re-measures its footprint)"""
+        entry = _Entry(store, estimate_footprint(store))
+        with self._lock:
+            old = self._entries.pop(user_id, None)
+            if old is not None:
+                self._bytes -= old.bytes
+            self._entries[user_id] = entry
+            self._bytes += entry.bytes
+            evicted = self._evict()
+        self._notify(evicted)
+
+    def get(self, user_id: str, loader: Optional[Callable[[], Any]] = None) -> Any:
+        """
+        A user's store, loading it on a miss
+
+        Args:
+            user_id: User identifier
+            loader: Called on a miss; returns the store or None (not cached)
+
+        Returns:
+            The store, or None if it isn't cached and the loader found nothing
+        """
+        with self._lock:
+            evicted = self._evict()
+            entry = self._entries.get(user_id)
+            if entry is not None:
+                self.hits += 1
+                entry.last_used = time.monotonic()
+                self._entries.move_to_end(user_id)
+            else:
+                self.misses += 1
+        self._notify(evicted)
+        if entry is not None:
+            return entry.store
+
+        if loader is None:
+            return None
+
+        def load():
+            store = loader()
+            if store is not None:
+                with self._lock:
+                    self.loads += 1
+                self.put(user_id, store)
+            return store
+
+        return self._loads.do(user_id, load)
+
+    def invalidate(self, user_id: str) -> None:
+        """Forget a user's store (it will be reloaded from disk on next use)"""
+        with self._lock:
+            if user_id in self._entries:
+                entry = self._entries.pop(user_id)
+                self._bytes -= entry.bytes
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Cache counters
+
+        Returns:
+            dict: entries, estimated MB, limits, hits / misses / hit rate,
+                  disk loads and evictions by reason
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "estimated_mb": round(self._bytes / (1024 * 1024), 2),
+                "max_mb": round(self.max_bytes / (1024 * 1024), 2),
+                "max_entries": self.max_entries,
+                "idle_seconds": self.idle_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "disk_loads": self.loads,
+                "evictions": dict(self.evictions),
+            }
+
+
+# Singleton instance
+_cache: Optional[VectorStoreCache] = None
+_cache_lock = threading.Lock()
+
+def get_vector_store_cache() -> VectorStoreCache:
+    """Get or create the process-wide vector store cache"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = VectorStoreCache(
+                max_bytes=int(float(os.getenv('RAG_STORE_CACHE_MB', '256')) * 1024 * 1024),
+                max_entries=int(os.getenv('RAG_STORE_CACHE_MAX_USERS', '64')),
+                idle_seconds=float(os.getenv('RAG_STORE_IDLE_SECONDS', '1800'))
+            )
+    return _cache
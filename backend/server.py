@@ -8,7 +8,7 @@ Complete backend server handling:
 - Resume library management
 """
 
-from flask import Flask, request, jsonify, session, redirect
+from flask import Flask, request, jsonify, session, redirect, Response, stream_with_context
 from flask_sqlalchemy import SQLAlchemy
 from flask_cors import CORS
 from werkzeug.security import generate_password_hash, check_password_hash
@@ -16,6 +16,7 @@ from werkzeug.utils import secure_filename
 from datetime import datetime, timedelta
 from urllib.parse import urlencode
 import secrets
+import json
 import os
 import sys
 from dotenv import load_dotenv
@@ -184,6 +185,13 @@ def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
 
+def sse_event(event, payload):
+    """Format one Server-Sent Event (heartbeats are SSE comments)"""
+    if event == 'heartbeat':
+        return ': heartbeat\n\n'
+    return f"event: {event}\ndata: {json.dumps(payload)}\n\n"
+
+
 # ============================================================================
 # FILE PARSER
 # ============================================================================
@@ -236,13 +244,73 @@ class FileParser:
 # Try to import AI agent
 try:
     sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'agents'))
+    from job_analyzer import JobAnalyzerAgent
+    from resume_analyzer import ResumeAgent
+    from strategy_creator import StrategyAgent
     from resume_generator import ResumeGeneratorAgent
+    from agent_pool import get_agent_pool
+    from pipeline import run_pipeline, stream_latex, stream_pipeline
+    from rate_limiter import get_llm_scheduler, is_rate_limit_error, retry_after_seconds
+    from singleflight import get_singleflight
+    from llm_backend import get_llm_backend
+    from model_router import get_model_router
+    from resume_preparser import preparse_resume
+    from quick_match import quick_match
+    from circuit_breaker import get_circuit_breaker, is_circuit_open_error
+    from hedging import get_hedging_policy
+    from deadline import deadline_scope, request_deadline_seconds
+    from vector_store_cache import get_vector_store_cache
+    from embedding_cache import get_embedding_cache
+    from degraded import degraded_job_analysis, degraded_pipeline, degraded_resume_analysis
     AI_ENABLED = True
     print("✅ AI Agent loaded successfully")
 except ImportError as e:
     print(f"⚠️  Warning: AI Agent not available: {e}")
     AI_ENABLED = False
 
+# One long-lived agent of each kind, shared by every request handler
+agent_pool = get_agent_pool() if AI_ENABLED else None
+POOLED_AGENTS = [JobAnalyzerAgent, ResumeAgent, StrategyAgent, ResumeGeneratorAgent] if AI_ENABLED else []
+
+
+def agent_error_response(e):
+    """
+    JSON error for a failed agent call
+    
+    Gemini quota errors that survived the scheduler's retries become a 429
+    (with Retry-After when known) and calls rejected by the open circuit
+    breaker a 503, instead of a generic 500.
+    """
+    cause = getattr(e, 'error', e)  # unwrap PipelineNodeError
+    if AI_ENABLED and is_circuit_open_error(e):
+        response = jsonify({'success': False, 'error': 'AI service is unavailable, please retry shortly'})
+        response.headers['Retry-After'] = str(int(cause.retry_after + 0.5))
+        return response, 503
+    if AI_ENABLED and is_rate_limit_error(cause):
+        response = jsonify({'success': False, 'error': 'AI service is busy, please retry shortly'})
+        retry_after = retry_after_seconds(cause)
+        if retry_after is not None:
+            response.headers['Retry-After'] = str(int(retry_after + 0.5))
+        return response, 429
+    return jsonify({'success': False, 'error': str(e)}), 500
+
+
+def degraded_response(e, **payload):
+    """
+    Locally computed results while the LLM circuit breaker is open
+    
+    Same shape as the normal response plus 'degraded': true, so the
+    dashboard can show something instead of waiting on a dead upstream.
+    """
+    cause = getattr(e, 'error', e)
+    print(f"🔌 Serving degraded response: {cause}")
+    response = jsonify({'success': True, 'degraded': True, 'degraded_reason': str(cause), **payload})
+    response.headers['Retry-After'] = str(int(cause.retry_after + 0.5))
+    return response, 200
+
+
+INVALID_DEADLINE = 'deadline_seconds must be a non-negative number of seconds'
+
 
 # ============================================================================
 # AUTHENTICATION ROUTES
@@ -394,13 +462,20 @@ def upload_resume():
         
         print(f"✅ Resume parsed: {filename} ({len(content)} chars)")
         
+        # Instant preview (contact info, skills, sections, dates) - no LLM call
+        preview = None
+        if AI_ENABLED:
+            parsed = preparse_resume(content)
+            preview = {key: parsed[key] for key in ('resume_data', 'sections', 'dates')}
+        
         return jsonify({
             'success': True,
             'filename': filename,
             'text': content,
             'text_length': len(content),
             'file_type': 'pdf' if filename.endswith('.pdf') else 'docx',
-            'file_size': len(content)
+            'file_size': len(content),
+            'preview': preview
         }), 200
         
     except Exception as e:
@@ -607,15 +682,21 @@ def rag_analyze():
         if not rag_agent:
             return jsonify({'success': False, 'error': 'RAG system not initialized. Check GEMINI_API_KEY in .env'}), 500
         
-        result = rag_agent.analyze_and_ingest(
-            resume_text=resume_text,
-            job_description=job_description,
-            user_id=user_id
-        )
+        deadline_seconds = request_deadline_seconds(data)
+        if deadline_seconds is None:
+            return jsonify({'success': False, 'error': INVALID_DEADLINE}), 400
+        
+        with deadline_scope(deadline_seconds) as deadline:
+            result = rag_agent.analyze_and_ingest(
+                resume_text=resume_text,
+                job_description=job_description,
+                user_id=user_id
+            )
         
         return jsonify({
             'success': True,
-            'result': result
+            'result': result,
+            'deadline': deadline.report() if deadline else None
         }), 200
         
     except Exception as e:
@@ -642,14 +723,20 @@ def rag_tailor():
         if not rag_agent:
             return jsonify({'success': False, 'error': 'RAG system not initialized. Check GEMINI_API_KEY'}), 500
         
-        result = rag_agent.tailor_with_instruction(
-            instruction=instruction,
-            user_id=user_id
-        )
+        deadline_seconds = request_deadline_seconds(data)
+        if deadline_seconds is None:
+            return jsonify({'success': False, 'error': INVALID_DEADLINE}), 400
+        
+        with deadline_scope(deadline_seconds) as deadline:
+            result = rag_agent.tailor_with_instruction(
+                instruction=instruction,
+                user_id=user_id
+            )
         
         return jsonify({
             'success': True,
-            'result': result
+            'result': result,
+            'deadline': deadline.report() if deadline else None
         }), 200
         
     except Exception as e:
@@ -676,14 +763,20 @@ def rag_suggestions():
         if not rag_agent:
             return jsonify({'success': False, 'error': 'RAG system not initialized. Check GEMINI_API_KEY'}), 500
         
-        suggestions = rag_agent.get_improvement_suggestions(
-            resume_text=resume_text,
-            job_description=job_description
-        )
+        deadline_seconds = request_deadline_seconds(data)
+        if deadline_seconds is None:
+            return jsonify({'success': False, 'error': INVALID_DEADLINE}), 400
+        
+        with deadline_scope(deadline_seconds) as deadline:
+            suggestions = rag_agent.get_improvement_suggestions(
+                resume_text=resume_text,
+                job_description=job_description
+            )
         
         return jsonify({
             'success': True,
-            'suggestions': suggestions
+            'suggestions': suggestions,
+            'deadline': deadline.report() if deadline else None
         }), 200
         
     except Exception as e:
@@ -769,6 +862,59 @@ def rag_chat():
 # INDIVIDUAL AGENT TOOL ENDPOINTS
 # ============================================================================
 
+@app.route('/api/agent/metrics', methods=['GET'])
+def agent_metrics():
+    """LLM backend, model routes, response cache, agent pool, rate limiter and coalescing counters"""
+    try:
+        from llm_cache import get_llm_cache
+
+        cache = get_llm_cache()
+
+        return jsonify({
+            'success': True,
+            'cache': cache.stats() if cache else {'enabled': False},
+            'agent_pool': agent_pool.stats() if agent_pool else {'enabled': False},
+            'scheduler': get_llm_scheduler().stats() if AI_ENABLED else {'enabled': False},
+            'singleflight': get_singleflight().stats() if AI_ENABLED else {'enabled': False},
+            'backend': get_llm_backend('gemini-2.5-flash').stats() if AI_ENABLED else {'enabled': False},
+            'model_routes': get_model_router().stats() if AI_ENABLED else {'enabled': False},
+            'circuit_breaker': get_circuit_breaker().stats() if AI_ENABLED else {'enabled': False},
+            'latency': get_hedging_policy().stats() if AI_ENABLED else {'enabled': False},
+            'vector_stores': get_vector_store_cache().stats() if AI_ENABLED else {'enabled': False},
+            'embedding_cache': (get_embedding_cache().stats() if AI_ENABLED and get_embedding_cache()
+                                else {'enabled': False})
+        }), 200
+
+    except Exception as e:
+        print(f"❌ Metrics error: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
+@app.route('/api/agent/quick-match', methods=['POST'])
+def quick_match_route():
+    """Instant match score from local skill matching (no LLM calls)"""
+    try:
+        data = request.json
+        job_description = data.get('job_description', '')
+        resume_text = data.get('resume_text', '')
+        
+        if not job_description or not resume_text:
+            return jsonify({'success': False, 'error': 'Job description and resume text required'}), 400
+        
+        if not AI_ENABLED:
+            return jsonify({'success': False, 'error': 'AI features not available'}), 503
+        
+        return jsonify({
+            'success': True,
+            'tool': 'Quick Match',
+            'match': quick_match(resume_text, job_description)
+        }), 200
+        
+    except Exception as e:
+        print(f"❌ Quick match error: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
 @app.route('/api/agent/analyze-job', methods=['POST'])
 def analyze_job():
     """Tool 1: Analyze job description using JobAnalyzerAgent"""
@@ -779,11 +925,7 @@ def analyze_job():
         if not job_description:
             return jsonify({'success': False, 'error': 'Job description required'}), 400
         
-        import sys
-        sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'agents'))
-        from job_analyzer import JobAnalyzerAgent
-        
-        agent = JobAnalyzerAgent()
+        agent = agent_pool.get(JobAnalyzerAgent)
         analysis = agent.analyze_job_description(job_description)
         
         return jsonify({
@@ -793,8 +935,11 @@ def analyze_job():
         }), 200
         
     except Exception as e:
+        if AI_ENABLED and is_circuit_open_error(e):
+            return degraded_response(e, tool='Job Analyzer (Tool 1)',
+                                     analysis=degraded_job_analysis(job_description))
         print(f"❌ Job analysis error: {e}")
-        return jsonify({'success': False, 'error': str(e)}), 500
+        return agent_error_response(e)
 
 
 @app.route('/api/agent/analyze-resume', methods=['POST'])
@@ -807,11 +952,7 @@ def analyze_resume_agent():
         if not resume_text:
             return jsonify({'success': False, 'error': 'Resume text required'}), 400
         
-        import sys
-        sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'agents'))
-        from resume_analyzer import ResumeAgent
-        
-        agent = ResumeAgent()
+        agent = agent_pool.get(ResumeAgent)
         analysis = agent.analyze_resume(resume_text)
         
         return jsonify({
@@ -821,8 +962,11 @@ def analyze_resume_agent():
         }), 200
         
     except Exception as e:
+        if AI_ENABLED and is_circuit_open_error(e):
+            return degraded_response(e, tool='Resume Analyzer (Tool 2)',
+                                     analysis=degraded_resume_analysis(resume_text))
         print(f"❌ Resume analysis error: {e}")
-        return jsonify({'success': False, 'error': str(e)}), 500
+        return agent_error_response(e)
 
 
 @app.route('/api/agent/create-strategy', methods=['POST'])
@@ -836,26 +980,35 @@ def create_strategy():
         if not resume_text or not job_description:
             return jsonify({'success': False, 'error': 'Both resume and job description required'}), 400
         
-        import sys
-        sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'agents'))
-        from strategy_creator import StrategyAgent
+        deadline_seconds = request_deadline_seconds(data)
+        if deadline_seconds is None:
+            return jsonify({'success': False, 'error': INVALID_DEADLINE}), 400
+        
+        agent = agent_pool.get(StrategyAgent)
         
-        agent = StrategyAgent()
-        job_analysis = agent.analyze_job_description(job_description)
-        resume_data = agent.analyze_resume(resume_text)
-        strategy = agent.create_matching_strategy(job_analysis, resume_data)
+        # Tools 1 + 2 run in parallel, Tool 3 waits for both
+        with deadline_scope(deadline_seconds):
+            result = run_pipeline(agent, job_description, resume_text, generate_latex=False)
         
         return jsonify({
             'success': True,
             'tool': 'Strategy Creator (Tool 3)',
-            'job_analysis': job_analysis,
-            'resume_data': resume_data,
-            'strategy': strategy
+            'job_analysis': result['job_analysis'],
+            'resume_data': result['resume_data'],
+            'strategy': result['strategy'],
+            'timings': result['timings'],
+            'deadline': result.get('deadline')
         }), 200
         
     except Exception as e:
+        if AI_ENABLED and is_circuit_open_error(e):
+            fallback = degraded_pipeline(job_description, resume_text)
+            return degraded_response(e, tool='Strategy Creator (Tool 3)',
+                                     job_analysis=fallback['job_analysis'],
+                                     resume_data=fallback['resume_data'],
+                                     strategy=fallback['strategy'])
         print(f"❌ Strategy creation error: {e}")
-        return jsonify({'success': False, 'error': str(e)}), 500
+        return agent_error_response(e)
 
 
 @app.route('/api/agent/full-pipeline', methods=['POST'])
@@ -869,39 +1022,82 @@ def full_pipeline():
         if not resume_text or not job_description:
             return jsonify({'success': False, 'error': 'Both resume and job description required'}), 400
         
-        import sys
-        sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'agents'))
-        from resume_generator import ResumeGeneratorAgent
-        
-        agent = ResumeGeneratorAgent()
-        
-        # Run all 4 tools
-        print("🔧 Tool 1: Analyzing job...")
-        job_analysis = agent.analyze_job_description(job_description)
+        deadline_seconds = request_deadline_seconds(data)
+        if deadline_seconds is None:
+            return jsonify({'success': False, 'error': INVALID_DEADLINE}), 400
         
-        print("🔧 Tool 2: Analyzing resume...")
-        resume_data = agent.analyze_resume(resume_text)
+        agent = agent_pool.get(ResumeGeneratorAgent)
         
-        print("🔧 Tool 3: Creating strategy...")
-        strategy = agent.create_matching_strategy(job_analysis, resume_data)
-        
-        print("🔧 Tool 4: Generating LaTeX...")
-        latex = agent.generate_tailored_resume(resume_data, strategy, job_analysis)
+        # Run all 4 tools (Tools 1 + 2 concurrently)
+        print("🔧 Tools 1+2: Analyzing job and resume in parallel...")
+        with deadline_scope(deadline_seconds):
+            result = run_pipeline(agent, job_description, resume_text,
+                                  latex_mode=data.get('generation_mode'))
         
         return jsonify({
             'success': True,
             'tools_used': ['Job Analyzer', 'Resume Analyzer', 'Strategy Creator', 'Resume Generator'],
-            'job_analysis': job_analysis,
-            'resume_data': resume_data,
-            'strategy': strategy,
-            'latex': latex
+            'job_analysis': result['job_analysis'],
+            'resume_data': result['resume_data'],
+            'strategy': result['strategy'],
+            'latex': result['latex'],  # None if the deadline skipped Tool 4
+            'timings': result['timings'],
+            'deadline': result.get('deadline')
         }), 200
         
     except Exception as e:
+        if AI_ENABLED and is_circuit_open_error(e):
+            # No LaTeX without the model; the analyses are still useful
+            return degraded_response(e, tools_used=['Job Analyzer', 'Resume Analyzer', 'Strategy Creator'],
+                                     **degraded_pipeline(job_description, resume_text))
         print(f"❌ Full pipeline error: {e}")
         import traceback
         traceback.print_exc()
+        return agent_error_response(e)
+
+
+@app.route('/api/agent/full-pipeline/stream', methods=['POST'])
+def full_pipeline_stream():
+    """
+    Streaming variant of /api/agent/full-pipeline (Server-Sent Events)
+    
+    Emits job_analysis, resume_data and strategy as each tool finishes,
+    then the LaTeX in latex_chunk events (latex_reset if Tool 4 is retried
+    after sending some), then done (or error).
+    """
+    data = request.json or {}
+    resume_text = data.get('resume_text', '')
+    job_description = data.get('job_description', '')
+    
+    if not resume_text or not job_description:
+        return jsonify({'success': False, 'error': 'Both resume and job description required'}), 400
+    
+    if not AI_ENABLED:
+        return jsonify({'success': False, 'error': 'AI features not available'}), 503
+    
+    deadline_seconds = request_deadline_seconds(data)
+    if deadline_seconds is None:
+        return jsonify({'success': False, 'error': INVALID_DEADLINE}), 400
+    
+    try:
+        agent = agent_pool.get(ResumeGeneratorAgent)
+    except Exception as e:
+        print(f"❌ Full pipeline stream error: {e}")
         return jsonify({'success': False, 'error': str(e)}), 500
+    
+    def generate():
+        for event, payload in stream_pipeline(agent, job_description, resume_text,
+                                              deadline_seconds=deadline_seconds):
+            yield sse_event(event, payload)
+    
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no'  # Stop nginx from buffering the stream
+        }
+    )
 
 
 # ============================================================================
@@ -910,7 +1106,12 @@ def full_pipeline():
 
 @app.route('/api/resume/generate-tailored', methods=['POST'])
 def generate_tailored_resume():
-    """Generate a complete tailored resume in LaTeX format"""
+    """
+    Generate a complete tailored resume in LaTeX format
+    
+    With "stream": true the .tex file is streamed to the client as the
+    model writes it (application/x-tex download) instead of returned in JSON.
+    """
     user = get_current_user()
     user_id = str(user.id) if user else session.get('demo_user_id', 'demo_user')
     
@@ -925,41 +1126,64 @@ def generate_tailored_resume():
         if not job_description:
             return jsonify({'success': False, 'error': 'Job description required for tailored resume generation'}), 400
         
-        # Import the resume generator
-        import sys
-        sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'agents'))
-        
-        from resume_generator import ResumeGeneratorAgent
+        deadline_seconds = request_deadline_seconds(data)
+        if deadline_seconds is None:
+            return jsonify({'success': False, 'error': INVALID_DEADLINE}), 400
         
         print(f"📄 Generating tailored resume for user {user_id}...")
         
-        # Create the agent
-        generator = ResumeGeneratorAgent()
+        # Borrow the shared agent
+        generator = agent_pool.get(ResumeGeneratorAgent)
+        filename = f'tailored_resume_{user_id}.tex'
+        
+        if data.get('stream'):
+            # Tools 1-3 first (under the deadline), then pipe Tool 4's output straight
+            # to the client - once bytes are flowing the stream isn't cut off
+            with deadline_scope(deadline_seconds):
+                analysis = run_pipeline(generator, job_description, resume_text, generate_latex=False)
+            latex_stream = stream_latex(
+                generator, analysis['resume_data'], analysis['strategy'], analysis['job_analysis']
+            )
+            return Response(
+                stream_with_context(latex_stream),
+                mimetype='application/x-tex',
+                headers={
+                    'Content-Disposition': f'attachment; filename={filename}',
+                    'X-Accel-Buffering': 'no'
+                }
+            )
         
         # Run the complete pipeline (analyze job, analyze resume, create strategy, generate)
-        # This runs Tools 1-4
-        job_analysis = generator.analyze_job_description(job_description)
-        resume_data = generator.analyze_resume(resume_text)
-        strategy = generator.create_matching_strategy(job_analysis, resume_data)
-        
-        # Generate the LaTeX resume
-        latex_content = generator.generate_tailored_resume(resume_data, strategy, job_analysis)
-        
-        print(f"✅ LaTeX resume generated: {len(latex_content)} characters")
+        # This runs Tools 1-4, with the two analyses in parallel
+        with deadline_scope(deadline_seconds):
+            result = run_pipeline(generator, job_description, resume_text,
+                                  latex_mode=data.get('generation_mode'))
+        latex_content = result['latex']
+        
+        if latex_content is None:
+            print("⏭️  LaTeX generation skipped: request deadline")
+        else:
+            print(f"✅ LaTeX resume generated: {len(latex_content)} characters")
         
         return jsonify({
             'success': True,
             'latex': latex_content,
-            'strategy': strategy,
-            'job_analysis': job_analysis,
-            'filename': f'tailored_resume_{user_id}.tex'
+            'strategy': result['strategy'],
+            'job_analysis': result['job_analysis'],
+            'timings': result['timings'],
+            'deadline': result.get('deadline'),
+            'filename': filename
         }), 200
         
     except Exception as e:
+        if AI_ENABLED and is_circuit_open_error(e):
+            fallback = degraded_pipeline(job_description, resume_text)
+            return degraded_response(e, latex=None, strategy=fallback['strategy'],
+                                     job_analysis=fallback['job_analysis'], filename=filename)
         print(f"❌ Resume generation error: {e}")
         import traceback
         traceback.print_exc()
-        return jsonify({'success': False, 'error': str(e)}), 500
+        return agent_error_response(e)
 
 
 # ============================================================================
@@ -974,9 +1198,17 @@ if __name__ == '__main__':
     # Initialize database
     init_database()
     
+    # Build the shared agents once, before the first request arrives
+    if AI_ENABLED:
+        try:
+            agent_pool.warm_up(POOLED_AGENTS)
+        except Exception as e:
+            print(f"⚠️  Agent warm-up skipped: {e}")
+    
     print(f"✅ Server starting on http://127.0.0.1:5000")
     print(f"✅ Database: {POSTGRES_DB}")
     print(f"✅ AI Enabled: {AI_ENABLED}")
+    print(f"✅ LLM Backend: {os.getenv('LLM_BACKEND', 'gemini')}")
     print("="*60 + "\n")
     
     # Run server
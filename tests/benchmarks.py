@@ -0,0 +1,339 @@
+"""
+benchmarks.py
+-------------
+Performance benchmarks for the agent pipeline
+
+Run from the project root:
+    python tests/benchmarks.py
+
+Each benchmark prints a small table and returns its numbers as a dict,
+so it can also be imported and called from other scripts.
+"""
+
+import json
+import os
+import re
+import sys
+import time
+
+# Make the agents importable (same layout the backend uses)
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(TESTS_DIR, '..', 'agents'))
+sys.path.insert(0, TESTS_DIR)
+SAMPLE_OUTPUTS = os.path.join(TESTS_DIR, 'sample_outputs')
+
+
+# ========================================================================
+# HELPERS
+# ========================================================================
+
+def _time_ms(func, iterations: int) -> float:
+    """Average wall-clock time of func() in milliseconds"""
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - start) * 1000 / iterations
+
+
+def _load_sample_analysis(filename: str = 'complete_analysis.json') -> dict:
+    """Load a recorded job_analysis / resume_data / strategy triple"""
+    with open(os.path.join(SAMPLE_OUTPUTS, filename), 'r') as f:
+        return json.load(f)
+
+
+def _print_table(title: str, rows: list):
+    """Print (label, value) rows under a heading"""
+    print("\n" + "="*70)
+    print(title)
+    print("="*70)
+    for label, value in rows:
+        print(f"   {label:<45} {value}")
+    print()
+
+
+# ========================================================================
+# BENCHMARK: AGENT SETUP (per-request construction vs shared pool)
+# ========================================================================
+
+def _per_request_setup(agent_cls, model_name: str, template_path: str):
+    """
+    The setup a request handler paid before the agent pool
+
+    A new agent, plus what construction did before the configure-once
+    backend and the cached template: genai.configure, a new
+    GenerativeModel and (for Tool #4) reading the template from disk.
+    """
+    import google.generativeai as genai
+    from resume_generator import ResumeGeneratorAgent, load_latex_template
+
+    agent_cls()
+    genai.configure(api_key=os.getenv('GEMINI_API_KEY') or 'benchmark-key')
+    genai.GenerativeModel(model_name)
+    if issubclass(agent_cls, ResumeGeneratorAgent):
+        load_latex_template.__wrapped__(template_path)  # uncached read
+
+
+def benchmark_agent_setup(iterations: int = 20) -> dict:
+    """
+    Compare per-request agent construction with the shared AgentPool
+
+    No LLM calls are made - this measures only the setup each request
+    handler used to pay (genai.configure, GenerativeModel, template read),
+    timed explicitly, against borrowing an agent from the pool.
+
+    Args:
+        iterations: Simulated requests per agent class
+
+    Returns:
+        dict: Average ms per request for each strategy, per agent class
+    """
+    from job_analyzer import JobAnalyzerAgent
+    from resume_analyzer import ResumeAgent
+    from strategy_creator import StrategyAgent
+    from resume_generator import ResumeGeneratorAgent
+    from agent_pool import AgentPool
+
+    template_path = os.path.join(TESTS_DIR, 'templates', 'resume_template.tex')
+    results = {}
+    rows = []
+    pool = AgentPool()
+
+    for agent_cls in [JobAnalyzerAgent, ResumeAgent, StrategyAgent, ResumeGeneratorAgent]:
+        model_name = pool.get(agent_cls).model_name  # one-time setup, paid at startup
+        _per_request_setup(agent_cls, model_name, template_path)  # warm-up (imports)
+        fresh_ms = _time_ms(lambda: _per_request_setup(agent_cls, model_name, template_path),
+                            iterations)
+        pooled_ms = _time_ms(lambda: pool.get(agent_cls), iterations)
+
+        results[agent_cls.__name__] = {'per_request_ms': fresh_ms, 'pooled_ms': pooled_ms}
+        rows.append((f"{agent_cls.__name__} (new per request)", f"{fresh_ms:8.3f} ms"))
+        rows.append((f"{agent_cls.__name__} (shared pool)", f"{pooled_ms:8.3f} ms"))
+
+    saved = sum(r['per_request_ms'] - r['pooled_ms'] for r in results.values())
+    rows.append(("Setup removed per request (all 4 tools)", f"{saved:8.3f} ms"))
+    _print_table(f"AGENT SETUP COST ({iterations} requests each)", rows)
+
+    return results
+
+
+# ========================================================================
+# BENCHMARK: SINGLE-CALL vs SECTION-PARALLEL LaTeX GENERATION
+# ========================================================================
+
+def _latex_quality(latex: str, strategy: dict) -> dict:
+    """
+    Cheap, model-free quality signals for a generated resume
+
+    - keyword_coverage: share of strategy keywords_to_add present in the text
+    - sections: number of \\section{} commands
+    - balanced_braces: every { has a matching }
+    """
+    keywords = [str(k) for k in strategy.get('keywords_to_add', [])]
+    lowered = latex.lower()
+    covered = [k for k in keywords if k.lower() in lowered]
+    return {
+        'keyword_coverage': round(len(covered) / len(keywords), 2) if keywords else None,
+        'sections': len(re.findall(r'\\section\{', latex)),
+        'balanced_braces': latex.count('{') == latex.count('}'),
+        'characters': len(latex),
+    }
+
+
+def benchmark_sectioned_generation(runs: int = 1,
+                                   sample_file: str = 'complete_analysis.json') -> dict:
+    """
+    Compare Tool #4 wall-clock time and output quality: one long LLM call
+    vs one concurrent call per section
+
+    Uses a recorded analysis from tests/sample_outputs so only Tool #4 runs.
+    The response cache is bypassed so every run hits the model.
+
+    Args:
+        runs: Repetitions per mode (times are averaged)
+        sample_file: Recorded analysis to generate from
+
+    Returns:
+        dict: Average seconds and quality signals for each mode
+    """
+    from resume_generator import ResumeGeneratorAgent
+
+    analysis = _load_sample_analysis(sample_file)
+    agent = ResumeGeneratorAgent()
+    agent.cache = None
+
+    modes = {
+        'single': agent.generate_tailored_resume,
+        'sectioned': agent.generate_tailored_resume_sectioned,
+    }
+
+    results = {}
+    for mode, generate in modes.items():
+        durations = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            latex = generate(analysis['resume_data'], analysis['strategy'], analysis['job_analysis'])
+            durations.append(time.perf_counter() - start)
+        results[mode] = {'seconds': sum(durations) / len(durations),
+                         **_latex_quality(latex, analysis['strategy'])}
+
+    rows = []
+    for mode, r in results.items():
+        rows.append((f"{mode}: wall-clock", f"{r['seconds']:6.2f} s"))
+        rows.append((f"{mode}: keyword coverage", r['keyword_coverage']))
+        rows.append((f"{mode}: sections / balanced braces", f"{r['sections']} / {r['balanced_braces']}"))
+        rows.append((f"{mode}: characters", r['characters']))
+    speedup = results['single']['seconds'] / results['sectioned']['seconds']
+    rows.append(("Speed-up (single / sectioned)", f"{speedup:6.2f}x"))
+    _print_table(f"LaTeX GENERATION MODES ({runs} run(s) each)", rows)
+
+    return results
+
+
+# ========================================================================
+# BENCHMARK: RULE-BASED vs LLM JOB DESCRIPTION ANALYSIS
+# ========================================================================
+
+def benchmark_jd_extraction(iterations: int = 200) -> dict:
+    """
+    Time the local job description extractor on the sample job descriptions
+    and compare its skills with the recorded LLM analysis
+
+    No LLM calls are made. Overlap is only reported for job descriptions
+    with a recording in tests/sample_outputs.
+
+    Args:
+        iterations: Extractions per job description (times are averaged)
+
+    Returns:
+        dict: Per job description: ms, fields found and overlap with the LLM skills
+    """
+    from jd_extractor import JobDescriptionExtractor
+    from sample_data import SAMPLE_JOB_DESCRIPTION, MINIMAL_JOB
+
+    start = time.perf_counter()
+    extractor = JobDescriptionExtractor()
+    build_ms = (time.perf_counter() - start) * 1000
+
+    recorded = {'SAMPLE_JOB_DESCRIPTION': _load_sample_analysis('job_analysis_final.json')}
+    samples = {'SAMPLE_JOB_DESCRIPTION': SAMPLE_JOB_DESCRIPTION, 'MINIMAL_JOB': MINIMAL_JOB}
+
+    results = {}
+    rows = [("Automaton build (once per process)", f"{build_ms:8.2f} ms")]
+    for name, text in samples.items():
+        ms = _time_ms(lambda: extractor.extract(text), iterations)
+        extracted = extractor.extract(text)
+        found = extracted['required_skills'] + extracted['nice_to_have_skills']
+        result = {'ms': ms, 'skills': len(found),
+                  'experience_level': extracted.get('experience_level'),
+                  'education_required': extracted.get('education_required')}
+
+        # Share of the LLM's skills (required + nice to have) found locally,
+        # matched loosely since the LLM words skills freely
+        llm = recorded.get(name)
+        if llm:
+            llm_skills = [str(s).lower() for s in
+                          llm.get('required_skills', []) + llm.get('nice_to_have_skills', [])]
+            local = [s.lower() for s in found]
+            hits = [s for s in llm_skills if any(l in s or s in l for l in local)]
+            result['llm_skill_recall'] = round(len(hits) / len(llm_skills), 2) if llm_skills else None
+
+        results[name] = result
+        rows.append((f"{name}: time per extraction", f"{ms:8.3f} ms"))
+        rows.append((f"{name}: skills found", result['skills']))
+        rows.append((f"{name}: experience level", result['experience_level']))
+        rows.append((f"{name}: education", str(result['education_required'])[:40]))
+        if 'llm_skill_recall' in result:
+            rows.append((f"{name}: LLM skills also found locally", result['llm_skill_recall']))
+    _print_table(f"RULE-BASED JD EXTRACTION ({iterations} runs each)", rows)
+
+    return results
+
+
+# ========================================================================
+# BENCHMARK: RAG EMBEDDING BACKENDS
+# ========================================================================
+
+def benchmark_embeddings(backends=('hashing', 'local', 'gemini'),
+                         copies: int = 20, queries: int = 20) -> dict:
+    """
+    Ingest and query throughput of each RAG embedding backend
+
+    Chunks the sample resume and job description the way RAGEngine does
+    (1000 characters, 200 overlap) and embeds `copies` of them as one
+    ingest, then times single queries. Backends that can't be created
+    (sentence-transformers missing, no GEMINI_API_KEY) are skipped.
+    The gemini backend makes real API calls.
+
+    Args:
+        backends: Backend names to try (see embedding_backend.py)
+        copies: Copies of the sample chunks per ingest
+        queries: Single-query embeddings to time
+
+    Returns:
+        dict: Per backend: chunks, ingest ms and chunks/s, ms per query
+    """
+    from embedding_backend import make_embeddings
+    from sample_data import SAMPLE_JOB_DESCRIPTION, SAMPLE_RESUME
+
+    chunks = []
+    for text in (SAMPLE_RESUME, SAMPLE_JOB_DESCRIPTION):
+        chunks += [text[i:i + 1000] for i in range(0, len(text), 800)]
+    chunks = chunks * copies
+    instructions = ["Emphasize Python and machine learning experience",
+                    "Highlight leadership and cross-team projects",
+                    "Add quantified impact to the internship bullets"]
+
+    results = {}
+    rows = []
+    for name in backends:
+        try:
+            if name == 'gemini' and not os.getenv('GEMINI_API_KEY'):
+                raise RuntimeError("GEMINI_API_KEY not set")
+            embeddings = make_embeddings(name, api_key=os.getenv('GEMINI_API_KEY'))
+            embeddings.embed_query("warm up")
+        except Exception as e:
+            rows.append((f"{name}: skipped", str(e)[:40]))
+            continue
+
+        start = time.perf_counter()
+        vectors = embeddings.embed_documents(chunks)
+        ingest_ms = (time.perf_counter() - start) * 1000
+        query_ms = _time_ms(lambda: [embeddings.embed_query(q) for q in instructions],
+                            max(1, queries // len(instructions))) / len(instructions)
+
+        results[name] = {'chunks': len(chunks), 'dimensions': len(vectors[0]),
+                         'ingest_ms': ingest_ms,
+                         'chunks_per_second': len(chunks) / (ingest_ms / 1000),
+                         'query_ms': query_ms}
+        rows.append((f"{name}: ingest {len(chunks)} chunks", f"{ingest_ms:10.1f} ms"))
+        rows.append((f"{name}: chunks per second", f"{results[name]['chunks_per_second']:10.0f}"))
+        rows.append((f"{name}: time per query", f"{query_ms:10.3f} ms"))
+        rows.append((f"{name}: dimensions", len(vectors[0])))
+    _print_table("RAG EMBEDDING BACKENDS", rows)
+
+    return results
+
+
+# ========================================================================
+# MAIN
+# ========================================================================
+
+BENCHMARKS = {
+    '1': ('Agent setup: per-request vs pooled', benchmark_agent_setup),
+    '2': ('LaTeX generation: single call vs section-parallel', benchmark_sectioned_generation),
+    '3': ('Job description analysis: rule-based extractor', benchmark_jd_extraction),
+    '4': ('RAG embeddings: hashing vs local vs Gemini', benchmark_embeddings),
+}
+
+if __name__ == "__main__":
+    print("\n" + "⏱️  "*25)
+    print("ALIGNAI PERFORMANCE BENCHMARKS")
+    print("⏱️  "*25 + "\n")
+
+    for key, (label, _) in BENCHMARKS.items():
+        print(f"{key}. {label}")
+    choice = input("\nEnter your choice or press Enter to run all: ").strip()
+
+    selected = [BENCHMARKS[choice]] if choice in BENCHMARKS else BENCHMARKS.values()
+    for label, func in selected:
+        func()
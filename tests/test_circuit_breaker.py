@@ -0,0 +1,108 @@
+"""
+test_circuit_breaker.py
+-----------------------
+State transitions of the LLM circuit breaker
+
+Run from the project root:
+    python -m unittest discover tests
+"""
+
+import os
+import sys
+import time
+import unittest
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(TESTS_DIR, '..', 'agents'))
+
+from circuit_breaker import CircuitBreaker, CircuitOpenError
+
+
+def _fail():
+    raise ConnectionError("upstream down")
+
+
+class CircuitBreakerTests(unittest.TestCase):
+
+    def _breaker(self, **kwargs):
+        settings = dict(window=4, min_calls=4, failure_threshold=0.5,
+                        slow_call_seconds=30.0, slow_threshold=0.8, open_seconds=0.05)
+        settings.update(kwargs)
+        return CircuitBreaker(**settings)
+
+    def _trip(self, breaker):
+        for _ in range(breaker.min_calls):
+            with self.assertRaises(ConnectionError):
+                breaker.call(_fail)
+
+    def test_stays_closed_below_min_calls(self):
+        breaker = self._breaker()
+        for _ in range(breaker.min_calls - 1):
+            with self.assertRaises(ConnectionError):
+                breaker.call(_fail)
+
+        self.assertEqual(breaker.stats()['state'], 'closed')
+        self.assertEqual(breaker.call(lambda: 'ok'), 'ok')
+
+    def test_failures_open_it_and_calls_fail_fast(self):
+        breaker = self._breaker(open_seconds=60)
+        self._trip(breaker)
+
+        self.assertTrue(breaker.is_open())
+        calls = []
+        with self.assertRaises(CircuitOpenError) as raised:
+            breaker.call(lambda: calls.append(1))
+        self.assertEqual(calls, [])
+        self.assertGreater(raised.exception.retry_after, 0)
+        with self.assertRaises(CircuitOpenError):
+            breaker.check()
+        self.assertEqual(breaker.stats()['times_opened'], 1)
+
+    def test_half_open_lets_one_probe_through(self):
+        breaker = self._breaker()
+        self._trip(breaker)
+        time.sleep(0.06)
+
+        self.assertTrue(breaker.allow())    # the probe
+        self.assertFalse(breaker.allow())   # everyone else waits for it
+        self.assertEqual(breaker.stats()['state'], 'half_open')
+
+    def test_successful_probe_closes_it(self):
+        breaker = self._breaker()
+        self._trip(breaker)
+        time.sleep(0.06)
+
+        self.assertEqual(breaker.call(lambda: 'ok'), 'ok')
+        self.assertEqual(breaker.stats()['state'], 'closed')
+        self.assertEqual(breaker.stats()['window_calls'], 0)
+
+    def test_failed_probe_opens_it_again(self):
+        breaker = self._breaker()
+        self._trip(breaker)
+        time.sleep(0.06)
+
+        with self.assertRaises(ConnectionError):
+            breaker.call(_fail)
+        self.assertTrue(breaker.is_open())
+        self.assertEqual(breaker.stats()['times_opened'], 2)
+
+    def test_slow_calls_open_it(self):
+        breaker = self._breaker(open_seconds=60)
+        for _ in range(4):
+            breaker.allow()
+            breaker.record(True, 45.0)
+
+        self.assertTrue(breaker.is_open())
+        self.assertIn('took over', breaker.stats()['last_trip_reason'])
+
+    def test_slow_failures_count_as_slow(self):
+        breaker = self._breaker(failure_threshold=1.1, open_seconds=60)
+        for _ in range(4):
+            breaker.allow()
+            breaker.record(False, 45.0)
+
+        self.assertTrue(breaker.is_open())
+
+
+if __name__ == '__main__':
+    unittest.main()
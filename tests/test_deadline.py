@@ -0,0 +1,82 @@
+"""
+test_deadline.py
+----------------
+Request deadlines: validating deadline_seconds and budgeting later stages
+
+Run from the project root:
+    python -m unittest discover tests
+"""
+
+import os
+import sys
+import unittest
+from unittest import mock
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(TESTS_DIR, '..', 'agents'))
+
+from deadline import (current_deadline, deadline_scope, request_deadline_seconds,
+                      reserve_seconds, stage_budget)
+from hedging import get_hedging_policy
+
+
+class RequestDeadlineTests(unittest.TestCase):
+
+    def test_accepts_non_negative_numbers(self):
+        for value, expected in ((30, 30.0), (2.5, 2.5), ('45', 45.0), (0, 0.0)):
+            with self.subTest(value=value):
+                self.assertEqual(request_deadline_seconds({'deadline_seconds': value}), expected)
+
+    def test_rejects_everything_else(self):
+        for value in (-1, '-5', 'soon', '', True, False, float('inf'), float('nan'), [30], {}):
+            with self.subTest(value=value):
+                self.assertIsNone(request_deadline_seconds({'deadline_seconds': value}))
+
+    def test_default_comes_from_the_environment(self):
+        with mock.patch.dict(os.environ, {'REQUEST_DEADLINE_SECONDS': '12'}):
+            self.assertEqual(request_deadline_seconds({}), 12.0)
+            self.assertEqual(request_deadline_seconds(None), 12.0)
+        with mock.patch.dict(os.environ, {'REQUEST_DEADLINE_SECONDS': 'never'}):
+            self.assertIsNone(request_deadline_seconds({}))
+
+
+class DeadlineScopeTests(unittest.TestCase):
+
+    def test_zero_or_none_means_no_deadline(self):
+        for seconds in (None, 0):
+            with deadline_scope(seconds) as deadline:
+                self.assertIsNone(deadline)
+                self.assertIsNone(stage_budget(['analyze_resume']))
+
+    def test_scope_is_restored(self):
+        with deadline_scope(10) as outer:
+            with deadline_scope(None):
+                self.assertIsNone(current_deadline())
+            self.assertIs(current_deadline(), outer)
+        self.assertIsNone(current_deadline())
+
+    def test_stage_budget_keeps_time_for_later_stages(self):
+        hedger = get_hedging_policy()
+        hedger.record('test_later_stage', 2000)
+        with deadline_scope(10):
+            budget = stage_budget(['test_later_stage'])
+        self.assertGreater(budget, 7.5)
+        self.assertLessEqual(budget, 8.0)
+
+
+class ReserveTests(unittest.TestCase):
+
+    def test_unmeasured_paths_use_the_cheapest_default(self):
+        self.assertEqual(reserve_seconds(('generate_tailored_resume', 'generate_section')),
+                         min(reserve_seconds('generate_tailored_resume'),
+                             reserve_seconds('generate_section')))
+
+    def test_measured_path_wins_over_an_unmeasured_default(self):
+        # e.g. single-mode LaTeX measured at 50ms, sectioned never run (12s default)
+        get_hedging_policy().record('test_measured_path', 50)
+
+        self.assertAlmostEqual(reserve_seconds(('test_measured_path', 'generate_section')), 0.05)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+"""
+test_fence_stripper.py
+----------------------
+Markdown fence removal from streamed LaTeX, wherever the chunks split
+
+Run from the project root:
+    python -m unittest discover tests
+"""
+
+import os
+import sys
+import unittest
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(TESTS_DIR, '..', 'agents'))
+
+from resume_generator import FenceStripper
+
+
+SAMPLES = [
+    "```latex\n\\section{Skills}\nPython, SQL\n```",
+    "  \n```latex\\section{A}```  \n",
+    "\\section{Plain} no fences at all\n",
+    "text with `inline` and ``double`` ticks ``` and a lone fence",
+    "```latex\n```",
+]
+
+
+def _expected(text):
+    return text.replace('```latex', '').replace('```', '').strip()
+
+
+def _stream(chunks):
+    stripper = FenceStripper()
+    return ''.join(stripper.feed(chunk) for chunk in chunks) + stripper.flush()
+
+
+class FenceStripperTests(unittest.TestCase):
+
+    def test_every_two_way_split(self):
+        for text in SAMPLES:
+            for cut in range(len(text) + 1):
+                with self.subTest(text=text, cut=cut):
+                    self.assertEqual(_stream([text[:cut], text[cut:]]), _expected(text))
+
+    def test_one_character_at_a_time(self):
+        for text in SAMPLES:
+            with self.subTest(text=text):
+                self.assertEqual(_stream(list(text)), _expected(text))
+
+    def test_fence_split_across_three_chunks(self):
+        self.assertEqual(_stream(['``', '`lat', 'ex\n\\item A\n``', '`']), '\\item A')
+
+    def test_holds_back_only_an_undecided_suffix(self):
+        stripper = FenceStripper()
+
+        self.assertEqual(stripper.feed('\\item A ``'), '\\item A')
+        self.assertEqual(stripper.feed('x'), ' ``x')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,108 @@
+"""
+test_jd_extractor.py
+--------------------
+Section and line cues of the rule-based job description extractor
+
+Run from the project root:
+    python -m unittest discover tests
+"""
+
+import os
+import sys
+import unittest
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(TESTS_DIR, '..', 'agents'))
+
+from jd_extractor import extract_job_requirements
+
+
+class SectionCueTests(unittest.TestCase):
+
+    def test_inline_nice_heading_labels_only_its_line(self):
+        jd = (
+            "Backend Engineer\n"
+            "Requirements:\n"
+            "- 5+ years of experience with Python\n"
+            "Nice to have: Kubernetes, Docker\n"
+            "We use Java. Knowledge of C++ and C# and .NET and Node.js.\n"
+            "Experience with Go, C and R.\n"
+        )
+        result = extract_job_requirements(jd)
+
+        self.assertEqual(result['nice_to_have_skills'], ['Kubernetes', 'Docker'])
+        for skill in ('Python', 'Java', 'C++', 'C#', '.NET', 'Node.js', 'Go', 'C', 'R'):
+            self.assertIn(skill, result['required_skills'])
+
+    def test_bare_heading_opens_a_section(self):
+        jd = (
+            "Requirements:\n"
+            "- Python\n"
+            "Nice to have:\n"
+            "- Kubernetes\n"
+            "- Docker\n"
+        )
+        result = extract_job_requirements(jd)
+
+        self.assertEqual(result['required_skills'], ['Python'])
+        self.assertEqual(result['nice_to_have_skills'], ['Kubernetes', 'Docker'])
+
+    def test_bulleted_inline_heading_inside_required_section(self):
+        jd = (
+            "Qualifications:\n"
+            "- Python and SQL\n"
+            "- Preferred: Airflow\n"
+            "- Docker\n"
+        )
+        result = extract_job_requirements(jd)
+
+        self.assertEqual(result['nice_to_have_skills'], ['Airflow'])
+        self.assertEqual(result['required_skills'], ['Python', 'SQL', 'Docker'])
+
+    def test_line_cue_applies_to_its_clause(self):
+        result = extract_job_requirements("Python and SQL required; Airflow is a plus.")
+
+        self.assertEqual(result['required_skills'], ['Python', 'SQL'])
+        self.assertEqual(result['nice_to_have_skills'], ['Airflow'])
+
+    def test_ambiguous_names_need_a_list(self):
+        result = extract_job_requirements("Plan C is our backup. Let's go build things with Python.")
+
+        self.assertEqual(result['required_skills'], ['Python'])
+
+    def test_benefits_section_is_not_a_requirement(self):
+        jd = (
+            "Requirements:\n"
+            "- Python\n"
+            "We offer:\n"
+            "- Training in machine learning\n"
+        )
+        result = extract_job_requirements(jd)
+
+        self.assertEqual(result['required_skills'], ['Python'])
+        self.assertEqual(result['nice_to_have_skills'], [])
+
+
+class EducationTests(unittest.TestCase):
+
+    def test_education_is_trimmed_to_its_sentence(self):
+        result = extract_job_requirements(
+            "- B.S. or M.S. in Computer Science. Experience with MS Office.\n"
+        )
+
+        self.assertEqual(result['education_required'], 'B.S. or M.S. in Computer Science')
+
+    def test_education_is_trimmed_to_its_clause(self):
+        result = extract_job_requirements(
+            "Strong Python skills, but a Master's degree is a plus; remote friendly\n"
+        )
+
+        self.assertEqual(result['education_required'], "a Master's degree is a plus")
+
+    def test_no_degree(self):
+        self.assertEqual(extract_job_requirements("Python and SQL")['education_required'],
+                         'Not specified')
+
+
+if __name__ == '__main__':
+    unittest.main()
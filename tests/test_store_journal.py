@@ -0,0 +1,152 @@
+"""
+test_store_journal.py
+---------------------
+Vector store journal: replay onto a loaded index and compaction bookkeeping
+
+Run from the project root:
+    python -m unittest discover tests
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(TESTS_DIR, '..', 'agents'))
+
+from store_journal import JournalBuffer, StoreJournal
+
+
+class FakeStore:
+    """The slice of LangChain's FAISS store that replay() uses"""
+
+    def __init__(self, docs=None):
+        self.docs = dict(docs or {})  # id -> (text, metadata, vector)
+
+    @property
+    def index_to_docstore_id(self):
+        return dict(enumerate(self.docs))
+
+    def delete(self, ids):
+        for i in ids:
+            del self.docs[i]
+
+    def add_embeddings(self, text_embeddings, metadatas, ids):
+        for i, (text, vector), metadata in zip(ids, text_embeddings, metadatas):
+            self.docs[i] = (text, metadata, vector)
+
+
+def _chunk(i):
+    return (f'id{i}', f'text {i}', {'source': 'resume'}, [float(i), 0.5])
+
+
+class StoreJournalTests(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.journal = StoreJournal(self.dir)
+
+    def tearDown(self):
+        shutil.rmtree(self.dir, ignore_errors=True)
+
+    def test_replay_applies_adds_and_deletes_in_order(self):
+        self.journal.record(added=[_chunk(1), _chunk(2)])
+        self.journal.record(added=[_chunk(3)], deleted=['id1'])
+        store = FakeStore()
+
+        self.assertEqual(self.journal.replay(store), 3)  # add, delete, add
+        self.assertEqual(sorted(store.docs), ['id2', 'id3'])
+        self.assertEqual(store.docs['id3'], ('text 3', {'source': 'resume'}, [3.0, 0.5]))
+
+    def test_replay_skips_what_the_snapshot_already_has(self):
+        self.journal.record(added=[_chunk(1), _chunk(2)])
+        self.journal.record(deleted=['gone'])
+        store = FakeStore({'id1': ('from snapshot', {}, [9.0])})
+
+        self.journal.replay(store)
+
+        self.assertEqual(store.docs['id1'], ('from snapshot', {}, [9.0]))
+        self.assertIn('id2', store.docs)
+
+    def test_torn_last_line_is_ignored(self):
+        self.journal.record(added=[_chunk(1)])
+        with open(self.journal.path, 'a', encoding='utf-8') as f:
+            f.write('{"op": "add", "ids": ["id2"')  # crash mid-append
+        store = FakeStore()
+
+        self.journal.replay(store)
+
+        self.assertEqual(list(store.docs), ['id1'])
+
+    def test_op_count_survives_a_restart(self):
+        self.journal.record_batch([([_chunk(1)], []), ([_chunk(2)], ['id1'])])
+
+        self.assertEqual(self.journal.op_count(), 3)
+        self.assertEqual(StoreJournal(self.dir).op_count(), 3)
+
+    def test_clear_after_compaction(self):
+        self.journal.record(added=[_chunk(1)])
+        self.journal.clear()
+
+        self.assertEqual(self.journal.op_count(), 0)
+        self.assertFalse(os.path.exists(self.journal.path))
+        self.assertEqual(self.journal.replay(FakeStore()), 0)
+
+    def test_empty_changes_write_nothing(self):
+        self.journal.record()
+
+        self.assertFalse(os.path.exists(self.journal.path))
+
+
+class JournalBufferTests(unittest.TestCase):
+
+    def setUp(self):
+        self.writes = []
+        self.buffer = JournalBuffer(lambda key, changes: self.writes.append((key, changes)),
+                                    batch_size=3, flush_seconds=60)
+
+    def test_batches_until_full(self):
+        self.buffer.add('alice', added=[_chunk(1)])
+        self.buffer.add('alice', deleted=['id0'])
+        self.assertEqual(self.writes, [])
+        self.assertEqual(self.buffer.pending(), 2)
+
+        self.buffer.add('alice', added=[_chunk(2)])
+
+        self.assertEqual(len(self.writes), 1)
+        key, changes = self.writes[0]
+        self.assertEqual(key, 'alice')
+        self.assertEqual(len(changes), 3)
+        self.assertEqual(self.buffer.pending(), 0)
+
+    def test_flush_one_store(self):
+        self.buffer.add('alice', added=[_chunk(1)])
+        self.buffer.add('bob', added=[_chunk(2)])
+
+        self.buffer.flush('bob')
+
+        self.assertEqual([key for key, _ in self.writes], ['bob'])
+        self.assertEqual(self.buffer.pending(), 1)
+
+    def test_failed_write_is_kept_for_the_next_flush(self):
+        calls = []
+
+        def flaky(key, changes):
+            calls.append(changes)
+            if len(calls) == 1:
+                raise OSError("disk full")
+
+        buffer = JournalBuffer(flaky, batch_size=100, flush_seconds=60)
+        buffer.add('alice', added=[_chunk(1)])
+        buffer.flush()
+        self.assertEqual(buffer.pending(), 1)
+
+        buffer.flush()
+        self.assertEqual(buffer.pending(), 0)
+        self.assertEqual(calls[0], calls[1])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+"""
+test_structured_output.py
+-------------------------
+Tolerant JSON parsing and schema coercion of model responses
+
+Run from the project root:
+    python -m unittest discover tests
+"""
+
+import os
+import sys
+import unittest
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(TESTS_DIR, '..', 'agents'))
+
+from structured_output import StructuredOutputError, conform, missing_fields, parse_json
+
+
+class ParseJsonTests(unittest.TestCase):
+
+    def test_clean_object_is_not_repaired(self):
+        self.assertEqual(parse_json('{"a": 1}'), ({'a': 1}, False))
+
+    def test_code_fences_are_stripped(self):
+        self.assertEqual(parse_json('```json\n{"a": 1}\n```'), ({'a': 1}, False))
+
+    def test_prose_and_trailing_commas(self):
+        data, repaired = parse_json('Sure! {"a": [1, 2,], } Hope this helps.')
+
+        self.assertEqual(data, {'a': [1, 2]})
+        self.assertTrue(repaired)
+
+    def test_truncated_object_closes_open_brackets(self):
+        data, repaired = parse_json('{"a": 1, "b": {"c": [1, 2')
+
+        self.assertEqual(data, {'a': 1, 'b': {'c': [1, 2]}})
+        self.assertTrue(repaired)
+
+    def test_truncated_string_drops_the_unfinished_field(self):
+        data, repaired = parse_json('{"a": "done", "b": "cut off mid-sen')
+
+        self.assertEqual(data, {'a': 'done'})
+        self.assertTrue(repaired)
+
+    def test_nothing_to_salvage(self):
+        with self.assertRaises(StructuredOutputError):
+            parse_json('I could not analyze this job description.')
+
+
+class SchemaTests(unittest.TestCase):
+
+    def test_missing_fields_can_be_limited_to_the_requested_ones(self):
+        missing = missing_fields('enrich_job_description', {'company_culture': None},
+                                 fields=['company_culture', 'key_responsibilities'])
+
+        self.assertEqual(missing, ['key_responsibilities'])
+
+    def test_conform_fills_and_coerces(self):
+        data = conform('analyze_job_description', {'required_skills': 'Python'})
+
+        self.assertEqual(data['required_skills'], ['Python'])
+        self.assertEqual(data['nice_to_have_skills'], [])
+        self.assertIsNone(data['company_culture'])
+
+    def test_match_score_is_numeric(self):
+        for value, expected in (('85', 85), ('85/100', 85), ('72.6%', 73), (90.4, 90),
+                                (77, 77), ('high', None), (True, None)):
+            with self.subTest(value=value):
+                data = conform('create_matching_strategy', {'overall_match_score': value})
+                self.assertEqual(data['overall_match_score'], expected)
+
+
+if __name__ == '__main__':
+    unittest.main()